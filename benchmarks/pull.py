@@ -0,0 +1,318 @@
+"""Benchmark the pull pipeline against a local stand-in server.
+
+Sweeps the number of files, file sizes and workers, and times each stage of
+`datatrail pull`: finding the missing files, downloading them with `pget` and
+verifying the download. Every case runs in a fresh process, so that its peak
+RSS is its own. Worker idle time is the time download processes spent
+waiting to start, or done while others were still downloading.
+
+Results are appended to benchmarks/results/pull.jsonl, and each case is
+compared with its previous run on the same machine. With --check, the exit
+status is 1 if any case got slower than --threshold.
+
+Usage:
+    python benchmarks/pull.py [--files 10,100,1000] [--sizes 1KB,1MB]
+        [--workers 1,4,16] [--latency 0.0] [--bandwidth 0] [--check]
+
+Full sweep:
+    python benchmarks/pull.py --files 10,100,1000,10000,100000 \\
+        --sizes 1KB,1MB,1GB --workers 1,4,16,64 --max-bytes 8GB
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import yaml
+
+from dtcli.utilities.standin import StandIn
+
+SCOPE = "chime.event.baseband.raw"
+HISTORY = Path(__file__).parent / "results" / "pull.jsonl"
+UNITS = {"B": 1, "KB": 1024, "MB": 1024**2, "GB": 1024**3}
+
+
+def parse_size(size: str) -> int:
+    """Parse a size like "1KB" or "512MB" into bytes."""
+    size = size.strip().upper()
+    for unit in sorted(UNITS, key=len, reverse=True):
+        if size.endswith(unit):
+            return int(float(size[: -len(unit)]) * UNITS[unit])
+    return int(size)
+
+
+def format_size(size: float) -> str:
+    """Format bytes with the largest whole unit."""
+    for unit in ["GB", "MB", "KB"]:
+        if size >= UNITS[unit]:
+            return f"{size / UNITS[unit]:g}{unit}"
+    return f"{size:g}B"
+
+
+def timed_get(*args: Any, **kwargs: Any) -> None:
+    """Download with `cadcclient.get`, logging when the worker started and ended."""
+    from dtcli.utilities import cadcclient
+
+    started = time.time()
+    try:
+        cadcclient.untimed_get(*args, **kwargs)  # type: ignore
+    finally:
+        with open(os.environ["DTCLI_BENCH_SPANS"], "a") as stream:
+            stream.write(f"{started} {time.time()}\n")
+
+
+def run_case(
+    config: str, dataset: str, directory: str, workers: int, queue: Any
+) -> None:
+    """Pull a dataset, timing each stage. Runs in its own process.
+
+    Args:
+        config (str): Configuration file pointing at the stand-in.
+        dataset (str): Name of dataset.
+        directory (str): Directory to download to.
+        workers (int): Number of download processes.
+        queue (Any): Queue to put the metrics on.
+    """
+    import dtcli.config
+
+    dtcli.config.CONFIG = Path(config)
+    # Download processes are forked, as when the CLI runs, and so inherit the
+    # configuration rather than reading the user's.
+    multiprocessing.set_start_method("fork", force=True)
+    from dtcli.pull import undownloaded
+    from dtcli.src import functions
+    from dtcli.utilities import cadcclient
+
+    # Log the span of each download process, to find how long they sat idle.
+    spans = Path(directory + ".spans")
+    os.environ["DTCLI_BENCH_SPANS"] = str(spans)
+    cadcclient.untimed_get = cadcclient.get  # type: ignore
+    cadcclient.get = timed_get
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        started = time.time()
+        files = functions.find_missing_dataset_files(SCOPE, dataset, directory + "/")
+        found = time.time()
+        functions.get_files(files["missing"], "local", directory, workers, 0)
+        downloaded = time.time()
+        missing = [*undownloaded(files["missing"], directory)]
+        verified = time.time()
+    queue.put(
+        {
+            "started": started,
+            "found": found,
+            "downloaded": downloaded,
+            "verified": verified,
+            "files": len(files["missing"]),
+            "spans": [
+                [float(value) for value in line.split()]
+                for line in spans.read_text().splitlines()
+            ]
+            if spans.exists()
+            else [],
+            "undownloaded": len(missing),
+            # ru_maxrss is in KiB on Linux.
+            "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+            "workers_rss_mb": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+            / 1024,
+        }
+    )
+
+
+def measure(
+    config: Path, dataset: str, files: int, size: int, workers: int
+) -> Dict[str, float]:
+    """Run one case in a fresh process and compute its metrics.
+
+    Args:
+        config (Path): Configuration file pointing at the stand-in.
+        dataset (str): Name of dataset.
+        files (int): Number of files.
+        size (int): Size of each file in bytes.
+        workers (int): Number of download processes.
+
+    Returns:
+        Dict[str, float]: Metrics of the case.
+    """
+    directory = tempfile.mkdtemp(prefix="dtcli-bench-")
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    process = context.Process(
+        target=run_case, args=(str(config), dataset, directory, workers, queue)
+    )
+    process.start()
+    result = queue.get()
+    process.join()
+    shutil.rmtree(directory, ignore_errors=True)
+    Path(directory + ".spans").unlink(missing_ok=True)
+
+    # Workers are idle from the start of the download until they start, and
+    # from when they finish until the last worker does.
+    download = result["downloaded"] - result["found"]
+    slots = max(min(workers, files), 1)
+    idle = slots * download - sum(end - start for start, end in result["spans"])
+    return {
+        "find_s": result["found"] - result["started"],
+        "download_s": download,
+        "verify_s": result["verified"] - result["downloaded"],
+        "wall_s": result["verified"] - result["started"],
+        "throughput_mb_s": files * size / UNITS["MB"] / download if download else 0.0,
+        "files_s": files / download if download else 0.0,
+        "peak_rss_mb": result["peak_rss_mb"],
+        "workers_rss_mb": result["workers_rss_mb"],
+        "idle_s": max(idle, 0.0),
+        "idle_fraction": max(idle, 0.0) / (slots * download) if download else 0.0,
+        "undownloaded": result["undownloaded"],
+    }
+
+
+def commit() -> Optional[str]:
+    """Current git commit, if any."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def previous(history: Path, record: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Most recent earlier result of the same case on the same machine."""
+    if not history.exists():
+        return None
+    match = None
+    with open(history) as stream:
+        for line in stream:
+            try:
+                old = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if (
+                old.get("case") == record["case"]
+                and old.get("machine") == record["machine"]
+            ):
+                match = old
+    return match
+
+
+def report(
+    record: Dict[str, Any], last: Optional[Dict[str, Any]], threshold: float
+) -> bool:
+    """Print a result, flagging it if slower than its previous run.
+
+    Args:
+        record (Dict[str, Any]): Result of a case.
+        last (Optional[Dict[str, Any]]): Previous result of the same case.
+        threshold (float): Fraction slower counted as a regression.
+
+    Returns:
+        bool: True if the case regressed.
+    """
+    case, metrics = record["case"], record["metrics"]
+    regressed = bool(
+        last and metrics["wall_s"] > last["metrics"]["wall_s"] * (1 + threshold)
+    )
+    flag = ""
+    if last and regressed:
+        flag = f"  REGRESSION: {last['metrics']['wall_s']:.2f}s at {last.get('commit')}"
+    print(
+        f"{case['files']:>7} {format_size(case['size']):>6} {case['workers']:>7} "
+        f"{metrics['find_s']:>7.2f}s {metrics['download_s']:>8.2f}s "
+        f"{metrics['verify_s']:>7.3f}s {metrics['throughput_mb_s']:>9.1f} "
+        f"{metrics['files_s']:>9.0f} {metrics['peak_rss_mb']:>7.0f} "
+        f"{metrics['idle_fraction']:>6.0%}{flag}"
+    )
+    return regressed
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", default="10,100,1000")
+    parser.add_argument("--sizes", default="1KB,1MB")
+    parser.add_argument("--workers", default="1,4,16")
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--bandwidth", type=parse_size, default=0)
+    parser.add_argument("--max-bytes", type=parse_size, default=parse_size("2GB"))
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--threshold", type=float, default=0.2)
+    parser.add_argument("--history", type=Path, default=HISTORY)
+    parser.add_argument("--no-save", action="store_true")
+    parser.add_argument("--check", action="store_true")
+    args = parser.parse_args()
+
+    machine = {
+        "node": platform.node(),
+        "cpus": os.cpu_count(),
+        "python": platform.python_version(),
+    }
+    cases = [
+        (files, size, workers)
+        for files in [int(value) for value in args.files.split(",")]
+        for size in [parse_size(value) for value in args.sizes.split(",")]
+        for workers in [int(value) for value in args.workers.split(",")]
+    ]
+    regressions = 0
+    print(
+        f"{'files':>7} {'size':>6} {'workers':>7} {'find':>8} {'download':>9} "
+        f"{'verify':>8} {'MB/s':>9} {'files/s':>9} {'RSS MB':>7} {'idle':>6}"
+    )
+    with StandIn(
+        latency=args.latency, bandwidth=args.bandwidth or None
+    ) as standin, tempfile.TemporaryDirectory() as home:
+        config = Path(home) / "config.yaml"
+        config.write_text(yaml.safe_dump(standin.config(root_mounts={"local": home})))
+        for files, size, workers in cases:
+            if files * size > args.max_bytes:
+                print(f"Skipping {files} x {format_size(size)}: over --max-bytes.")
+                continue
+            dataset = f"bench-{files}-{size}"
+            if (SCOPE, dataset) not in standin.datasets:
+                added = standin.add_dataset(SCOPE, dataset, files=files, size=size)
+                # Checksums are computed before timing, as Minoc stores them.
+                for path in added.registered["minoc"]:
+                    standin.artifacts[path].md5
+            for _ in range(args.repeat):
+                record = {
+                    "timestamp": time.time(),
+                    "commit": commit(),
+                    "machine": machine,
+                    "case": {
+                        "files": files,
+                        "size": size,
+                        "workers": workers,
+                        "latency": args.latency,
+                        "bandwidth": args.bandwidth,
+                    },
+                    "metrics": measure(config, dataset, files, size, workers),
+                }
+                regressions += report(
+                    record, previous(args.history, record), args.threshold
+                )
+                if not args.no_save:
+                    args.history.parent.mkdir(parents=True, exist_ok=True)
+                    with open(args.history, "a") as stream:
+                        stream.write(json.dumps(record) + "\n")
+    if args.check and regressions:
+        print(f"{regressions} regressions over {args.threshold:.0%}.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Benchmark classifying unregistered reason messages.
+
+Builds a synthetic corpus shaped like the unregistered datasets pipeline,
+where most reasons are exact duplicates of a few hundred distinct messages,
+and reports the throughput of the signature engine with and without
+memoisation.
+
+Usage:
+    python benchmarks/signatures.py [--messages 100000] [--distinct 500]
+"""
+
+import argparse
+import random
+import time
+from typing import Callable, List
+
+from dtcli.utilities.signatures import DEFAULT_RULES, SignatureEngine
+
+SCOPES = [
+    "chime.event.baseband.raw",
+    "chime.event.intensity.raw",
+    "chime.event.intensity.cutout",
+]
+
+
+def reason(rng: random.Random) -> str:
+    """Create a realistic reason message.
+
+    Args:
+        rng (random.Random): Random number generator.
+
+    Returns:
+        str: Reason message.
+    """
+    event = rng.randint(10_000_000, 400_000_000)
+    scope = rng.choice(SCOPES)
+    kind = rng.random()
+    if kind < 0.4:
+        return (
+            f"Could not attach datasets: ['{event}'] to {event // 1000}. "
+            f'ERROR: "dataset {event // 1000}, {scope} not found"'
+        )
+    if kind < 0.6:
+        return (
+            f"Could not create dataset: {event}, scope: {scope}. "
+            "psycopg2.errors.UniqueViolation: duplicate key value violates unique "
+            f'constraint "dataset_name_scope_key"\nDETAIL: Key (name)=({event}) exists.'
+        )
+    if kind < 0.7:
+        return (
+            "psycopg2.OperationalError: server closed the connection unexpectedly\n"
+            f"\tThis probably means the server terminated abnormally ({event})."
+        )
+    if kind < 0.9:
+        return rng.choice(["token expired", "Status code 502", "timeout", "None"])
+    return (
+        f'Traceback (most recent call last):\n  File "/app/register.py", line '
+        f"{event % 500}, in register\nKeyError: 'event_{event}' at offset {event}"
+    )
+
+
+def corpus(messages: int, distinct: int, seed: int = 0) -> List[str]:
+    """Create a corpus of reason messages.
+
+    Args:
+        messages (int): Number of messages.
+        distinct (int): Number of distinct messages.
+        seed (int): Random seed. Defaults to 0.
+
+    Returns:
+        List[str]: Reason messages.
+    """
+    rng = random.Random(seed)
+    pool = [reason(rng) for _ in range(distinct)]
+    return [rng.choice(pool) for _ in range(messages)]
+
+
+def throughput(classify: Callable[[str], str], messages: List[str]) -> float:
+    """Measure messages classified per second.
+
+    Args:
+        classify (Callable[[str], str]): Classifier.
+        messages (List[str]): Reason messages.
+
+    Returns:
+        float: Messages per second.
+    """
+    start = time.perf_counter()
+    for msg in messages:
+        classify(msg)
+    return len(messages) / (time.perf_counter() - start)
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=100_000)
+    parser.add_argument("--distinct", type=int, default=500)
+    args = parser.parse_args()
+
+    messages = corpus(args.messages, args.distinct)
+    uncached = SignatureEngine(DEFAULT_RULES, cache=0)
+    cached = SignatureEngine(DEFAULT_RULES)
+    print(f"{args.messages:,} messages, {args.distinct:,} distinct")
+    print(f"uncached: {throughput(uncached.classify, messages):12,.0f} msg/s")
+    print(f"cached:   {throughput(cached.classify, messages):12,.0f} msg/s")
+
+
+if __name__ == "__main__":
+    main()
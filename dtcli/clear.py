@@ -10,6 +10,7 @@ from rich.prompt import Confirm
 
 from dtcli.config import procure
 from dtcli.src.functions import clear_dataset_path, find_dataset_common_path
+from dtcli.utilities import ledger
 from dtcli.utilities.utilities import set_log_level, validate_scope
 
 logger = logging.getLogger("clear")
@@ -136,6 +137,7 @@ def clear(
 
     # Delete files.
     if is_delete:
-        clear_dataset_path(common_path, clear_parents, verbose, quiet)
+        if clear_dataset_path(common_path, clear_parents, verbose, quiet):
+            ledger.forget(scope, dataset)
     else:
         console.print("Roger roger, no files deleted.")
@@ -6,7 +6,7 @@ import click
 from click_aliasing import ClickAliasedGroup
 from rich import console, pretty
 
-from dtcli import clear, config, ls, ps, pull, scout, unregistered
+from dtcli import clear, config, du, ls, ps, pull, scout, search, unregistered
 from dtcli.utilities import utilities
 
 pretty.install()
@@ -42,10 +42,12 @@ def version():
 
 cli.add_command(clear.clear)
 cli.add_command(config.config)
+cli.add_command(du.du)
 cli.add_command(ls.list, aliases=["ls"])
 cli.add_command(ps.ps)
 cli.add_command(pull.pull)
 cli.add_command(scout.scout)
+cli.add_command(search.search)
 cli.add_command(unregistered.unregistered)
 
 
@@ -124,17 +124,18 @@ def init(site: str):
     print(f"Datatrail config file {CONFIG} created.")
 
 
-def procure(config: Path = CONFIG, key: Optional[str] = None) -> Any:
+def procure(config: Optional[Path] = None, key: Optional[str] = None) -> Any:
     """Procure the configuration file.
 
     Args:
-        config (Path, optional): Configuration. Defaults to CONFIG.
+        config (Optional[Path], optional): Configuration. Defaults to CONFIG,
+            looked up when called so that it can be swapped, e.g. in tests.
 
     Returns:
         Dict[str, Any]: Configuration.
     """
     try:
-        with open(config.as_posix()) as stream:
+        with open((config or CONFIG).as_posix()) as stream:
             configuration = yaml.safe_load(stream)
         if key:
             return configuration[key]
@@ -142,3 +143,33 @@ def procure(config: Path = CONFIG, key: Optional[str] = None) -> Any:
     except Exception as exception:
         log.exception(exception)
         configuration = None
+
+
+def setting(key: str, default: Any = None) -> Any:
+    """Get an optional configuration value, without requiring a configuration file.
+
+    Args:
+        key (str): Key to get.
+        default (Any, optional): Value if the key or file is missing.
+            Defaults to None.
+
+    Returns:
+        Any: Configuration value.
+    """
+    return settings().get(key, default)
+
+
+def settings() -> Dict[str, Any]:
+    """Get the whole configuration, without requiring a configuration file.
+
+    Read it once to look up several keys, rather than calling `setting` for each.
+
+    Returns:
+        Dict[str, Any]: Configuration, empty if the file is missing or invalid.
+    """
+    try:
+        with open(CONFIG) as stream:
+            configuration = yaml.safe_load(stream) or {}
+    except (OSError, yaml.YAMLError):
+        return {}
+    return configuration if isinstance(configuration, dict) else {}
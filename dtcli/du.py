@@ -0,0 +1,111 @@
+"""Datatrail Disk Usage Command."""
+
+import json
+import logging
+from datetime import datetime
+
+import click
+from rich.console import Console
+from rich.table import Table
+
+from dtcli.config import procure
+from dtcli.utilities import ledger
+from dtcli.utilities.utilities import set_log_level
+
+logger = logging.getLogger("du")
+
+console = Console()
+error_console = Console(stderr=True, style="bold red")
+
+
+@click.command(name="du", help="Local disk usage of downloaded datasets.")
+@click.option(
+    "--refresh",
+    "-r",
+    is_flag=True,
+    help="Re-measure datasets on disk before reporting.",
+)
+@click.option("-v", "--verbose", count=True, help="Verbosity: v=INFO, vv=DEBUG.")
+@click.option("-q", "--quiet", is_flag=True, help="Set log level to ERROR.")
+@click.option("--json", "output_json", is_flag=True, help="Output as JSON.")
+@click.pass_context
+def du(
+    ctx: click.Context,
+    refresh: bool,
+    verbose: int,
+    quiet: bool,
+    output_json: bool,
+) -> None:
+    """Local disk usage of downloaded datasets.
+
+    Args:
+        ctx (click.Context): Click context.
+        refresh (bool): Re-measure datasets on disk before reporting.
+        verbose (int): Verbosity: v=INFO, vv=DUBUG.
+        quiet (bool): Set log level to ERROR.
+        output_json (bool): Output as JSON.
+    """
+    # Set logging level.
+    set_log_level(logger, verbose, quiet)
+    set_log_level(ledger.logger, verbose, quiet)
+    logger.debug("`du` called with:")
+    logger.debug(f"refresh: {refresh} [{type(refresh)}]")
+    logger.debug(f"verbose: {verbose} [{type(verbose)}]")
+    logger.debug(f"quiet: {quiet} [{type(quiet)}]")
+
+    entries = ledger.refresh() if refresh else ledger.load()
+    ordered = sorted(
+        entries.values(), key=lambda entry: entry.get("last_used", 0), reverse=True
+    )
+    total = sum(entry.get("bytes", 0) for entry in ordered)
+
+    # Free space on the root mount, when a configuration exists.
+    free = None
+    try:
+        config = procure()
+        directory = config["root_mounts"][config["site"]]
+        free = ledger.free_space(directory)
+    except Exception:
+        logger.debug("Unable to determine free space on the root mount.")
+
+    if output_json:
+        print(
+            json.dumps(
+                {"datasets": ordered, "total_bytes": total, "free_bytes": free},
+                indent=2,
+            )
+        )
+        return None
+
+    if not ordered:
+        console.print("No datasets recorded. Datasets are recorded by `pull`.")
+    else:
+        table = Table(
+            title="Datatrail: Local Disk Usage",
+            header_style="magenta",
+            title_style="bold magenta",
+            show_footer=True,
+            footer_style="bold",
+        )
+        table.add_column("Dataset", style="bold", footer="Total")
+        table.add_column("Scope")
+        table.add_column("Number of Files", justify="right")
+        table.add_column(
+            "Size [GB]", style="green", justify="right", footer=f"{total / 1024**3:.2f}"
+        )
+        table.add_column("Last Used")
+        table.add_column("Path")
+        for entry in ordered:
+            table.add_row(
+                entry["dataset"],
+                entry["scope"],
+                f"{entry.get('files', 0)}",
+                f"{entry.get('bytes', 0) / 1024**3:.2f}",
+                datetime.fromtimestamp(entry.get("last_used", 0)).strftime(
+                    "%Y-%m-%d %H:%M"
+                ),
+                entry["path"],
+            )
+        console.print(table)
+    if free is not None:
+        console.print(f"Free space on root mount: {free / 1024**3:.2f} GB.")
@@ -1,8 +1,10 @@
 """Datatrail List Command."""
 
-import json
 import logging
-from typing import Optional
+import re
+from datetime import datetime
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, Optional
 
 import click
 from requests.exceptions import ConnectionError
@@ -10,10 +12,16 @@ from rich.console import Console
 from rich.table import Table
 
 from dtcli.src import functions
+from dtcli.utilities import jsonstream
 from dtcli.utilities.utilities import set_log_level, validate_scope
 
 logger = logging.getLogger("ls")
 
+DATE_FORMATS = ["%Y-%m-%d", "%Y-%m-%dT%H:%M:%S", "%Y%m%d"]
+
+# Names printed at a time with --plain.
+BATCH = 1000
+
 console = Console()
 error_console = Console(stderr=True, style="bold red")
 
@@ -35,6 +43,52 @@ error_console = Console(stderr=True, style="bold red")
 @click.option("-q", "--quiet", is_flag=True, help="Only errors shown in logs.")
 @click.option("--write", is_flag=True, help="Write the events to file.")
 @click.option("--json", "output_json", is_flag=True, help="Output as JSON.")
+@click.option(
+    "--compact", is_flag=True, help="Output JSON without indentation, with --json."
+)
+@click.option(
+    "--match", "-m", metavar="GLOB", default=None, help="Only datasets matching a glob."
+)
+@click.option(
+    "--regex",
+    "-r",
+    metavar="REGEX",
+    default=None,
+    help="Only datasets matching a regex.",
+)
+@click.option(
+    "--after",
+    type=click.DateTime(DATE_FORMATS),
+    metavar="DATE",
+    default=None,
+    help="Only datasets timestamped after a date.",
+)
+@click.option(
+    "--before",
+    type=click.DateTime(DATE_FORMATS),
+    metavar="DATE",
+    default=None,
+    help="Only datasets timestamped before a date.",
+)
+@click.option(
+    "--limit",
+    "-n",
+    type=click.IntRange(min=0),
+    default=None,
+    help="Maximum number of datasets to list.",
+)
+@click.option(
+    "--offset",
+    type=click.IntRange(min=0),
+    default=0,
+    help="Number of matching datasets to skip.",
+)
+@click.option(
+    "--plain",
+    "-1",
+    is_flag=True,
+    help="Print one dataset per line as they are listed, unsorted.",
+)
 @click.pass_context
 def list(  # noqa: C901
     ctx: click.Context,
@@ -44,6 +98,14 @@ def list(  # noqa: C901
     quiet: bool = False,
     write: bool = False,
     output_json: bool = False,
+    match: Optional[str] = None,
+    regex: Optional[str] = None,
+    after: Optional[datetime] = None,
+    before: Optional[datetime] = None,
+    limit: Optional[int] = None,
+    offset: int = 0,
+    plain: bool = False,
+    compact: bool = False,
 ):
     """List Datatrail Scopes & Datasets.
 
@@ -55,6 +117,14 @@ def list(  # noqa: C901
         quiet (bool): Only errors shown in logs.
         write (bool): Write the events to file.
         output_json (bool): Output as JSON.
+        match (Optional[str]): Only datasets matching a glob.
+        regex (Optional[str]): Only datasets matching a regular expression.
+        after (Optional[datetime]): Only datasets timestamped after a date.
+        before (Optional[datetime]): Only datasets timestamped before a date.
+        limit (Optional[int]): Maximum number of datasets to list.
+        offset (int): Number of matching datasets to skip.
+        plain (bool): Print one dataset per line as they are listed, unsorted.
+        compact (bool): Output JSON without indentation.
     """
     # Set logging level.
     set_log_level(logger, verbose, quiet)
@@ -63,6 +133,19 @@ def list(  # noqa: C901
     logger.debug(f"datasets: {datasets} [{type(datasets)}]")
     logger.debug(f"verbose: {verbose} [{type(verbose)}]")
     logger.debug(f"quiet: {quiet} [{type(quiet)}]")
+    logger.debug(f"match: {match} [{type(match)}]")
+    logger.debug(f"regex: {regex} [{type(regex)}]")
+    logger.debug(f"after: {after} [{type(after)}]")
+    logger.debug(f"before: {before} [{type(before)}]")
+    logger.debug(f"limit: {limit} [{type(limit)}]")
+    logger.debug(f"offset: {offset} [{type(offset)}]")
+    logger.debug(f"plain: {plain} [{type(plain)}]")
+    logger.debug(f"compact: {compact} [{type(compact)}]")
+    if regex:
+        try:
+            re.compile(regex)
+        except re.error as error:
+            raise click.BadParameter(str(error), param_hint="'--regex'")
     if scope:
         try:
             if not validate_scope(scope):
@@ -74,11 +157,24 @@ def list(  # noqa: C901
             error_console.print(e)
             ctx.exit(1)
             return None
-    results = functions.list(scope, datasets, verbose, quiet)
+    results = functions.list(
+        scope,
+        datasets,
+        verbose,
+        quiet,
+        match=match,
+        regex=regex,
+        after=after,
+        before=before,
+        limit=limit,
+        offset=offset,
+        lazy=True,
+    )
 
     # Output JSON if requested.
     if output_json:
-        print(json.dumps(results, indent=2))
+        # Datasets are written as they are listed, without being collected.
+        jsonstream.write(results, indent=None if compact else 2)
         if "error" in results:
             ctx.exit(1)
         return
@@ -103,43 +199,97 @@ def list(  # noqa: C901
         console.print(table)
 
     if "larger_datasets" in results.keys():
-        results["larger_datasets"] = sorted(results["larger_datasets"])
-
-        if write:
-            with open(f"./larger_datasets_list_{scope}.txt", "w") as file:
-                json.dump(results, file)
-
-        table = Table(
-            title=f"Datatrail: Larger Datasets {scope}",
-            header_style="magenta",
-            title_style="bold magenta",
+        show_datasets(
+            results,
+            "larger_datasets",
+            f"Datatrail: Larger Datasets {scope}",
+            "Larger datasets",
+            f"./larger_datasets_list_{scope}.txt" if write else None,
+            plain,
+            False,
         )
-        table.add_column("Larger datasets", justify="center")
-        table.add_row("\t".join(results["larger_datasets"]))
-        with console.pager(styles=False):
-            console.print(table)
 
     # Display datasets in parent dataset for scope.
     if "datasets" in results.keys():
-        results["datasets"] = sorted(results["datasets"], reverse=True)
-        if write:
-            with open(f"./dataset_list_for_{scope}_{datasets}.txt", "w") as file:
-                json.dump(results, file)
-
-        table = Table(
-            title=f"Datatrail: Child Datasets {datasets} {scope}",
-            header_style="magenta",
-            title_style="bold magenta",
+        show_datasets(
+            results,
+            "datasets",
+            f"Datatrail: Child Datasets {datasets} {scope}",
+            "Datasets",
+            f"./dataset_list_for_{scope}_{datasets}.txt" if write else None,
+            plain,
+            True,
         )
-        table.add_column("Datasets", justify="center")
-        # for d in results["datasets"]:
-        # table.add_row(d)
-        table.add_row("\t".join(results["datasets"]))
-        with console.pager(styles=False):
-            console.print(table)
-        # console.print(results["datasets"])
 
     # No contact with server.
     if "error" in results.keys():
         error_console.print(results["error"])
         ctx.exit(1)
+
+
+def show_datasets(
+    results: Dict[str, Any],
+    key: str,
+    title: str,
+    column: str,
+    filename: Optional[str],
+    plain: bool,
+    reverse: bool,
+) -> None:
+    """Display a list of datasets.
+
+    Datasets are sorted and shown in a table. With `plain`, they are streamed
+    one name per line as they are filtered, unsorted. Either way, the results
+    are written to `filename` as JSON, in the order shown.
+
+    Args:
+        results (Dict[str, Any]): Results from `functions.list`.
+        key (str): Key of the datasets in the results.
+        title (str): Title of the table.
+        column (str): Column of the table.
+        filename (Optional[str]): File to write the results to.
+        plain (bool): Print one dataset per line.
+        reverse (bool): Sort the table in reverse order.
+    """
+    if plain:
+        names = stream_names(results[key])
+        if filename:
+            with open(filename, "w") as file:
+                jsonstream.write({**results, key: names}, file, indent=None)
+        else:
+            for _ in names:
+                pass
+        return
+
+    results[key] = sorted(results[key], reverse=reverse)
+    if filename:
+        with open(filename, "w") as file:
+            jsonstream.write(results, file, indent=None)
+
+    table = Table(
+        title=title,
+        header_style="magenta",
+        title_style="bold magenta",
+    )
+    table.add_column(column, justify="center")
+    table.add_row("\t".join(results[key]))
+    with console.pager(styles=False):
+        console.print(table)
+
+
+def stream_names(names: Iterable[str]) -> Iterator[str]:
+    """Print dataset names one per line, in batches as they arrive.
+
+    Args:
+        names (Iterable[str]): Names of datasets.
+
+    Yields:
+        Iterator[str]: Names, once printed.
+    """
+    iterator = iter(names)
+    while True:
+        batch = [*islice(iterator, BATCH)]
+        if not batch:
+            return
+        click.echo("\n".join(batch))
+        yield from batch
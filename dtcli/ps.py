@@ -2,7 +2,16 @@
 
 import logging
 import os
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ThreadPoolExecutor,
+    wait,
+)
+from itertools import chain
 from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, TextIO, Tuple
 
 import click
 from requests.exceptions import SSLError
@@ -11,8 +20,13 @@ from rich.table import Table
 
 from dtcli.ls import list
 from dtcli.src import functions
-from dtcli.utilities import cadcclient
-from dtcli.utilities.utilities import check_canfar_status, set_log_level, validate_scope
+from dtcli.utilities import cadcclient, jsonstream, paths
+from dtcli.utilities.utilities import (
+    check_canfar_status,
+    imap_unordered,
+    set_log_level,
+    validate_scope,
+)
 
 logger = logging.getLogger("ps")
 
@@ -22,31 +36,58 @@ error_console = Console(stderr=True, style="bold red")
 
 @click.command(name="ps", help="Details of a dataset.")
 @click.argument("scope", required=True, type=click.STRING, nargs=1)
-@click.argument("dataset", required=True, type=click.STRING, nargs=1)
+@click.argument("datasets", required=False, type=click.STRING, nargs=-1)
 @click.option("-s", "--show-files", is_flag=True, help="Show file names.")
 @click.option("-v", "--verbose", count=True, help="Verbosity: v=INFO, vv=DEBUG.")
 @click.option("-q", "--quiet", is_flag=True, help="Set log level to ERROR.")
 @click.option("--json", "output_json", is_flag=True, help="Output as JSON.")
+@click.option(
+    "--file",
+    "-f",
+    "datasets_file",
+    type=click.File("r"),
+    default=None,
+    help="File of datasets, one per line, or - for stdin.",
+)
+@click.option("--jsonl", "output_jsonl", is_flag=True, help="Output as JSON lines.")
+@click.option(
+    "--compact", is_flag=True, help="Output JSON without indentation, with --json."
+)
+@click.option(
+    "--workers",
+    "-w",
+    type=click.IntRange(min=1),
+    default=8,
+    help="Number of concurrent queries.",
+)
 @click.pass_context
 def ps(  # noqa: C901
     ctx: click.Context,
     scope: str,
-    dataset: str,
+    datasets: Tuple[str, ...],
     show_files: bool,
     verbose: int,
     quiet: bool,
     output_json: bool,
+    datasets_file: Optional[TextIO] = None,
+    output_jsonl: bool = False,
+    compact: bool = False,
+    workers: int = 8,
 ):
-    """Detailed status of a dataset.
+    """Detailed status of a dataset, or a summary of many datasets.
 
     Args:
         ctx (click.Context): Click context.
         scope (str): Scope of dataset.
-        dataset (str): Name of dataset.
+        datasets (Tuple[str, ...]): Names of datasets.
         show_files (bool): Show list of files.
         verbose (int): Verbosity: v=INFO, vv=DUBUG.
         quiet (bool): Set log level to ERROR.
         output_json (bool): Output as JSON.
+        datasets_file (Optional[TextIO]): File of datasets, one per line.
+        output_jsonl (bool): Output as JSON lines.
+        compact (bool): Output JSON without indentation.
+        workers (int): Number of concurrent queries.
 
     Returns:
         None
@@ -55,10 +96,23 @@ def ps(  # noqa: C901
     set_log_level(logger, verbose, quiet)
     logger.debug("`ps` called with:")
     logger.debug(f"scope: {scope} [{type(scope)}]")
-    logger.debug(f"dataset: {dataset} [{type(dataset)}]")
+    logger.debug(f"datasets: {datasets} [{type(datasets)}]")
     logger.debug(f"show_files: {show_files} [{type(show_files)}]")
     logger.debug(f"verbose: {verbose} [{type(verbose)}]")
     logger.debug(f"quiet: {quiet} [{type(quiet)}]")
+    logger.debug(f"datasets_file: {datasets_file} [{type(datasets_file)}]")
+    logger.debug(f"output_jsonl: {output_jsonl} [{type(output_jsonl)}]")
+    logger.debug(f"compact: {compact} [{type(compact)}]")
+    logger.debug(f"workers: {workers} [{type(workers)}]")
+
+    # JSON lines are the batch output, whatever the number of datasets.
+    batch = datasets_file is not None or len(datasets) > 1 or output_jsonl
+    if not datasets and datasets_file is None:
+        raise click.UsageError("Missing argument 'DATASETS...'.")
+    if batch and (show_files or output_json):
+        raise click.UsageError(
+            "--show-files and --json need a single dataset without --jsonl."
+        )
 
     try:
         if not validate_scope(scope):
@@ -73,88 +127,307 @@ def ps(  # noqa: C901
     # Check Canfar status.
     check_canfar_status(error_console)
 
+    if batch:
+        names: Iterable[str] = datasets
+        if datasets_file:
+            names = chain(
+                datasets, (line.strip() for line in datasets_file if line.strip())
+            )
+        ps_batch(scope, names, workers, output_jsonl)
+        return None
+    dataset = datasets[0]
+    indent = None if compact else 2
+
+    executor = ThreadPoolExecutor(max_workers=3)
     try:
-        files, policies = functions.ps(scope, dataset, verbose, quiet)
-        if isinstance(files, str) or isinstance(policies, str):
-            if output_json:
-                import json
-
-                print(
-                    json.dumps(
-                        {"error": {"files": str(files), "policies": str(policies)}},
-                        indent=2,
-                    )
-                )
-                ctx.exit(1)
-            error_console.print("Error: files = ", files)
-            error_console.print("Error: policies = ", policies)
+        files_future, policies_future = functions.submit_ps(
+            executor, scope, dataset, verbose, quiet
+        )
+        if not output_json and not show_files:
+            show_status(dataset, scope, files_future, policies_future, executor)
             return None
+        files, policies = files_future.result(), policies_future.result()
     except Exception as e:
         if output_json:
-            import json
-
-            print(json.dumps({"error": str(e)}, indent=2))
+            jsonstream.write({"error": str(e)}, indent=indent)
             ctx.exit(1)
         error_console.print(e)
         return None
+    finally:
+        executor.shutdown(wait=False)
+
+    if isinstance(files, str) or isinstance(policies, str):
+        if output_json:
+            jsonstream.write(
+                {"error": {"files": str(files), "policies": str(policies)}},
+                indent=indent,
+            )
+            ctx.exit(1)
+        error_console.print("Error: files = ", files)
+        error_console.print("Error: policies = ", policies)
+        return None
 
     # Handle JSON output
     if output_json:
-        import json
-
         result = {
             "dataset": dataset,
             "scope": scope,
             "files": files,
             "policies": policies,
         }
-        print(json.dumps(result, indent=2))
+        jsonstream.write(result, indent=indent)
         return None
 
-    if show_files and files:
+    if files:
         # Files table
         file_table = create_files_table(dataset, scope, files)
 
         with console.pager():
             logger.debug("Showing file table.")
             console.print(file_table)
-        return None
+    elif policies:
+        console.print(create_policy_table(dataset, scope, policies))
+    return None
 
-    if files and ("error" in files.keys()):
-        error_console.print(files["error"])
-        return None
 
-    # Info table
-    elif files:
-        if len(files["file_replica_locations"]) < 1:
-            unregistered_info = functions.get_unregistered_dataset(dataset, scope)
-            if unregistered_info:
-                console.print(
-                    f":warning: {dataset} is an unregistered dataset :warning:",
-                    style="bold yellow",
-                    justify="center",
-                )
-                console.print(
-                    f"Parent dataset: [bold red]{unregistered_info['results']['attach_to_dataset']}[/]"  # noqa: E501
-                )
+def show_status(
+    dataset: str,
+    scope: str,
+    files_future: Future,
+    policies_future: Future,
+    executor: Executor,
+) -> None:
+    """Show the info and policy tables of a dataset as each part arrives.
+
+    The size of the files at Minoc is queried as soon as the files arrive, while
+    the policies may still be in flight.
+
+    Args:
+        dataset (str): Name of dataset.
+        scope (str): Scope of dataset.
+        files_future (Future): Future of the dataset files.
+        policies_future (Future): Future of the dataset policies.
+        executor (Executor): Executor for the size query.
+    """
+    pending: Dict[Future, str] = {files_future: "files", policies_future: "policies"}
+    while pending:
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            part = pending.pop(future)
+            if part == "policies":
+                policies = future.result()
+                if isinstance(policies, str):
+                    error_console.print("Error: policies = ", policies)
+                elif policies:
+                    logger.debug("Showing policy table.")
+                    console.print(create_policy_table(dataset, scope, policies))
+            elif part == "files":
+                files = future.result()
+                if isinstance(files, str):
+                    error_console.print("Error: files = ", files)
+                elif files and len(files["file_replica_locations"]) < 1:
+                    show_unregistered(dataset, scope)
+                elif files:
+                    prefix = minoc_prefix(files)
+                    if prefix is None:
+                        console.print(create_info_table(dataset, scope, files, 0))
+                    else:
+                        size = executor.submit(cadcclient.prefix_stats, [prefix])
+                        pending[size] = prefix
+            else:
+                try:
+                    _, size = future.result()[part]
+                except SSLError as error:
+                    logger.error(error)
+                    error_console.print(
+                        """
+No valid CADC certificate found.
+Create one using 'cadc-get-cert -u <USERNAME>'.
+"""
+                    )
+                    continue
+                logger.debug("Showing info table.")
                 console.print(
-                    f"Reason it cannot be registered: [bold red]{unregistered_info['results']['reason']}[/]\n"  # noqa: E501
+                    create_info_table(dataset, scope, files_future.result(), size)
                 )
 
-        else:
-            info_table = create_info_table(dataset, scope, files)
-            logger.debug("Showing info table.")
-            console.print(info_table)
 
-    # Policy table
-    if policies:
-        policy_table = create_policy_table(dataset, scope, policies)
-        logger.debug("Showing policy table.")
-        console.print(policy_table)
+def show_unregistered(dataset: str, scope: str) -> None:
+    """Show why a dataset could not be registered, if it is unregistered.
+
+    Args:
+        dataset (str): Name of dataset.
+        scope (str): Scope of dataset.
+    """
+    unregistered_info = functions.get_unregistered_dataset(dataset, scope)
+    if unregistered_info:
+        console.print(
+            f":warning: {dataset} is an unregistered dataset :warning:",
+            style="bold yellow",
+            justify="center",
+        )
+        console.print(
+            f"Parent dataset: [bold red]{unregistered_info['results']['attach_to_dataset']}[/]"  # noqa: E501
+        )
+        console.print(
+            f"Reason it cannot be registered: [bold red]{unregistered_info['results']['reason']}[/]\n"  # noqa: E501
+        )
+
+
+def minoc_prefix(files: Dict[str, Any]) -> Optional[str]:
+    """Common path of the files of a dataset at Minoc.
+
+    Args:
+        files (Dict[str, Any]): Files of the dataset.
+
+    Returns:
+        Optional[str]: Common path, or None if there are no files at Minoc.
+    """
+    se_files = files["file_replica_locations"].get("minoc")
+    if not se_files:
+        return None
+    return "/" + paths.FileMap(se_files).common_path()
 
 
-def create_info_table(dataset: str, scope: str, files: dict):
-    """Create info table."""
+def summarise_dataset(
+    scope: str, dataset: str, client: Optional[Any] = None
+) -> Dict[str, Any]:
+    """Summarise the replicas, size and policies of a dataset.
+
+    Args:
+        scope (str): Scope of dataset.
+        dataset (str): Name of dataset.
+        client (Optional[Any]): Shared Luskan query client. Without one, the
+            size at Minoc is not queried.
+
+    Returns:
+        Dict[str, Any]: Number of 'files' per storage element, 'minoc_bytes',
+            the 'replication' storage elements, 'deletion' days per storage
+            element and the larger datasets it 'belongs_to'.
+    """
+    files, policies = functions.ps(scope, dataset, quiet=True)
+    if isinstance(files, str) or isinstance(policies, str):
+        raise RuntimeError(str(files if isinstance(files, str) else policies))
+    record: Dict[str, Any] = {"dataset": dataset, "scope": scope}
+    if files is None:
+        record["error"] = f"Could not find files for {dataset} {scope}."
+    locations = (files or {}).get("file_replica_locations", {})
+    record["files"] = {se: len(paths) for se, paths in locations.items()}
+    prefix = minoc_prefix(files) if files else None
+    record["minoc_bytes"] = None
+    if prefix and client is not None:
+        _, record["minoc_bytes"] = cadcclient.prefix_stats([prefix], client=client)[
+            prefix
+        ]
+    policies = policies or {}
+    record["replication"] = policies.get("replication_policy", {}).get(
+        "preferred_storage_elements", []
+    )
+    record["deletion"] = {
+        dp["storage_element"]: dp["delete_after_days"]
+        for dp in policies.get("deletion_policy", [])
+    }
+    record["belongs_to"] = [lgr_ds["name"] for lgr_ds in policies.get("belongs_to", [])]
+    return record
+
+
+def ps_batch(
+    scope: str, datasets: Iterable[str], workers: int, output_jsonl: bool = False
+) -> List[Dict[str, Any]]:
+    """Summarise many datasets concurrently.
+
+    With `output_jsonl`, a JSON line is printed for each dataset as it
+    completes, otherwise a table of all datasets is shown at the end. Datasets
+    that fail are reported with an 'error' instead of stopping the batch.
+
+    Args:
+        scope (str): Scope of datasets.
+        datasets (Iterable[str]): Names of datasets, consumed lazily.
+        workers (int): Number of concurrent queries.
+        output_jsonl (bool): Output as JSON lines.
+
+    Returns:
+        List[Dict[str, Any]]: Summary of every dataset.
+    """
+    try:
+        client = cadcclient.query_client()
+    except Exception as error:
+        logger.warning(f"Sizes at Minoc unavailable: {error}")
+        client = None
+
+    records: List[Dict[str, Any]] = []
+    status = console.status("Summarising datasets...")
+    if not output_jsonl:
+        status.start()
+    try:
+        for dataset, future in imap_unordered(
+            lambda dataset: summarise_dataset(scope, dataset, client), datasets, workers
+        ):
+            try:
+                record = future.result()
+            except Exception as error:
+                record = {"dataset": dataset, "scope": scope, "error": str(error)}
+            records.append(record)
+            if output_jsonl:
+                print(jsonstream.dumps(record), flush=True)
+            else:
+                status.update(f"Summarised {len(records)} datasets...")
+    finally:
+        status.stop()
+
+    if not output_jsonl:
+        console.print(create_batch_table(scope, records))
+        failed = sum("error" in record for record in records)
+        if failed:
+            error_console.print(f"{failed} of {len(records)} datasets failed.")
+    return records
+
+
+def create_batch_table(scope: str, records: List[Dict[str, Any]]) -> Table:
+    """Create a table summarising many datasets.
+
+    Args:
+        scope (str): Scope of datasets.
+        records (List[Dict[str, Any]]): Summaries from `summarise_dataset`.
+
+    Returns:
+        Table: Table with a row per dataset, sorted by name.
+    """
+    table = Table(
+        title=f"Datatrail: {len(records)} datasets in {scope}",
+        header_style="magenta",
+        title_style="bold magenta",
+    )
+    table.add_column("Dataset", style="bold")
+    table.add_column("Files per SE", style="green")
+    table.add_column("Size at Minoc [GB]", style="green", justify="right")
+    table.add_column("Replication")
+    table.add_column(r"Delete After \[days]")
+    table.add_column("Belongs to")
+    for record in sorted(records, key=lambda record: record["dataset"]):
+        if "files" not in record:
+            table.add_row(record["dataset"], f"[bold red]{record['error']}[/]")
+            continue
+        size = record["minoc_bytes"]
+        files = ", ".join(f"{se} {count}" for se, count in record["files"].items())
+        table.add_row(
+            record["dataset"],
+            f"[bold red]{record['error']}[/]" if "error" in record else files or "-",
+            "-" if size is None else f"{size / 1024**3:.2f}",
+            ", ".join(record["replication"]) or "-",
+            ", ".join(f"{se} {days}" for se, days in record["deletion"].items()) or "-",
+            ", ".join(record["belongs_to"]) or "-",
+        )
+    return table
+
+
+def create_info_table(
+    dataset: str, scope: str, files: dict, minoc_size: Optional[int] = None
+):
+    """Create info table.
+
+    The size of the files at Minoc is queried, unless given in bytes.
+    """
     logger.debug("Creating info table.")
     info_table = Table(
         title=f"Datatrail: {dataset} {scope} at SEs",
@@ -168,13 +441,10 @@ def create_info_table(dataset: str, scope: str, files: dict):
         logger.debug(f"Creating row for: {se}")
         se_files = files["file_replica_locations"][se]
         if se == "minoc":
-            se_files = [f.replace("cadc:CHIMEFRB", "") for f in se_files]
-            # Make sure starts with a /
-            common_path = os.path.commonpath(
-                ["/" + f if not f.startswith("/") else f for f in se_files]
-            )
+            common_path = minoc_prefix(files)
             try:
-                size = cadcclient.size(common_path)
+                if minoc_size is None:
+                    _, minoc_size = cadcclient.prefix_stats([common_path])[common_path]
             except SSLError as error:
                 logger.error(error)
                 error_console.print(
@@ -184,7 +454,7 @@ Create one using 'cadc-get-cert -u <USERNAME>'.
 """
                 )
                 return None
-            info_table.add_row(se, f"{len(se_files)}", f"{size:.2f}")
+            info_table.add_row(se, f"{len(se_files)}", f"{minoc_size / 1024**3:.2f}")
         else:
             info_table.add_row(se, f"{len(se_files)}", "Not available")
     return info_table
@@ -244,6 +514,32 @@ def create_policy_table(dataset: str, scope: str, policies: dict):
     return policy_table
 
 
+def relative_names(paths: List[str]) -> Tuple[str, List[str]]:
+    """Common path of files, and their names relative to it.
+
+    Args:
+        paths (List[str]): Paths of files.
+
+    Returns:
+        Tuple[str, List[str]]: Common path and relative names.
+    """
+    # The common characters of the first and last paths are common to all of
+    # them. Slicing from it is much cheaper than os.path.commonpath and
+    # Path.relative_to, which only matter for paths that are not normalised.
+    first, last = min(paths), max(paths)
+    prefix = os.path.commonprefix([first, last])
+    stop = len(prefix)
+    if not all(p[stop : stop + 1] in ("", "/") for p in paths):  # noqa: E203
+        stop = prefix.rfind("/")
+    if stop <= 0 or any(
+        len(p) == stop or p.endswith("/") or "//" in p or "." in p[:1] or "/." in p
+        for p in paths
+    ):
+        common_path = os.path.commonpath(paths)
+        return common_path, [str(Path(_).relative_to(common_path)) for _ in paths]
+    return prefix[:stop], [p[stop + 1 :] for p in paths]  # noqa: E203
+
+
 def create_files_table(dataset: str, scope: str, files: dict):
     """Create files table."""
     logger.debug("Creating files table.")
@@ -256,10 +552,7 @@ def create_files_table(dataset: str, scope: str, files: dict):
     )
 
     for se in files["file_replica_locations"]:
-        common_path = os.path.commonpath(files["file_replica_locations"][se])
-        names = [
-            Path(_).relative_to(common_path) for _ in files["file_replica_locations"][se]
-        ]
+        common_path, names = relative_names(files["file_replica_locations"][se])
         for idx, fn in enumerate(names):
             if idx == 0:
                 file_table.add_row(f"Storage Element: [magenta]{se}")
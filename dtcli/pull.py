@@ -2,6 +2,7 @@
 
 import logging
 from os import cpu_count, path
+from typing import Iterator, List, Union
 
 import click
 from requests.exceptions import ConnectionError, SSLError
@@ -9,8 +10,12 @@ from rich.console import Console
 from rich.prompt import Confirm
 
 from dtcli.config import procure
-from dtcli.src.functions import find_missing_dataset_files, get_files
-from dtcli.utilities import cadcclient
+from dtcli.src.functions import (
+    clear_dataset_path,
+    find_missing_dataset_files,
+    get_files,
+)
+from dtcli.utilities import cadcclient, ledger, paths
 from dtcli.utilities.utilities import check_canfar_status, set_log_level, validate_scope
 
 logger = logging.getLogger("pull")
@@ -47,6 +52,11 @@ error_console = Console(stderr=True, style="bold red")
     default=1,
     help="Number of parallel fetch processes to use.",
 )
+@click.option(
+    "--evict",
+    is_flag=True,
+    help="Clear least-recently-used datasets to make room.",
+)
 @click.option("-v", "--verbose", count=True, help="Verbosity: v=INFO, vv=DEBUG.")
 @click.option("-q", "--quiet", is_flag=True, help="Set log level to ERROR.")
 @click.option("--force", "-f", is_flag=True, help="Do not prompt for confirmation.")
@@ -58,6 +68,7 @@ def pull(  # noqa: C901
     directory: str,
     specific: str,
     cores: int,
+    evict: bool,
     verbose: int,
     quiet: bool,
     force: bool,
@@ -71,6 +82,7 @@ def pull(  # noqa: C901
         directory (str): Directory to pull data to.
         specific (str): Path to file of specific files to pull.
         cores(int): Number of parallel fetch processes to use.
+        evict (bool): Clear least-recently-used datasets to make room.
         verbose (int): Verbosity: v=INFO, vv=DUBUG.
         quiet (bool): Minimal logging.
         force (bool): Automatically download files.
@@ -130,17 +142,17 @@ def pull(  # noqa: C901
         console.print(f"\nConsidering only specific files list in {specific}")
         with open(specific) as sf:
             specific_paths = [line.strip() for line in sf if line.strip()]
-        files["missing"] = [
-            path
-            for path in files["missing"]
-            if any(spec_path in path for spec_path in specific_paths)
-        ]
+        files["missing"] = files["missing"].select(
+            lambda path: any(spec_path in path for spec_path in specific_paths)
+        )
         console.print(f"\nFound {len(files['missing'])} to download")
-    files_paths = [f.replace("cadc:CHIMEFRB", "") for f in files["missing"]]
-    if len(files_paths) > 0 and luskan_up:
-        common_path = path.commonpath(["/" + f for f in files_paths])
+    if len(files["missing"]) > 0 and luskan_up:
+        # Only the missing files count, not all the files under their path.
         try:
-            to_download_size = cadcclient.size(common_path)
+            to_download_bytes = cadcclient.files_size(
+                files["missing"].uris(), files["missing"].common_path()
+            )
+            to_download_size = to_download_bytes / 1024**3
         except SSLError:
             error_console.print(
                 """
@@ -172,10 +184,27 @@ Create one using 'cadc-get-cert -u <USERNAME>'.
             style="yellow",
         )
 
+    # Check there is enough free space for the download.
+    required = int(max(to_download_size, 0) * 1024**3)
+    free = ledger.free_space(directory)
+    if required > free:
+        console.print(
+            f"     - Free space at {directory}: {free / 1024**3:.2f} GB.",
+            style="red",
+        )
+        if not evict:
+            error_console.print(
+                "Not enough free space for download. "
+                "Use `--evict` to clear least-recently-used datasets."
+            )
+            ctx.exit(1)
+            return None
+
     # Confirm download.
     if force:
         is_download = True
     elif to_download_size == 0:
+        ledger.touch(scope, dataset)
         return None
     else:
         is_download = Confirm.ask(
@@ -184,6 +213,11 @@ Create one using 'cadc-get-cert -u <USERNAME>'.
 
     # Download missing files.
     if is_download:
+        if required > free and not make_room(
+            scope, dataset, site, directory, required, free, verbose, quiet, force
+        ):
+            ctx.exit(1)
+            return None
         get_files(
             files["missing"],
             site=site,
@@ -192,12 +226,101 @@ Create one using 'cadc-get-cert -u <USERNAME>'.
             verbose=verbose,
         )
         # Check that all files have been downloaded.
-        for f in files["missing"]:
-            local_path = path.join(directory, f.replace("cadc:CHIMEFRB", ""))
-            if not path.exists(local_path):
-                error_console.print(
-                    f"File not downloaded: {local_path}",
-                    style="bold red",
-                )
-                ctx.exit(1)
+        for local_path in undownloaded(files["missing"], directory):
+            error_console.print(
+                f"File not downloaded: {local_path}",
+                style="bold red",
+            )
+            ctx.exit(1)
+        # Record local usage of the dataset.
+        local_files = [
+            path.abspath(f)
+            for view in (files["existing"], files["missing"])
+            for f in view.destinations(directory)
+        ]
+        common_path = path.commonpath([path.dirname(f) for f in local_files])
+        ledger.record(scope, dataset, common_path, local_files)
     return None
+
+
+def undownloaded(
+    files: Union[List[str], paths.FileView], directory: str
+) -> Iterator[str]:
+    """Local paths of files that are missing after a download.
+
+    Args:
+        files (Union[List[str], paths.FileView]): Minoc paths or URIs of the
+            files downloaded.
+        directory (str): Directory the files were downloaded to.
+
+    Yields:
+        Iterator[str]: Local path of each file not found.
+    """
+    for local_path in paths.view(files).destinations(directory):
+        if not path.exists(local_path):
+            yield local_path
+
+
+def make_room(
+    scope: str,
+    dataset: str,
+    site: str,
+    directory: str,
+    required: int,
+    free: int,
+    verbose: int,
+    quiet: bool,
+    force: bool,
+) -> bool:
+    """Clear least-recently-used datasets until a download fits.
+
+    Args:
+        scope (str): Scope of dataset being pulled.
+        dataset (str): Name of dataset being pulled.
+        site (str): Local machine.
+        directory (str): Directory the dataset is downloaded to.
+        required (int): Bytes needed for the download.
+        free (int): Bytes currently free.
+        verbose (int): Verbosity level.
+        quiet (bool): Quiet mode.
+        force (bool): Do not prompt for confirmation.
+
+    Returns:
+        bool: True if enough space was made.
+    """
+    if site not in ["local", "canfar"]:
+        error_console.print("Eviction not permitted at Chime or Outriggers!")
+        return False
+    candidates = ledger.eviction_candidates(
+        required, free, directory, exclude=ledger.key(scope, dataset)
+    )
+    if candidates is None:
+        error_console.print(
+            "Not enough free space, even after clearing all recorded datasets "
+            f"on the volume of {directory}."
+        )
+        return False
+    console.print("Datasets to clear, least recently used first:", style="bold")
+    for entry in candidates:
+        console.print(
+            f" - {entry['dataset']} {entry['scope']}: "
+            f"{entry['bytes'] / 1024**3:.2f} GB at {entry['path']}"
+        )
+    if not force and not Confirm.ask("⚠️  Delete these datasets?"):
+        console.print("Roger roger, no files deleted.")
+        return False
+    for entry in candidates:
+        if clear_dataset_path(entry["path"], False, verbose, quiet):
+            ledger.forget(entry["scope"], entry["dataset"])
+        else:
+            error_console.print(f"Unable to clear {entry['path']}.")
+            return False
+    # The ledger may be out of date, so check the space actually freed.
+    free = ledger.free_space(directory)
+    if free < required:
+        error_console.print(
+            f"Still not enough free space at {directory}: "
+            f"{free / 1024**3:.2f} GB free, {required / 1024**3:.2f} GB needed."
+        )
+        return False
+    return True
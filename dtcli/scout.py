@@ -1,19 +1,29 @@
 """Datatrail Scout Command."""
 
+import json
 import logging
-from typing import List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, TextIO
 
 import click
 import requests
+from cadctap import CadcTapClient
 from cadcutils.exceptions import BadRequestException
 from rich.console import Console
+from rich.live import Live
 from rich.prompt import Confirm
 from rich.table import Table
 
 from dtcli.config import procure
 from dtcli.ls import list as ls
-from dtcli.utilities import cadcclient
-from dtcli.utilities.utilities import check_canfar_status, set_log_level, validate_scope
+from dtcli.src import functions
+from dtcli.utilities import cadcclient, http, paths
+from dtcli.utilities.utilities import (
+    check_canfar_status,
+    imap_unordered,
+    set_log_level,
+    validate_scope,
+)
 
 logger = logging.getLogger("scout")
 
@@ -23,14 +33,46 @@ error_console = Console(stderr=True, style="bold red")
 
 @click.command(name="scout", help="Scout a dataset.")
 @click.argument("scopes", required=False, type=click.STRING, nargs=-1)
-@click.argument("dataset", required=True, type=click.STRING, nargs=1)
+@click.argument("dataset", required=False, type=click.STRING, nargs=1)
+@click.option(
+    "--file",
+    "-f",
+    "datasets_file",
+    type=click.File("r"),
+    default=None,
+    help="File of datasets, one per line, or - for stdin.",
+)
+@click.option(
+    "--children",
+    "-c",
+    "parent",
+    type=click.STRING,
+    default=None,
+    help="Scout the children of a larger dataset.",
+)
+@click.option("--jsonl", "output_jsonl", is_flag=True, help="Output as JSON lines.")
+@click.option("--heal", is_flag=True, help="Heal discrepancies found.")
+@click.option("--yes", "-y", is_flag=True, help="Do not prompt for confirmation.")
+@click.option(
+    "--workers",
+    "-w",
+    type=click.IntRange(min=1),
+    default=4,
+    help="Number of concurrent queries.",
+)
 @click.option("-v", "--verbose", count=True, help="Verbosity: v=INFO, vv=DEBUG.")
 @click.option("-q", "--quiet", is_flag=True, help="Set log level to ERROR.")
 @click.pass_context
 def scout(  # noqa: C901
     ctx: click.Context,
     scopes: List[str],
-    dataset: str,
+    dataset: Optional[str],
+    datasets_file: Optional[TextIO],
+    parent: Optional[str],
+    output_jsonl: bool,
+    heal: bool,
+    yes: bool,
+    workers: int,
     verbose: int,
     quiet: bool,
 ):
@@ -39,7 +81,13 @@ def scout(  # noqa: C901
     Args:
         ctx (click.Context): Click context.
         scopes (List[str]): Scopes of dataset.
-        dataset (str): Name of dataset.
+        dataset (Optional[str]): Name of dataset.
+        datasets_file (Optional[TextIO]): File of datasets to scout, one per line.
+        parent (Optional[str]): Larger dataset whose children to scout.
+        output_jsonl (bool): Output as JSON lines.
+        heal (bool): Heal discrepancies found.
+        yes (bool): Do not prompt for confirmation.
+        workers (int): Number of concurrent queries.
         verbose (int): Verbosity: v=INFO, vv=DUBUG.
         quiet (bool): Set log level to ERROR.
 
@@ -51,12 +99,32 @@ def scout(  # noqa: C901
     logger.debug("`scout` called with:")
     logger.debug(f"scopes: {scopes} [{type(scopes)}]")
     logger.debug(f"dataset: {dataset} [{type(dataset)}]")
+    logger.debug(f"datasets_file: {datasets_file} [{type(datasets_file)}]")
+    logger.debug(f"parent: {parent} [{type(parent)}]")
+    logger.debug(f"output_jsonl: {output_jsonl} [{type(output_jsonl)}]")
+    logger.debug(f"heal: {heal} [{type(heal)}]")
+    logger.debug(f"yes: {yes} [{type(yes)}]")
     logger.debug(f"verbose: {verbose} [{type(verbose)}]")
     logger.debug(f"quiet: {quiet} [{type(quiet)}]")
 
+    # With many datasets, every positional argument is a scope.
+    scopes = [_ for _ in scopes]
+    batch = datasets_file is not None or parent is not None
+    if batch and dataset:
+        scopes.append(dataset)
+    elif not batch and not dataset:
+        raise click.UsageError("Missing argument 'DATASET'.")
+    if parent and not scopes:
+        raise click.UsageError("--children requires a scope.")
+    if output_jsonl and heal and not yes:
+        raise click.UsageError("--heal with --jsonl requires --yes.")
+    if datasets_file is not None and datasets_file.name == "<stdin>":
+        if heal and not yes:
+            raise click.UsageError("--heal with datasets from stdin requires --yes.")
+
     # Check if scopes are valid.
     if scopes:
-        logger.debug(f"Scopes limited to: {list(scopes)}")
+        logger.debug(f"Scopes limited to: {scopes}")
         try:
             if not all([validate_scope(scope) for scope in scopes]):
                 error_console.print("A scope is invalid.")
@@ -81,7 +149,103 @@ def scout(  # noqa: C901
     # Check Canfar status.
     check_canfar_status(error_console)
 
+    try:
+        client = cadcclient.query_client()
+    except Exception as error:
+        error_console.print(error)
+        return None
+
+    if batch or output_jsonl:
+        if not batch:
+            # JSON lines are the batch output, even for a single dataset.
+            datasets: Iterable[str] = [str(dataset)]
+        elif datasets_file:
+            datasets = (line.strip() for line in datasets_file if line.strip())
+        else:
+            children = functions.list(scopes[0], parent, verbose, quiet)
+            if "error" in children:
+                error_console.print(children["error"])
+                ctx.exit(1)
+                return None
+            datasets = children["datasets"]
+        scout_batch(server, datasets, scopes, client, workers, heal, yes, output_jsonl)
+        return None
+
     # Scout dataset.
+    try:
+        data = query_scout(server, dataset, scopes)
+    except RuntimeError as error:
+        error_console.print(error)
+        return None
+
+    try:
+        with Live(
+            create_scout_table(dataset, data),
+            console=console,
+            auto_refresh=False,
+            transient=True,
+        ) as live:
+            count_minoc_files(data, client, workers)
+            live.update(create_scout_table(dataset, data), refresh=True)
+    except BadRequestException as error:
+        error_console.print("Query failed.")
+        error_console.print(error)
+        return None
+    except Exception as error:
+        error_console.print("Query failed.")
+        error_console.print(error)
+        return None
+    show_scout_results(dataset, data)
+
+    file_discrepancies = find_discrepancies(data)
+    if file_discrepancies:
+        error_console.print("File discrepancies:")
+    to_heal: List[List] = []
+    for scope, se in file_discrepancies:
+        error_console.print(f" - {se}: {scope}")
+        # As with many datasets, --yes alone never heals.
+        if (heal and yes) or (
+            not yes
+            and Confirm.ask("\nWould you like to attempt to heal this discrepancy?")
+        ):
+            to_heal.append([scope, se])
+    if not to_heal:
+        return None
+
+    # Heal every discrepancy concurrently.
+    with ThreadPoolExecutor(max_workers=min(workers, len(to_heal))) as executor:
+        futures = [
+            executor.submit(
+                heal_discrepancy, server, dataset, scope, se, data[scope], client
+            )
+            for scope, se in to_heal
+        ]
+        for (scope, se), future in zip(to_heal, futures):
+            try:
+                healed = future.result()
+                console.print(f"{scope} - Healing successful ({healed} files).")
+            except Exception as error:
+                error_console.print(f"{scope} - Healing failed.")
+                logger.error(error)
+
+
+def query_scout(server: str, dataset: str, scopes: List[str]) -> Dict[str, Any]:
+    """Query Datatrail for the files expected and observed for a dataset.
+
+    The storage elements observed and expected are reconciled for every scope,
+    with the Minoc counts left pending as None.
+
+    Args:
+        server: Datatrail server URL.
+        dataset: Name of dataset.
+        scopes: Scopes to limit the scout to, all scopes if empty.
+
+    Raises:
+        RuntimeError: If the server returns an error.
+
+    Returns:
+        Dict[str, Any]: Scout data keyed by scope.
+    """
     endpoint = (
         f"/query/dataset/scout?name={dataset}"
         if not scopes
@@ -89,41 +253,20 @@ def scout(  # noqa: C901
     )
     url = server + endpoint
     logger.debug(f"URL: {url}")
-    response = requests.get(url)
+    response = http.session().get(url)
     try:
         data = response.json()
         logger.debug(f"Data: {data}")
     except requests.JSONDecodeError:
         if "Response Timeout" in response.text:
-            error_console.print("Error: Datatrail server timed out.")
-            return None
-        else:
-            error_console.print(f"Error: {response.text}")
-            return None
+            raise RuntimeError("Error: Datatrail server timed out.")
+        raise RuntimeError(f"Error: {response.text}")
 
     if "error" in data.keys():
-        error_console.print(data["error"])
-        return None
-
-    storage_elements = list(data[scopes[0]]["observed"].keys())
-    file_discrepancies: List[List] = []
+        raise RuntimeError(data["error"])
 
     for scope in data.keys():
-        basepath = data.get(scope).get("basepath")
-        query = f"select count(*) from inventory.Artifact where uri like 'cadc:CHIMEFRB/{basepath}%'"  # noqa: E501
-        try:
-            count, _ = cadcclient.query(query)
-            count = int(count[0])
-        except BadRequestException as error:
-            error_console.print("Query failed.")
-            error_console.print(error)
-            return None
-        except Exception as error:
-            error_console.print("Query failed.")
-            error_console.print(error)
-            return None
-        data[scope]["observed"]["minoc"] = count
-
+        data[scope]["observed"]["minoc"] = None
         keys_missing_in_observed = list(
             set(data[scope]["expected"].keys()) - set(data[scope]["observed"].keys())
         )
@@ -136,52 +279,303 @@ def scout(  # noqa: C901
 
         for key in keys_missing_in_expected:
             data[scope]["expected"][key] = 0
+    return data
 
-        for se in storage_elements:
+
+def count_minoc_files(data: dict, client: CadcTapClient, workers: int) -> None:
+    """Count the files at Minoc for every scope with one grouped Luskan query.
+
+    Args:
+        data: Scout data, updated in place with the Minoc counts.
+        client: Shared Luskan query client.
+        workers: Maximum number of concurrent queries, if Luskan cannot count
+            all scopes in one query.
+    """
+    basepaths = {scope: data[scope]["basepath"] for scope in data.keys()}
+    stats = cadcclient.prefix_stats(
+        [_ for _ in basepaths.values()], client=client, workers=workers
+    )
+    for scope, basepath in basepaths.items():
+        data[scope]["observed"]["minoc"] = stats[basepath][0]
+
+
+def find_discrepancies(data: dict) -> List[List]:
+    """Find the storage elements with more files observed than expected.
+
+    Args:
+        data: Scout data.
+
+    Returns:
+        List[List]: Pairs of scope and storage element.
+    """
+    file_discrepancies: List[List] = []
+    for scope in data.keys():
+        for se in data[scope]["observed"].keys():
             if data[scope]["observed"][se] > data[scope]["expected"][se]:
                 file_discrepancies.append([scope, se])
+    return file_discrepancies
 
-    show_scout_results(dataset, data)
 
-    if file_discrepancies:
-        error_console.print("File discrepancies:")
-    for scope, se in file_discrepancies:
-        error_console.print(f" - {se}: {scope}")
-        ifHeal = Confirm.ask("\nWould you like to attempt to heal this discrepancy?")
-        if ifHeal:
-            basepath = data.get(scope).get("basepath")
-            file_type = data.get(scope).get("filetype")
-            if se == "minoc":
-                file_md5s = cadcclient.dataset_md5s(basepath)
-                # console.print(minoc_md5s)
-            else:
-                md5_url = (
-                    server
-                    + "/query/datasset/scout/md5sums"
-                    + f"?basepath={basepath}&site={se}&filetype={file_type}"
-                )
-                response = requests.get(md5_url)
-                file_md5s = response.json()
-            url = (
-                server
-                + "/commit/dataset/scout/sync"
-                + f"?name={dataset}&scope={scope}&replicate_to={se}"
+def fetch_md5s(
+    server: str, info: dict, se: str, client: CadcTapClient, fresh: bool = False
+) -> Dict[str, str]:
+    """Fetch the md5sums of a dataset's files at a storage element.
+
+    Args:
+        server: Datatrail server URL.
+        info: Scout data for the scope of the dataset.
+        se: Storage element.
+        client: Shared Luskan query client.
+        fresh: List Minoc rather than use the artifact cache.
+
+    Returns:
+        Dict[str, str]: File paths and their md5sums.
+    """
+    basepath = info.get("basepath")
+    file_type = info.get("filetype")
+    if se == "minoc":
+        return cadcclient.dataset_md5s(basepath, client=client, fresh=fresh)
+    md5_url = (
+        server
+        + "/query/datasset/scout/md5sums"
+        + f"?basepath={basepath}&site={se}&filetype={file_type}"
+    )
+    response = http.session().get(md5_url)
+    return response.json()
+
+
+def md5_delta(observed: Dict[str, str], expected: Iterable[str]) -> Dict[str, str]:
+    """Files observed at a storage element that Datatrail does not expect there.
+
+    Args:
+        observed: File paths and md5sums observed at the storage element.
+        expected: File paths or URIs Datatrail has registered there.
+
+    Returns:
+        Dict[str, str]: File paths and md5sums missing from Datatrail.
+    """
+    registered = {paths.relative(path) for path in expected}
+    return {
+        path: md5
+        for path, md5 in observed.items()
+        if paths.relative(path) not in registered
+    }
+
+
+def heal_discrepancy(
+    server: str,
+    dataset: str,
+    scope: str,
+    se: str,
+    info: dict,
+    client: CadcTapClient,
+) -> int:
+    """Register the replicas of files observed, but not expected, at a storage element.
+
+    Only the files missing from Datatrail are sent to the server. Minoc is
+    listed afresh, so that a stale cache never registers deleted files.
+
+    Args:
+        server: Datatrail server URL.
+        dataset: Name of dataset.
+        scope: Scope of dataset.
+        se: Storage element.
+        info: Scout data for the scope of the dataset.
+        client: Shared Luskan query client.
+
+    Raises:
+        RuntimeError: If the server fails to heal the discrepancy.
+
+    Returns:
+        int: Number of files healed.
+    """
+    observed = fetch_md5s(server, info, se, client, fresh=True)
+    files = functions.get_dataset_file_info(scope, dataset, base_url=server)
+    if "error" in files:
+        raise RuntimeError(files["error"])
+    expected = files["file_replica_locations"].get(se, [])
+    delta = md5_delta(observed, expected)
+    logger.info(
+        f"{dataset} {scope} {se}: {len(observed)} observed, {len(delta)} to heal."
+    )
+    if not delta:
+        return 0
+    url = (
+        server
+        + "/commit/dataset/scout/sync"
+        + f"?name={dataset}&scope={scope}&replicate_to={se}"
+    )
+    response = http.session().post(url, json=delta)
+    if response.status_code != 200:
+        raise RuntimeError(f"{response.status_code}: {response.text}")
+    return len(delta)
+
+
+def scout_batch(
+    server: str,
+    datasets: Iterable[str],
+    scopes: List[str],
+    client: CadcTapClient,
+    workers: int,
+    heal: bool,
+    yes: bool,
+    output_jsonl: bool = False,
+) -> List[Dict[str, Any]]:
+    """Scout, and optionally heal, many datasets concurrently.
+
+    Results are streamed as each dataset completes, either as a line per
+    dataset or as JSON lines. With `yes`, discrepancies are healed as soon as
+    they are found, otherwise after a single confirmation at the end.
+
+    Args:
+        server: Datatrail server URL.
+        datasets: Names of datasets, consumed lazily.
+        scopes: Scopes to limit the scout to, all scopes if empty.
+        client: Shared Luskan query client.
+        workers: Maximum number of concurrent datasets.
+        heal: Heal discrepancies found.
+        yes: Do not prompt for confirmation.
+        output_jsonl: Output as JSON lines.
+
+    Returns:
+        List[Dict[str, Any]]: The result for every dataset with a discrepancy,
+            or that could not be scouted.
+    """
+
+    def audit(dataset: str) -> Dict[str, Any]:
+        data = query_scout(server, dataset, scopes)
+        count_minoc_files(data, client, 1)
+        result: Dict[str, Any] = {"dataset": dataset, "scopes": data}
+        result["discrepancies"] = [
+            {
+                "scope": scope,
+                "se": se,
+                "observed": data[scope]["observed"][se],
+                "expected": data[scope]["expected"][se],
+            }
+            for scope, se in find_discrepancies(data)
+        ]
+        if heal and yes:
+            for discrepancy in result["discrepancies"]:
+                heal_record(dataset, data, discrepancy)
+        return result
+
+    def heal_record(dataset: str, data: dict, discrepancy: Dict[str, Any]) -> None:
+        scope, se = discrepancy["scope"], discrepancy["se"]
+        try:
+            discrepancy["healed"] = heal_discrepancy(
+                server, dataset, scope, se, data[scope], client
             )
-            response = requests.post(url, json=file_md5s)
-            if response.status_code == 200:
-                console.print(f"{scope} - Healing successful.")
-            else:
-                error_console.print(f"{scope} - Healing failed.")
+        except Exception as error:
+            discrepancy["error"] = str(error)
 
+    total = 0
+    results: List[Dict[str, Any]] = []
+    for dataset, future in imap_unordered(audit, datasets, workers):
+        total += 1
+        try:
+            result = future.result()
+        except Exception as error:
+            result = {"dataset": dataset, "error": str(error)}
+        if not output_jsonl:
+            show_batch_result(result)
+        else:
+            print(json.dumps(result), flush=True)
+        if result.get("error") or result["discrepancies"]:
+            results.append(result)
 
-def show_scout_results(dataset: str, data: dict):
-    """Create and display a table with scout results.
+    to_heal = [
+        (result, discrepancy)
+        for result in results
+        for discrepancy in result.get("discrepancies", [])
+        if "healed" not in discrepancy and "error" not in discrepancy
+    ]
+    if heal and to_heal and Confirm.ask(f"Heal {len(to_heal)} discrepancies?"):
+        for (result, discrepancy), _ in imap_unordered(
+            lambda item: heal_record(item[0]["dataset"], item[0]["scopes"], item[1]),
+            to_heal,
+            workers,
+        ):
+            show_heal_result(result["dataset"], discrepancy)
+
+    if not output_jsonl:
+        show_batch_summary(total, results)
+    return results
+
+
+def show_batch_result(result: Dict[str, Any]) -> None:
+    """Display the scout result for one dataset of a batch.
+
+    Args:
+        result: Result for the dataset, see `scout_batch`.
+    """
+    dataset = result["dataset"]
+    if result.get("error"):
+        error_console.print(f"✘ {dataset}  Failed: {result['error']}")
+        return
+    if not result["discrepancies"]:
+        console.print(f"✔ {dataset}", style="green")
+    for discrepancy in result["discrepancies"]:
+        console.print(
+            f"✘ {dataset}  {discrepancy['se']}: {discrepancy['scope']} "
+            f"observed {discrepancy['observed']}, expected {discrepancy['expected']}",
+            style="bold red",
+        )
+        show_heal_result(dataset, discrepancy)
+
+
+def show_heal_result(dataset: str, discrepancy: Dict[str, Any]) -> None:
+    """Display the outcome of healing a discrepancy, if it has been healed.
+
+    Args:
+        dataset: Name of dataset.
+        discrepancy: Discrepancy, see `scout_batch`.
+    """
+    if "healed" in discrepancy:
+        console.print(
+            f"✚ {dataset}  {discrepancy['se']}: {discrepancy['scope']} "
+            f"healed {discrepancy['healed']} files",
+            style="green",
+        )
+    elif "error" in discrepancy:
+        error_console.print(
+            f"✘ {dataset}  {discrepancy['se']}: {discrepancy['scope']} "
+            f"healing failed: {discrepancy['error']}"
+        )
+
+
+def show_batch_summary(total: int, results: List[Dict[str, Any]]) -> None:
+    """Display a summary of a batch scout.
+
+    Args:
+        total: Number of datasets scouted.
+        results: Datasets with discrepancies or errors, see `scout_batch`.
+    """
+    discrepancies = [
+        discrepancy
+        for result in results
+        for discrepancy in result.get("discrepancies", [])
+    ]
+    console.print(
+        f"\nScouted {total} datasets: {len(discrepancies)} discrepancies, "
+        f"{len([_ for _ in discrepancies if 'healed' in _])} healed, "
+        f"{len([_ for _ in results if 'error' in _])} failed to scout, "
+        f"{len([_ for _ in discrepancies if 'error' in _])} failed to heal."
+    )
+
+
+def create_scout_table(dataset: str, data: dict) -> Table:
+    """Create a table with scout results.
+
+    Counts that have not arrived yet are shown as "…".
 
     Args:
         dataset: Name of dataset.
         data: Data to display.
+
+    Returns:
+        Table: Scout results table.
     """
-    # Display results.
     scopes = list(data.keys())
     storage_elements = list(data[scopes[0]]["observed"].keys())
     table = Table(
@@ -197,7 +591,8 @@ def show_scout_results(dataset: str, data: dict):
         # Observed
         row = [scope]
         for se in storage_elements:
-            row.append(str(data[scope]["observed"][se]))
+            value = data[scope]["observed"][se]
+            row.append("…" if value is None else str(value))
         table.add_row(*row, style="blue")
 
         # Expected
@@ -205,8 +600,22 @@ def show_scout_results(dataset: str, data: dict):
         for se in storage_elements:
             row.append(str(data[scope]["expected"][se]))
         table.add_row(*row, style="yellow", end_section=True)
+    return table
+
+
+def show_scout_results(dataset: str, data: dict):
+    """Create and display a table with scout results.
+
+    Args:
+        dataset: Name of dataset.
+        data: Data to display.
+    """
+    console.print(create_scout_table(dataset, data))
+    show_scout_legend()
+
 
-    console.print(table)
+def show_scout_legend():
+    """Display the legend for the scout results table."""
     console.print("Legend: [blue]Observed[/blue], [yellow]Expected[/yellow]")
     console.print(
         "NOTE: In the case where more files are expected at a site other than \
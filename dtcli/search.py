@@ -0,0 +1,147 @@
+"""Datatrail Search Command."""
+
+import json
+import logging
+from datetime import datetime
+from typing import Optional
+
+import click
+from rich.console import Console
+from rich.table import Table
+
+from dtcli.src import functions
+from dtcli.utilities import catalog
+from dtcli.utilities.utilities import set_log_level
+
+logger = logging.getLogger("search")
+
+console = Console()
+error_console = Console(stderr=True, style="bold red")
+
+
+@click.command(name="search", help="Search a local catalog of datasets.")
+@click.argument("pattern", type=click.STRING, required=False, nargs=1)
+@click.option("--sync", "-s", is_flag=True, help="Sync the catalog with Datatrail.")
+@click.option(
+    "--max-age",
+    type=click.FloatRange(min=0),
+    default=24.0,
+    help="Hours before children are synced again.",
+)
+@click.option("--scope", default=None, help="Only search this scope.")
+@click.option(
+    "--limit",
+    "-n",
+    type=click.IntRange(min=1),
+    default=100,
+    help="Maximum number of results.",
+)
+@click.option(
+    "--workers",
+    "-w",
+    type=click.IntRange(min=1),
+    default=8,
+    help="Number of concurrent requests when syncing.",
+)
+@click.option("-v", "--verbose", count=True, help="Verbosity: v=INFO, vv=DEBUG.")
+@click.option("-q", "--quiet", is_flag=True, help="Only errors shown in logs.")
+@click.option("--json", "output_json", is_flag=True, help="Output as JSON.")
+@click.pass_context
+def search(
+    ctx: click.Context,
+    pattern: Optional[str],
+    sync: bool,
+    max_age: float,
+    scope: Optional[str],
+    limit: int,
+    workers: int,
+    verbose: int,
+    quiet: bool,
+    output_json: bool,
+) -> None:
+    """Search a local catalog of scopes, larger datasets and their children.
+
+    Args:
+        ctx (click.Context): Click context.
+        pattern (Optional[str]): Prefix, word or glob to search for.
+        sync (bool): Sync the catalog with Datatrail.
+        max_age (float): Hours before children are synced again.
+        scope (Optional[str]): Only search this scope.
+        limit (int): Maximum number of results.
+        workers (int): Number of concurrent requests when syncing.
+        verbose (int): Verbosity: v=INFO, vv=DEBUG.
+        quiet (bool): Only errors shown in logs.
+        output_json (bool): Output as JSON.
+    """
+    # Set logging level.
+    set_log_level(logger, verbose, quiet)
+    set_log_level(catalog.logger, verbose, quiet)
+    logger.debug("`search` called with:")
+    logger.debug(f"pattern: {pattern} [{type(pattern)}]")
+    logger.debug(f"sync: {sync} [{type(sync)}]")
+    logger.debug(f"max_age: {max_age} [{type(max_age)}]")
+    logger.debug(f"scope: {scope} [{type(scope)}]")
+    logger.debug(f"limit: {limit} [{type(limit)}]")
+    logger.debug(f"workers: {workers} [{type(workers)}]")
+    logger.debug(f"verbose: {verbose} [{type(verbose)}]")
+    logger.debug(f"quiet: {quiet} [{type(quiet)}]")
+
+    if not pattern and not sync:
+        raise click.UsageError("Missing argument 'PATTERN'.")
+
+    if sync:
+        try:
+            with console.status("Syncing catalog with Datatrail..."):
+                stats = catalog.sync(
+                    lambda scope, dataset: functions.list(scope, dataset, 0, True),
+                    max_age=max_age * 3600,
+                    workers=workers,
+                )
+        except RuntimeError as error:
+            error_console.print(error)
+            ctx.exit(1)
+            return None
+        console.print(
+            f"Synced {stats['scopes']} scopes and {stats['parents']} larger datasets: "
+            f"{stats['added']:,} added, {stats['removed']:,} removed.",
+            style="green",
+        )
+        if stats["errors"]:
+            error_console.print(f"{stats['errors']} listings failed, see logs.")
+        if not pattern:
+            return None
+
+    info = catalog.status()
+    if not info["datasets"]:
+        error_console.print("Catalog is empty. Sync it with `datatrail search --sync`.")
+        ctx.exit(1)
+        return None
+
+    results = [
+        {"scope": s, "dataset": name, "parent": parent or None}
+        for s, name, parent in catalog.search(str(pattern), scope=scope, limit=limit)
+    ]
+
+    if output_json:
+        print(json.dumps(results, indent=2))
+        return None
+
+    if not results:
+        console.print(f"No datasets matching {pattern}.")
+    else:
+        table = Table(
+            title=f"Datatrail: Datasets matching {pattern}",
+            header_style="magenta",
+            title_style="bold magenta",
+        )
+        table.add_column("Dataset", style="bold")
+        table.add_column("Scope")
+        table.add_column("Larger Dataset")
+        for result in results:
+            table.add_row(result["dataset"], result["scope"], result["parent"] or "-")
+        console.print(table)
+        if len(results) == limit:
+            console.print(f"Showing the first {limit} results.", style="yellow")
+    if info["oldest"]:
+        synced = datetime.fromtimestamp(info["oldest"]).strftime("%Y-%m-%d %H:%M")
+        console.print(f"Oldest catalog entry synced {synced}.", style="dim")
@@ -1,31 +1,114 @@
 """Functions for CLI."""
 
+import fnmatch
+import itertools
+import json
 import logging
 import os
 import re
 import shutil
 import subprocess
 import time
-from collections import Counter
+from array import array
+from collections import Counter, deque
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
 
 import requests
 
-from dtcli.config import procure
-from dtcli.utilities import cadcclient, utilities
+import dtcli.config
+from dtcli.config import procure, setting
+from dtcli.utilities import (
+    cadcclient,
+    http,
+    jsonstream,
+    paths,
+    signatures,
+    utilities,
+)
 
 logger = logging.getLogger("functions")
 
+# Workflow Results, unless the `results` configuration key is set.
+RESULTS = "https://frb.chimenet.ca/results"
+# Stable order of Workflow Results records, for paging through them.
+RESULTS_SORT = {"_id": 1}
+# Files checked for local copies at a time, as they stream in.
+BATCH = 1000
+
 
-def list(  # noqa: C901
+def list(
     scope: Optional[str] = None,
     dataset: Optional[str] = None,
     verbose: int = 0,
     quiet: bool = False,
+    match: Optional[str] = None,
+    regex: Optional[str] = None,
+    after: Optional[datetime] = None,
+    before: Optional[datetime] = None,
+    limit: Optional[int] = None,
+    offset: int = 0,
+    lazy: bool = False,
 ) -> Dict[str, Any]:
     """List Datatrail Scopes & Datasets.
 
+    Larger and child datasets can be filtered and paged. The server returns the
+    whole list, so filters, offset and limit are applied lazily as it is read.
+
+    Args:
+        scope (Optional[str], optional): Scope of dataset. Defaults to None.
+        dataset (Optional[str], optional): Name of dataset. Defaults to None.
+        verbose (int, optional): Verbosity. Defaults to 0.
+        quiet (bool, optional): Minimal logging. Defaults to False.
+        match (Optional[str], optional): Glob datasets must match. Defaults to None.
+        regex (Optional[str], optional): Regular expression searched for in
+            datasets. Defaults to None.
+        after (Optional[datetime], optional): Earliest date of timestamped
+            datasets. Defaults to None.
+        before (Optional[datetime], optional): Latest date of timestamped
+            datasets. Defaults to None.
+        limit (Optional[int], optional): Maximum number of datasets.
+            Defaults to None.
+        offset (int, optional): Number of matching datasets to skip, e.g. the
+            number already read. Defaults to 0.
+        lazy (bool, optional): Return datasets as an iterator instead of a list.
+            Defaults to False.
+
+    Returns:
+        Dict[str, Any]: Keys 'error', 'scopes', 'larger_datasets' or 'datasets'.
+            Values are the results or error message.
+    """
+    results = _list(scope, dataset, verbose, quiet)
+    for key in ["larger_datasets", "datasets"]:
+        if key in results:
+            names = filter_datasets(
+                results[key], match, regex, after, before, limit, offset
+            )
+            results[key] = names if lazy else [*names]
+    return results
+
+
+def _list(  # noqa: C901
+    scope: Optional[str] = None,
+    dataset: Optional[str] = None,
+    verbose: int = 0,
+    quiet: bool = False,
+) -> Dict[str, Any]:
+    """Query Datatrail for scopes, larger datasets or child datasets.
+
     Args:
         scope (Optional[str], optional): Scope of dataset. Defaults to None.
         dataset (Optional[str], optional): Name of dataset. Defaults to None.
@@ -33,8 +116,8 @@ def list(  # noqa: C901
         quiet (bool, optional): Minimal logging. Defaults to False.
 
     Returns:
-        Dict[str, Any]: Keys 'error', 'scopes', or 'datasets'. Values are the
-            results or error message.
+        Dict[str, Any]: Keys 'error', 'scopes', 'larger_datasets' or 'datasets'.
+            Values are the results or error message.
     """
     # Set logging level.
     utilities.set_log_level(logger, verbose, quiet)
@@ -54,7 +137,7 @@ def list(  # noqa: C901
         logger.info("Finding all scopes in Datatrail.")
         try:
             url = server + "/query/dataset/scopes"
-            r = requests.get(url)
+            r = http.session().get(url)
             response = utilities.decode_response(r)
             return {"scopes": response}
         except requests.exceptions.ConnectionError as e:
@@ -69,7 +152,7 @@ def list(  # noqa: C901
         logger.info("Finding all larger datasets in Datatrail.")
         try:
             url = server + f"/query/dataset/larger?scope={scope}"
-            r = requests.get(url)
+            r = http.session().get(url)
             response = utilities.decode_response(r)
             if isinstance(response, dict):
                 return response
@@ -85,7 +168,7 @@ def list(  # noqa: C901
         try:
             url = server + f"/query/dataset/children/{scope}/{dataset}"
             logger.debug(f"URL: {url}")
-            r = requests.get(url)
+            r = http.session().get(url)
             logger.debug(f"Status: {r.status_code}.")
             response = utilities.decode_response(r)
             logger.debug(f"Reponse: {response}")
@@ -101,6 +184,82 @@ def list(  # noqa: C901
         return {}
 
 
+DATE_RE = re.compile(r"^(\d{8})(\d{6})?")
+
+
+def dataset_date(name: str) -> Optional[datetime]:
+    """Parse the date from a timestamped dataset name, e.g. "20230604135840".
+
+    Args:
+        name (str): Name of dataset.
+
+    Returns:
+        Optional[datetime]: Date of dataset, or None if the name is not a date.
+    """
+    m = DATE_RE.match(name)
+    if not m:
+        return None
+    day, clock = m.groups()
+    try:
+        return datetime.strptime(day + (clock or "000000"), "%Y%m%d%H%M%S")
+    except ValueError:
+        return None
+
+
+def filter_datasets(
+    names: Iterable[str],
+    match: Optional[str] = None,
+    regex: Optional[str] = None,
+    after: Optional[datetime] = None,
+    before: Optional[datetime] = None,
+    limit: Optional[int] = None,
+    offset: int = 0,
+) -> Iterator[str]:
+    """Lazily filter dataset names.
+
+    Date filters only match datasets named by a timestamp.
+
+    Args:
+        names (Iterable[str]): Names of datasets.
+        match (Optional[str]): Glob the names must match. Defaults to None.
+        regex (Optional[str]): Regular expression searched for in the names.
+            Defaults to None.
+        after (Optional[datetime]): Earliest date of dataset. Defaults to None.
+        before (Optional[datetime]): Latest date of dataset. Defaults to None.
+        limit (Optional[int]): Maximum number of names. Defaults to None.
+        offset (int): Number of matching names to skip. Defaults to 0.
+
+    Returns:
+        Iterator[str]: Names of datasets that pass all filters.
+    """
+    return itertools.islice(
+        _filter_datasets(names, match, regex, after, before),
+        offset,
+        None if limit is None else offset + limit,
+    )
+
+
+def _filter_datasets(
+    names: Iterable[str],
+    match: Optional[str],
+    regex: Optional[str],
+    after: Optional[datetime],
+    before: Optional[datetime],
+) -> Iterator[str]:
+    """Yield the dataset names that pass all filters."""
+    pattern = re.compile(regex) if regex else None
+    for name in names:
+        if match and not fnmatch.fnmatchcase(name, match):
+            continue
+        if pattern and not pattern.search(name):
+            continue
+        if after or before:
+            date = dataset_date(name)
+            if date is None or (after and date < after) or (before and date > before):
+                continue
+        yield name
+
+
 def ps(
     scope: str,
     dataset: str,
@@ -110,6 +269,8 @@ def ps(
 ) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
     """List detailed information about a dataset.
 
+    The files and policies of the dataset are requested concurrently.
+
     Args:
         scope (Optional[str], optional): Scope of dataset. Defaults to None.
         dataset (Optional[str], optional): Name of dataset. Defaults to None.
@@ -121,6 +282,35 @@ def ps(
         Tuple[Dict[str, Any], Dict[str, Any]]: Dictionary of dataset files,
             and dictionary of dataset's policies.
     """
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        files, policies = submit_ps(executor, scope, dataset, verbose, quiet, base_url)
+        return files.result(), policies.result()
+
+
+def submit_ps(
+    executor: Executor,
+    scope: str,
+    dataset: str,
+    verbose: int = 0,
+    quiet: bool = False,
+    base_url: Optional[str] = None,
+) -> Tuple["Future[Optional[Dict[str, Any]]]", "Future[Dict[str, Any]]"]:
+    """Request the files and policies of a dataset concurrently.
+
+    The results of the futures are as returned by `ps`, and they raise the
+    same exceptions.
+
+    Args:
+        executor (Executor): Executor to make the requests with.
+        scope (str): Scope of dataset.
+        dataset (str): Name of dataset.
+        verbose (int, optional): Verbosity. Defaults to 0.
+        quiet (bool, optional): Minimal logging. Defaults to False.
+        base_url (Optional[str], optional): Datatrail URL. Defaults to None.
+
+    Returns:
+        Tuple[Future, Future]: Futures of the dataset files and policies.
+    """
     # Set logging level.
     utilities.set_log_level(logger, verbose, quiet)
 
@@ -137,20 +327,17 @@ def ps(
     if not base_url:
         logger.debug(f"Setting base_url to {server}.")
         base_url = server
-    try:
-        files_response = get_dataset_file_info(scope, dataset, verbose, quiet)
+    files = executor.submit(
+        _ps_request, _dataset_files, scope, dataset, verbose, quiet, base_url
+    )
+    policies = executor.submit(_ps_request, get_dataset_policy, scope, dataset, base_url)
+    return files, policies
 
-        logger.info(f"Getting policy for {dataset} in {scope}.")
-        url: str = str(base_url) + f"/query/dataset/{scope}/{dataset}"
-        logger.debug(f"URL: {url}")
-        r = requests.get(url)
-        logger.debug(f"Status: {r.status_code}.")
-        policy_response = utilities.decode_response(r)
-        utilities.validate_request_response(policy_response, dataset, scope)
-        if "error" in files_response:
-            return None, policy_response  # type: ignore
-        return files_response, policy_response  # type: ignore
 
+def _ps_request(function: Callable[..., Any], *args: Any) -> Any:
+    """Call a request for `ps`, raising its errors as `ps` does."""
+    try:
+        return function(*args)
     except requests.exceptions.ConnectionError as e:
         logger.error(e)
         raise ConnectionError("Datatrail Server at CHIME is not responding.")
@@ -159,6 +346,37 @@ def ps(
         raise Exception(e)
 
 
+def _dataset_files(
+    scope: str, dataset: str, verbose: int, quiet: bool, base_url: str
+) -> Optional[Dict[str, Any]]:
+    """Files of a dataset, or None if they could not be found."""
+    files_response = get_dataset_file_info(scope, dataset, verbose, quiet, base_url)
+    if "error" in files_response:
+        return None
+    return files_response
+
+
+def get_dataset_policy(scope: str, dataset: str, base_url: str) -> Dict[str, Any]:
+    """Get the replication and deletion policies of a dataset.
+
+    Args:
+        scope (str): Scope of dataset.
+        dataset (str): Name of dataset.
+        base_url (str): Datatrail URL.
+
+    Returns:
+        Dict[str, Any]: Policies of the dataset and the datasets it belongs to.
+    """
+    logger.info(f"Getting policy for {dataset} in {scope}.")
+    url: str = str(base_url) + f"/query/dataset/{scope}/{dataset}"
+    logger.debug(f"URL: {url}")
+    r = http.session().get(url)
+    logger.debug(f"Status: {r.status_code}.")
+    policy_response = utilities.decode_response(r)
+    utilities.validate_request_response(policy_response, dataset, scope)
+    return policy_response  # type: ignore
+
+
 def get_dataset_file_info(
     scope: str,
     dataset: str,
@@ -192,7 +410,7 @@ def get_dataset_file_info(
         logger.debug(f"Payload: {payload}")
         url = str(base_url) + "/query/dataset/find"
         logger.debug(f"URL: {url}")
-        r = requests.post(url, json=payload)
+        r = http.session(queries=True).post(url, json=payload)
         logger.debug(f"Status: {r.status_code}.")
         logger.debug("Decoding response.")
         response = utilities.decode_response(r)
@@ -206,6 +424,60 @@ def get_dataset_file_info(
         return {"error": e}
 
 
+def stream_dataset_file_info(
+    scope: str,
+    dataset: str,
+    verbose: int = 0,
+    quiet: bool = False,
+    base_url: Optional[str] = None,
+) -> Union[jsonstream.FindStream, Dict[str, Any]]:
+    """Find the files of a dataset, decoding them as the response streams in.
+
+    Args:
+        scope (str): Scope of dataset.
+        dataset (str): Name of dataset.
+        verbose (int, optional): Verbosity. Defaults to 0.
+        quiet (bool, optional): Minimal logging. Defaults to False.
+        base_url (Optional[str], optional): Datatrail URL. Defaults to None.
+
+    Returns:
+        Union[jsonstream.FindStream, Dict[str, Any]]: Stream of the files at
+            each storage element, or a dictionary with the error.
+    """
+    # Set logging level.
+    utilities.set_log_level(logger, verbose, quiet)
+
+    # Load configuration.
+    config = procure()
+    if not base_url:
+        base_url = config["server"]
+    try:
+        logger.info(f"Finding files for {dataset} in {scope}.")
+        payload = {"scope": scope, "name": dataset}
+        logger.debug(f"Payload: {payload}")
+        url = str(base_url) + "/query/dataset/find"
+        logger.debug(f"URL: {url}")
+        r = http.session(queries=True).post(url, json=payload, stream=True)
+        logger.debug(f"Status: {r.status_code}.")
+        if r.status_code not in [200, 201]:
+            response = utilities.decode_response(r)
+            utilities.validate_request_response(response, dataset, scope)
+            return {"error": response}
+        logger.debug("Decoding response as it streams in.")
+        stream = jsonstream.FindStream(jsonstream.response_chunks(r))
+        response = stream.scalar()
+        if response is not None:
+            utilities.validate_request_response(response, dataset, scope)
+            return {"error": response}
+        return stream
+    except requests.exceptions.ConnectionError as e:
+        logger.error(e)
+        return {"error": "Datatrail Server at CHIME is not responding."}
+    except Exception as e:
+        logger.error(e)
+        return {"error": e}
+
+
 def find_missing_dataset_files(
     scope: str, dataset: str, root_path: Optional[str] = None, verbose: int = 0
 ) -> Dict:
@@ -218,48 +490,53 @@ def find_missing_dataset_files(
         verbose (int): Verbosity. Defaults to 0.
 
     Returns:
-        Dict: Dictionary of results.
+        Dict: Views of the 'missing' and 'existing' files at Minoc.
     """
     # Set logging level.
     utilities.set_log_level(logger, verbose)
 
     # find dataset
-    dataset_locations = get_dataset_file_info(scope, dataset, verbose=verbose)
-    if "error" in dataset_locations:
-        return {"error": dataset_locations["error"]}
+    stream = stream_dataset_file_info(scope, dataset, verbose=verbose)
+    if isinstance(stream, dict):
+        return {"error": stream["error"]}
 
-    # check for local copy of the data.
+    # check for local copies of the files as they stream in.
     logger.info("Checking for local copies of files.")
-    if dataset_locations["file_replica_locations"].get("minoc"):
-        file_uris = dataset_locations["file_replica_locations"]["minoc"]
-        file_paths = []
-        # Clean up file paths
-        for f in file_uris:
-            if f.startswith("data/"):
-                file_paths.append(f)
-            elif f.startswith("cadc:CHIMEFRB/"):
-                file_paths.append(f.replace("//", "/").replace("cadc:CHIMEFRB/", ""))
-            elif f.startswith("/"):
-                file_paths.append(f.replace("//", "/")[1:])
-        # check for missing files
-        missing_files = []
-        existing_files = []
-        for f in file_paths:
-            if Path(root_path + f).exists():
-                logger.debug(f"- {f} : ✔")
-                existing_files.append(f)
-            else:
-                logger.debug(f"- {f} : ✘")
-                missing_files.append(f)
-
-    else:
-        missing_files = []
-        existing_files = []
-    return {"missing": missing_files, "existing": existing_files}
+    file_map = paths.FileMap()
+    missing_files = array("I")
+    existing_files = array("I")
+    for se, uris in stream.locations():
+        if se != "minoc":
+            # Only the files at Minoc can be downloaded.
+            for _ in uris:
+                pass
+            continue
+        while True:
+            batch = [*itertools.islice(uris, BATCH)]
+            if not batch:
+                break
+            start = len(file_map)
+            file_map.extend(batch)
+            new = file_map.view(range(start, len(file_map)))
+            for position, f, destination in zip(
+                new.positions, new, new.destinations(root_path or "")
+            ):
+                if os.path.exists(destination):
+                    logger.debug(f"- {f} : ✔")
+                    existing_files.append(position)
+                else:
+                    logger.debug(f"- {f} : ✘")
+                    missing_files.append(position)
+    if "error" in stream.fields:
+        return {"error": stream.fields["error"]}
+    return {
+        "missing": file_map.view(missing_files),
+        "existing": file_map.view(existing_files),
+    }
 
 
 def get_files(
-    files: List[str],
+    files: Union[List[str], paths.FileView],
     site: str,
     directory: str,
     cores: int,
@@ -268,7 +545,7 @@ def get_files(
     """Download all files from a dataset which only contains files.
 
     Args:
-        files (List[str]): Paths of files to download.
+        files (Union[List[str], paths.FileView]): Paths of files to download.
         site (str): Local machine.
         directory (str): Path to download files to. Default depends on site.
         cores (int): Number of processors to initiate download on.
@@ -287,14 +564,12 @@ def get_files(
     if len(files) > 0:
         print(f"{len(files)} files missing.")
         print(f"Downloading {len(files)} missing files.")
-        files = [f.replace("cadc:CHIMEFRB/", "") for f in files]
         if not directory:
             directory = mounts[site]
-        if not directory.endswith("/"):
-            directory += "/"
-        destinations = [(directory + f).replace("//", "/") for f in files]
+        file_map = paths.view(files)
+        destinations = file_map.destinations(directory)
+        folders = file_map.local_folders(directory)
         # make directory structure if it does not exist.
-        folders = {os.path.dirname(path) for path in destinations}
         if site == "canfar":
             for folder in folders:
                 os.makedirs(folder, exist_ok=True)
@@ -304,7 +579,10 @@ def get_files(
             for folder in folders:
                 os.makedirs(folder, exist_ok=True)
         cadcclient.pget(
-            source=files, destination=destinations, processors=cores, verbose=verbose
+            source=file_map.paths(),
+            destination=destinations,
+            processors=cores,
+            verbose=verbose,
         )
     return None
 
@@ -403,7 +681,7 @@ def find_dataset_common_path(
     url = server + "/query/dataset/find"
     logger.debug(f"URL: {url}")
     try:
-        r = requests.post(url, json=payload)
+        r = http.session(queries=True).post(url, json=payload)
         dataset_locations = utilities.decode_response(r)  # type: ignore
         utilities.validate_request_response(dataset_locations, dataset, scope)
     except ConnectionError:
@@ -415,13 +693,7 @@ def find_dataset_common_path(
     # Build data paths.
     if dataset_locations["file_replica_locations"].get("minoc"):  # type: ignore
         file_uris = dataset_locations["file_replica_locations"]["minoc"]  # type: ignore
-        file_paths = [
-            f.replace("//", "/").replace("cadc:CHIMEFRB/", "") for f in file_uris
-        ]
-
-        common_path = os.path.commonprefix(file_paths)
-        if common_path[-1] != "/":
-            common_path = "/".join(common_path.split("/")[:-1])
+        common_path = paths.FileMap(file_uris).common_folder()
 
     else:
         logger.info(f"Dataset {dataset} {scope} not found on Minoc.")
@@ -436,6 +708,8 @@ def view_results(
     query: Dict[str, Any],
     projection: Dict[str, Any],
     limit: int = 100,
+    skip: int = 0,
+    sort: Optional[Dict[str, int]] = None,
 ) -> List[Dict[str, Any]]:
     """View results from a pipeline.
 
@@ -444,21 +718,97 @@ def view_results(
         query (Dict[str, Any]): Query for pipeline.
         projection (Dict[str, Any]): Projection for pipeline.
         limit (int): Limit number of results.
+        skip (int): Number of results to skip. Defaults to 0.
+        sort (Optional[Dict[str, int]]): Fields to sort by, 1 for ascending
+            and -1 for descending. Defaults to None, the server's order.
 
     Returns:
         List[Dict[str, Any]]: Results from pipeline.
     """
-    response = requests.post(
-        "https://frb.chimenet.ca/results/view",
-        json={
-            "query": {"pipeline": pipeline, **query},
-            "projection": projection,
-            "limit": limit,
-        },
+    payload: Dict[str, Any] = {
+        "query": {"pipeline": pipeline, **query},
+        "projection": projection,
+        "skip": skip,
+        "limit": limit,
+    }
+    if sort:
+        payload["sort"] = sort
+    response = http.session(queries=True).post(
+        setting("results", RESULTS) + "/view", json=payload
     )
     return response.json()
 
 
+def iter_results(
+    pipeline: str,
+    query: Dict[str, Any],
+    projection: Dict[str, Any],
+    page_size: int = 1000,
+    workers: int = 1,
+) -> Iterator[Dict[str, Any]]:
+    """Iterate over all results from a pipeline, one page at a time.
+
+    Results are sorted by `_id`, so that pages neither overlap nor skip
+    results. Iteration stops at a short page, or at a page repeating the
+    previous one, in case the server ignores `skip`.
+
+    With more than one worker, the next pages are requested concurrently while
+    the current page is consumed. Results are yielded in order either way.
+
+    Args:
+        pipeline (str): Name of pipeline.
+        query (Dict[str, Any]): Query for pipeline.
+        projection (Dict[str, Any]): Projection for pipeline.
+        page_size (int): Number of results per request. Defaults to 1000.
+        workers (int): Number of pages to request at once. Defaults to 1.
+
+    Yields:
+        Iterator[Dict[str, Any]]: Results from pipeline.
+    """
+    previous: Optional[List[Dict[str, Any]]] = None
+    if workers <= 1:
+        skip = 0
+        while True:
+            page = view_results(
+                pipeline, query, projection, page_size, skip, RESULTS_SORT
+            )
+            if page and page == previous:
+                return
+            yield from page
+            if len(page) < page_size:
+                return
+            previous = page
+            skip += len(page)
+
+    pages: Deque[Future] = deque()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        try:
+            for skip in itertools.count(0, page_size):
+                pages.append(
+                    executor.submit(
+                        view_results,
+                        pipeline,
+                        query,
+                        projection,
+                        page_size,
+                        skip,
+                        RESULTS_SORT,
+                    )
+                )
+                if len(pages) < workers:
+                    continue
+                page = pages.popleft().result()
+                if page and page == previous:
+                    return
+                yield from page
+                if len(page) < page_size:
+                    return
+                previous = page
+        finally:
+            for future in pages:
+                future.cancel()
+
+
 def get_unregistered_dataset(dataset: str, scope: str) -> Optional[Dict[str, Any]]:
     """Get unregistered dataset from Datatrail.
 
@@ -473,7 +823,7 @@ def get_unregistered_dataset(dataset: str, scope: str) -> Optional[Dict[str, Any
     response = view_results(
         "datatrail-unregistered-datasets",
         query={
-            "site": "chime",
+            "site": site,
             "results.dataset_name": dataset,
         },
         projection={"results.files": 0},
@@ -486,63 +836,74 @@ def get_unregistered_dataset(dataset: str, scope: str) -> Optional[Dict[str, Any
         return response[0]
 
 
-ATTACH_RE = re.compile(
-    r"Could not attach datasets: .+? ERROR: \"?dataset (.+?), (.+?) not found"  # noqa: E501
-)
-
-CREATE_RE = re.compile(
-    r"Could not create dataset: (.+?), scope: (.+?)\. .*UniqueViolation"  # noqa: E501
-)
-
-
 def signature(msg: str) -> str:
     """Create a signature for a reason unregistered message.
 
+    Messages are classified by the rules in `dtcli.utilities.signatures`.
+
     Args:
         msg: Reason message for unregistered dataset.
 
     Returns:
         str: Signature for error message.
     """
-    msg = msg.strip()
+    return signatures.engine().classify(msg)
 
-    # Attach-dataset errors
-    m = ATTACH_RE.search(msg)
-    if m:
-        larger_dataset, scope = m.groups()
-        return f"ATTACH_MISSING:{larger_dataset}:{scope}"
 
-    # Create-dataset unique violation
-    m = CREATE_RE.search(msg)
-    if m:
-        dataset, scope = m.groups()
-        dataset = re.sub(r"\d+", "<ID>", dataset)
-        return f"CREATE_DUPLICATE:{dataset}:{scope}"
+def get_all_unregistered_datasets(
+    page_size: int = 1000, query: Optional[Dict[str, Any]] = None, workers: int = 1
+) -> Iterator[Dict[str, Any]]:
+    """Get all unregistered datasets from Workflow Results.
 
-    # PostgreSQL violation
-    if "psycopg" in msg:
-        msg = re.sub(r"\s+", " ", msg)
-        return f"POSTGRES:{msg[:120]}"
+    Only the record id and creation time, and the reason, dataset name, scope and
+    the dataset it should be attached to are fetched, a page at a time.
 
-    # Short status / token messages
-    if len(msg) < 80 and "\n" not in msg:
-        return f"STATUS:{msg}"
+    Args:
+        page_size (int): Number of results per request. Defaults to 1000.
+        query (Optional[Dict[str, Any]]): Additional query. Defaults to None.
+        workers (int): Number of pages to request at once. Defaults to 1.
 
-    # Fallback: normalized text
-    msg = re.sub(r"\d+", "<ID>", msg)
-    msg = re.sub(r"\s+", " ", msg)
-    return f"OTHER:{msg[:120]}"
+    Returns:
+        Iterator[Dict[str, Any]]: Unregistered dataset information.
+    """
+    return iter_results(
+        pipeline="datatrail-unregistered-datasets",
+        query=query or {},
+        projection={
+            "id": 1,
+            "creation": 1,
+            "results.reason": 1,
+            "results.dataset_name": 1,
+            "results.dataset_scope": 1,
+            "results.attach_to_dataset": 1,
+        },
+        page_size=page_size,
+        workers=workers,
+    )
 
 
-def get_all_unregistered_datasets() -> List[Dict[str, Any]]:
-    """Get all unregistered datasets from Workflow Results.
+def find_unregistered_datasets(
+    sig: str, page_size: int = 1000, workers: int = 4
+) -> Iterator[Dict[str, Any]]:
+    """Find unregistered datasets whose reason has a given signature.
 
-    Returns:
-        List[Dict[str, Any]]: List of unregistered dataset information.
+    Args:
+        sig (str): Signature, or a prefix of one ending at a ':' separator,
+            e.g. "ATTACH_MISSING" or "ATTACH_MISSING:<dataset>".
+        page_size (int): Number of results per request. Defaults to 1000.
+        workers (int): Number of pages to request at once. Defaults to 4.
+
+    Yields:
+        Iterator[Dict[str, Any]]: Unregistered dataset information, with the
+            signature of its reason added as 'signature'.
     """
-    return view_results(
-        pipeline="datatrail-unregistered-datasets", query={}, projection={}, limit=10000
-    )
+    # Accept details as shown by `unregistered summary`, e.g. "12 → scope".
+    sig = sig.strip().replace(" → ", ":")
+    for record in get_all_unregistered_datasets(page_size, workers=workers):
+        record_sig = signature(str(record.get("results", {}).get("reason")))
+        if record_sig == sig or record_sig.startswith(f"{sig}:"):
+            record["signature"] = record_sig
+            yield record
 
 
 def summarise_unregistered_datasets() -> Dict[str, int]:
@@ -553,3 +914,124 @@ def summarise_unregistered_datasets() -> Dict[str, int]:
     """
     response = get_all_unregistered_datasets()
     return Counter(signature(str(r["results"]["reason"])) for r in response)
+
+
+UNREGISTERED_SNAPSHOT = "unregistered.json"
+
+
+def unregistered_snapshot() -> Path:
+    """Path of the snapshot of unregistered datasets, next to the configuration."""
+    return dtcli.config.CONFIG.parent / UNREGISTERED_SNAPSHOT
+
+
+def _record_id(record: Dict[str, Any]) -> Optional[str]:
+    """Identifier of a Workflow Results record, or None if it has none."""
+    record_id = record.get("id") or record.get("_id")
+    return str(record_id) if record_id is not None else None
+
+
+def update_unregistered_snapshot(
+    snapshot: Optional[Path] = None,
+    full: bool = False,
+    page_size: int = 1000,
+    history: int = 60,
+) -> Dict[str, Any]:
+    """Update the local snapshot of unregistered dataset signatures.
+
+    Only records created since the last update are fetched and classified.
+    Records that have since been registered are pruned using an id-only query.
+    The snapshot is rebuilt if the signature rules have changed.
+    Each update appends the signature counts to the snapshot's history.
+
+    Args:
+        snapshot (Optional[Path]): Snapshot file. Defaults to
+            `unregistered_snapshot()`.
+        full (bool): Rebuild the snapshot from scratch. Defaults to False.
+        page_size (int): Number of results per request. Defaults to 1000.
+        history (int): Number of past summaries to keep. Defaults to 60.
+
+    Returns:
+        Dict[str, Any]: Snapshot with keys 'records' (record id to signature),
+            'high_water' (latest creation time seen) and 'history'.
+    """
+    snapshot = snapshot or unregistered_snapshot()
+    state: Dict[str, Any] = {"records": {}, "high_water": None, "history": []}
+    if snapshot.exists():
+        try:
+            with open(snapshot) as stream:
+                state.update(json.load(stream))
+        except (OSError, ValueError) as error:
+            logger.warning(f"Could not read snapshot {snapshot}: {error}")
+    rules = signatures.engine().fingerprint
+    if state.get("rules") != rules:
+        logger.info("Signature rules changed, rebuilding snapshot.")
+        full = True
+    if full:
+        state["records"], state["high_water"] = {}, None
+    state["rules"] = rules
+    records: Dict[str, str] = state["records"]
+
+    # Prune records that have since been registered.
+    if records:
+        current = {
+            _record_id(record)
+            for record in iter_results(
+                "datatrail-unregistered-datasets", {}, {"id": 1}, page_size
+            )
+        }
+        removed = [_ for _ in records if _ not in current]
+        logger.info(f"Pruning {len(removed)} registered datasets from snapshot.")
+        for record_id in removed:
+            del records[record_id]
+
+    # Classify records created since the last update.
+    high_water = state["high_water"]
+    query = {"creation": {"$gte": high_water}} if high_water is not None else {}
+    added = skipped = 0
+    for record in get_all_unregistered_datasets(page_size, query):
+        record_id = _record_id(record)
+        if record_id is None:
+            skipped += 1
+            continue
+        if record_id not in records:
+            added += 1
+        records[record_id] = signature(str(record["results"]["reason"]))
+        creation = record.get("creation")
+        if creation is not None and (high_water is None or creation > high_water):
+            high_water = creation
+    if skipped:
+        logger.warning(f"Skipped {skipped} unregistered datasets without an id.")
+    logger.info(f"Added {added} unregistered datasets to snapshot.")
+    state["high_water"] = high_water
+
+    state["history"].append({"time": time.time(), "counts": Counter(records.values())})
+    state["history"] = state["history"][-history:]
+    snapshot.parent.mkdir(parents=True, exist_ok=True)
+    tmp = snapshot.with_suffix(".tmp")
+    with open(tmp, "w") as stream:
+        json.dump(state, stream)
+    os.replace(tmp, snapshot)
+    return state
+
+
+def unregistered_baseline(
+    state: Dict[str, Any], since: float = 86400.0
+) -> Tuple[Optional[float], Dict[str, int]]:
+    """Find the past summary to compare the latest snapshot with.
+
+    Args:
+        state (Dict[str, Any]): Snapshot, see `update_unregistered_snapshot`.
+        since (float): Age of the summary to compare with in seconds.
+            Defaults to one day.
+
+    Returns:
+        Tuple[Optional[float], Dict[str, int]]: Time of the past summary and its
+            signature counts. None and empty if there is no past summary.
+    """
+    past = state["history"][:-1]
+    if not past:
+        return None, {}
+    cutoff = state["history"][-1]["time"] - since
+    older = [entry for entry in past if entry["time"] <= cutoff]
+    entry = older[-1] if older else past[0]
+    return entry["time"], entry["counts"]
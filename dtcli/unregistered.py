@@ -1,8 +1,9 @@
 """Datatrail Unregistered datasets commands."""
 
 import logging
-from collections import defaultdict
-from typing import DefaultDict, List, Tuple
+from collections import Counter, defaultdict
+from datetime import datetime
+from typing import DefaultDict, List, Optional, Set, TextIO, Tuple
 
 import click
 from rich.console import Console
@@ -33,28 +34,48 @@ def unregistered():
 
 
 @unregistered.command(help="Summarise the reasons for unregistered datasets.")
+@click.option("--full", is_flag=True, help="Rebuild the local snapshot from scratch.")
+@click.option(
+    "--since",
+    type=click.FloatRange(min=0),
+    default=24.0,
+    help="Show changes since this many hours ago.",
+)
 @click.option("-v", "--verbose", count=True, help="Verbosity: v=INFO, vv=DEBUG.")
 @click.option("-q", "--quiet", is_flag=True, help="Only errors shown in logs.")
 @click.pass_context
 def summary(
     ctx: click.Context,
+    full: bool = False,
+    since: float = 24.0,
     verbose: int = 0,
     quiet: bool = False,
 ):
     """Show a summary of the unregistered datasets.
 
+    Signatures are kept in a local snapshot, so only datasets that became
+    unregistered since the last summary are fetched.
+
     Args:
         ctx (click.Context): Click context.
+        full (bool): Rebuild the local snapshot from scratch.
+        since (float): Show changes since this many hours ago.
         verbose (int): Verbosity: v=INFO, vv=DEBUG.
         quiet (bool): Only errors shown in logs.
     """
     # Set logging level.
     set_log_level(logger, verbose, quiet)
+    set_log_level(functions.logger, verbose, quiet)
     logger.debug("`summary` called with:")
+    logger.debug(f"full: {full} [{type(full)}]")
+    logger.debug(f"since: {since} [{type(since)}]")
     logger.debug(f"verbose: {verbose} [{type(verbose)}]")
     logger.debug(f"quiet: {quiet} [{type(quiet)}]")
 
-    results = functions.summarise_unregistered_datasets()
+    with console.status("Updating snapshot of unregistered datasets..."):
+        state = functions.update_unregistered_snapshot(full=full)
+    results = Counter(state["records"].values())
+    baseline_time, baseline = functions.unregistered_baseline(state, since * 3600)
 
     if not results:
         console.print("No unregistered datasets found.")
@@ -72,6 +93,8 @@ def summary(
     table.add_column("Detail")
     table.add_column("Count", justify="right")
     table.add_column("%", justify="right")
+    if baseline_time is not None:
+        table.add_column("Change", justify="right")
 
     # Group signatures by their category prefix, e.g. "ATTACH_MISSING:...".
     groups: DefaultDict[str, List[Tuple[str, int]]] = defaultdict(list)
@@ -90,13 +113,147 @@ def summary(
         style = CATEGORY_STYLES.get(category, "white")
         reasons.sort(key=lambda reason: reason[1], reverse=True)
         for row, (detail, count) in enumerate(reasons):
+            change = count - baseline.get(f"{category}:{detail}", 0)
             if category in ("ATTACH_MISSING", "CREATE_DUPLICATE"):
                 detail = detail.replace(":", " → ", 1)
-            table.add_row(
+            cells = [
                 Text(category, style=style) if row == 0 else "",
                 Text(detail) if detail else "(no reason recorded)",
                 f"{count:,}",
                 f"{count / total:.1%}",
-            )
+            ]
+            if baseline_time is not None:
+                cells.append(format_change(change))
+            table.add_row(*cells)
 
     console.print(table)
+
+    # Trends per category since the baseline.
+    if baseline_time is not None:
+        when = datetime.fromtimestamp(baseline_time).strftime("%Y-%m-%d %H:%M")
+        previous: Counter = Counter()
+        for sig, count in baseline.items():
+            previous[sig.partition(":")[0]] += count
+        for category, reasons in ordered:
+            change = sum(count for _, count in reasons) - previous.pop(category, 0)
+            if change:
+                console.print(
+                    f"{format_change(change)} {category} since {when}",
+                    style=CATEGORY_STYLES.get(category, "white"),
+                )
+        for category, count in previous.items():
+            if count:
+                console.print(f"{format_change(-count)} {category} since {when}")
+
+
+@unregistered.command(name="list", help="List unregistered datasets by signature.")
+@click.option(
+    "--signature",
+    "-s",
+    "sig",
+    type=click.STRING,
+    required=True,
+    help="Signature or category from the summary, e.g. STATUS.",
+)
+@click.option(
+    "--output",
+    "-o",
+    type=click.File("w"),
+    default=None,
+    help="Write dataset names to a file, one per line.",
+)
+@click.option(
+    "--limit",
+    "-l",
+    type=click.IntRange(min=0),
+    default=50,
+    help="Maximum number of datasets to show.",
+)
+@click.option(
+    "--workers",
+    "-w",
+    type=click.IntRange(min=1),
+    default=4,
+    help="Number of pages to fetch concurrently.",
+)
+@click.option("-v", "--verbose", count=True, help="Verbosity: v=INFO, vv=DEBUG.")
+@click.option("-q", "--quiet", is_flag=True, help="Only errors shown in logs.")
+def list_(
+    sig: str,
+    output: Optional[TextIO] = None,
+    limit: int = 50,
+    workers: int = 4,
+    verbose: int = 0,
+    quiet: bool = False,
+):
+    """List the unregistered datasets with a given signature.
+
+    Args:
+        sig (str): Signature or category from the summary.
+        output (Optional[TextIO]): File to write dataset names to.
+        limit (int): Maximum number of datasets to show.
+        workers (int): Number of pages to fetch concurrently.
+        verbose (int): Verbosity: v=INFO, vv=DEBUG.
+        quiet (bool): Only errors shown in logs.
+    """
+    # Set logging level.
+    set_log_level(logger, verbose, quiet)
+    set_log_level(functions.logger, verbose, quiet)
+    logger.debug("`list` called with:")
+    logger.debug(f"signature: {sig} [{type(sig)}]")
+    logger.debug(f"output: {output} [{type(output)}]")
+    logger.debug(f"limit: {limit} [{type(limit)}]")
+    logger.debug(f"workers: {workers} [{type(workers)}]")
+    logger.debug(f"verbose: {verbose} [{type(verbose)}]")
+    logger.debug(f"quiet: {quiet} [{type(quiet)}]")
+
+    table = Table(
+        header_style="magenta",
+        title_style="bold magenta",
+        row_styles=["none", "dim"],
+    )
+    table.add_column("Dataset")
+    table.add_column("Scope")
+    table.add_column("Attach To")
+    table.add_column("Signature")
+
+    names: Set[str] = set()
+    found = 0
+    with console.status("Searching unregistered datasets..."):
+        for record in functions.find_unregistered_datasets(sig, workers=workers):
+            found += 1
+            results = record.get("results", {})
+            name = str(results.get("dataset_name"))
+            if output and name not in names:
+                output.write(f"{name}\n")
+            names.add(name)
+            if found <= limit:
+                table.add_row(
+                    name,
+                    str(results.get("dataset_scope", "")),
+                    str(results.get("attach_to_dataset") or ""),
+                    record["signature"],
+                )
+
+    if not found:
+        console.print(f"No unregistered datasets with signature {sig}.")
+        return
+    table.title = f"{found:,} unregistered datasets matching {sig}"
+    if limit:
+        console.print(table)
+    if found > limit:
+        console.print(f"Showing {limit:,} of {found:,} datasets.", style="yellow")
+    if output:
+        console.print(f"Wrote {len(names):,} dataset names to {output.name}.")
+
+
+def format_change(change: int) -> str:
+    """Format a change in count with its sign.
+
+    Args:
+        change (int): Change in count.
+
+    Returns:
+        str: Signed change, or "-" if unchanged.
+    """
+    return f"{change:+,}" if change else "-"
@@ -0,0 +1,232 @@
+"""Local cache of the Luskan metadata of artifacts stored at Minoc."""
+
+import logging
+import sqlite3
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from dtcli import config
+
+logger = logging.getLogger("artifacts")
+
+NAME = "artifacts.sqlite"
+# Columns of inventory.Artifact cached, after the uri.
+COLUMNS = ("contentLength", "contentChecksum", "lastModified")
+# Seconds a refreshed prefix is used without asking Luskan for changes, and
+# after which it is listed again in full, to drop deleted artifacts.
+TTL = 600
+MAX_AGE = 7 * 24 * 3600
+# Seconds before the high-water mark to list again when refreshing, for
+# artifacts committed out of order.
+OVERLAP = 3600
+# Sorts after any uri starting with a prefix.
+END = "\U0010ffff"
+
+SCHEMA = """
+create table if not exists artifacts (
+    uri text primary key, size integer, checksum text, modified text
+) without rowid;
+create table if not exists prefixes (
+    prefix text primary key, mark text, refreshed real, listed real
+);
+"""
+
+
+class Prefix(NamedTuple):
+    """A prefix whose artifacts are all cached.
+
+    Args:
+        prefix (str): Uri prefix, e.g. "cadc:CHIMEFRB/data/chime/...".
+        mark (str): Latest lastModified of its artifacts, as Luskan formats it.
+        refreshed (float): When it was last brought up to date.
+        listed (float): When it was last listed in full.
+    """
+
+    prefix: str
+    mark: str
+    refreshed: float
+    listed: float
+
+
+def location(values: Optional[Dict[str, Any]] = None) -> Optional[Path]:
+    """Path of the cache, from the `artifact_cache` setting.
+
+    The cache is off unless the setting is true or a path.
+
+    Args:
+        values (Optional[Dict[str, Any]], optional): Configuration, already
+            read. Defaults to reading the configuration file.
+
+    Returns:
+        Optional[Path]: Cache file, by default next to the configuration,
+            or None if the cache is disabled.
+    """
+    value = (config.settings() if values is None else values).get(
+        "artifact_cache", False
+    )
+    if value is True or str(value).lower() in ("true", "on", "yes", "1"):
+        return config.CONFIG.parent / NAME
+    if value is False or str(value).lower() in ("false", "off", "no", "0", ""):
+        return None
+    return Path(str(value)).expanduser()
+
+
+def since(mark: str, overlap: float = OVERLAP) -> str:
+    """Lower bound of lastModified to list when refreshing after a mark.
+
+    Args:
+        mark (str): High-water mark, e.g. "2024-01-10T12:00:00.000".
+        overlap (float, optional): Seconds before the mark. Defaults to OVERLAP.
+
+    Returns:
+        str: Timestamp formatted as Luskan does.
+    """
+    moment = datetime.fromisoformat(mark.rstrip("Z")) - timedelta(seconds=overlap)
+    return moment.strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3]
+
+
+class Cache:
+    """Artifacts under some prefixes, with the time each was refreshed.
+
+    Artifacts are held in a SQLite database, so that counts and sizes of any
+    path under a cached prefix are answered by an index range scan, and
+    listings of millions of artifacts are stored without holding them in
+    memory. Connections are opened per call, so a cache can be used from
+    many threads and processes at once.
+
+    Args:
+        path (Path): Database file.
+    """
+
+    def __init__(self, path: Path) -> None:
+        """Use the database at a path."""
+        self.path = path
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database, creating it if needed."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=300)
+        connection.execute("pragma journal_mode=wal")
+        connection.executescript(SCHEMA)
+        return connection
+
+    def covering(self, uri: str) -> Optional[Prefix]:
+        """Cached prefix holding all the artifacts under a uri, if any.
+
+        Args:
+            uri (str): Uri prefix.
+
+        Returns:
+            Optional[Prefix]: Most recently refreshed prefix covering the uri.
+        """
+        if not self.path.exists():
+            return None
+        connection = self._connect()
+        try:
+            rows = connection.execute(
+                "select prefix, mark, refreshed, listed from prefixes"
+                " order by refreshed desc"
+            ).fetchall()
+        finally:
+            connection.close()
+        for row in rows:
+            if uri.startswith(row[0]):
+                return Prefix(*row)
+        return None
+
+    def store(
+        self, prefix: str, rows: Iterable[List[str]], full: bool, mark: str = ""
+    ) -> int:
+        """Store the artifacts listed under a prefix.
+
+        Nothing is stored if the listing fails part way.
+
+        Args:
+            prefix (str): Uri prefix listed.
+            rows (Iterable[List[str]]): Uri and `COLUMNS` of each artifact.
+            full (bool): Whether the listing is complete, rather than only the
+                artifacts modified since the last refresh.
+            mark (str, optional): High-water mark before the listing.
+                Defaults to "".
+
+        Returns:
+            int: Number of artifacts stored.
+        """
+        now = time.time()
+        stored = 0
+        latest = mark
+
+        def records() -> Iterator[Tuple[str, int, str, str]]:
+            nonlocal stored, latest
+            for uri, size, checksum, modified in rows:
+                stored += 1
+                latest = max(latest, modified)
+                yield uri, int(float(size or 0)), checksum, modified
+
+        connection = self._connect()
+        try:
+            with connection:
+                if full:
+                    connection.execute(
+                        "delete from artifacts where uri >= ? and uri < ?",
+                        (prefix, prefix + END),
+                    )
+                    # Narrower prefixes are now covered by this one.
+                    connection.execute(
+                        "delete from prefixes where prefix >= ? and prefix < ?",
+                        (prefix, prefix + END),
+                    )
+                connection.executemany(
+                    "insert or replace into artifacts values (?, ?, ?, ?)", records()
+                )
+                listed = now
+                if not full:
+                    row = connection.execute(
+                        "select listed from prefixes where prefix = ?", (prefix,)
+                    ).fetchone()
+                    listed = row[0] if row else now
+                connection.execute(
+                    "insert or replace into prefixes values (?, ?, ?, ?)",
+                    (prefix, latest, now, listed),
+                )
+        finally:
+            connection.close()
+        logger.info(f"Cached {stored} artifacts under {prefix}.")
+        return stored
+
+    def stats(self, uri: str) -> Tuple[int, int]:
+        """Number and total size in bytes of the cached artifacts under a uri."""
+        connection = self._connect()
+        try:
+            count, size = connection.execute(
+                "select count(*), coalesce(sum(size), 0) from artifacts"
+                " where uri >= ? and uri < ?",
+                (uri, uri + END),
+            ).fetchone()
+        finally:
+            connection.close()
+        return count, size
+
+    def checksums(self, uri: str) -> Iterator[Tuple[str, str]]:
+        """Uri and checksum of each cached artifact under a uri."""
+        connection = self._connect()
+        try:
+            yield from connection.execute(
+                "select uri, checksum from artifacts where uri >= ? and uri < ?",
+                (uri, uri + END),
+            )
+        finally:
+            connection.close()
+
+
+def open_cache(values: Optional[Dict[str, Any]] = None) -> Optional[Cache]:
+    """The configured cache, or None if it is disabled.
+
+    Args:
+        values (Optional[Dict[str, Any]], optional): Configuration, already
+            read. Defaults to reading the configuration file.
+    """
+    path = location(values)
+    return Cache(path) if path is not None else None
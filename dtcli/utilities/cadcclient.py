@@ -1,24 +1,36 @@
 """Class to facilitate data transfer on CANFAR using the CADC tools."""
 
+import csv
 import logging
 import os
-import sys
+import sqlite3
+import threading
+import time
 from concurrent.futures import ThreadPoolExecutor
-from io import StringIO
 from multiprocessing import Process  # Use the standard library only
-from typing import Any, Dict, List, Optional, Tuple
+from queue import Full, Queue
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from urllib.parse import urlparse
 
 import cadcutils
 import dill
 import requests
 from cadcdata import StorageInventoryClient
 from cadctap import CadcTapClient
+from cadctap.core import QUERY_CAPABILITY_ID
 from cadcutils import net
 from requests.exceptions import HTTPError
+from requests_toolbelt.multipart.encoder import MultipartEncoder
 from rich.traceback import install
-from tenacity import Retrying, stop_after_attempt, wait_exponential
+from tenacity import (
+    Retrying,
+    retry_if_exception,
+    stop_after_attempt,
+    wait_exponential,
+)
 
-from dtcli.config import procure
+from dtcli.config import setting, settings
+from dtcli.utilities import artifacts
 from dtcli.utilities.utilities import split
 
 logger = logging.getLogger("cadcclient")
@@ -44,31 +56,74 @@ class DillProcess(Process):
             self._target(*self._args, **self._kwargs)  # type: ignore
 
 
+MINOC = "ivo://cadc.nrc.ca/uvic/minoc"
+LUSKAN = "ivo://cadc.nrc.ca/uvic/luskan"
+# Bytes of a query result read at a time.
+CHUNK = 64 * 1024
+# Rows of a large listing fetched per query, and the most rows in a chunk of
+# it before the chunk is split, up to SPLITS times.
+PAGE_ROWS = 10000
+CHUNK_ROWS = 100000
+SPLITS = 3
+# Characters splitting a chunk into uri ranges, in the order Luskan sorts them.
+BOUNDS = "-./0123456789_abcdefghijklmnopqrstuvwxyz"
+# Attempts at each page of a listing, and the wait between them.
+RETRIES = 3
+RETRY_WAIT = wait_exponential(multiplier=1, min=4, max=10)
+
+
+def resource_ids() -> Tuple[str, str]:
+    """Resource IDs of Minoc and Luskan.
+
+    The `minoc` and `luskan` configuration keys override the CADC services,
+    e.g. with the URLs of a local stand-in from `dtcli.utilities.standin`.
+
+    Returns:
+        Tuple[str, str]: Minoc and Luskan resource IDs.
+    """
+    return setting("minoc", MINOC), setting("luskan", LUSKAN)
+
+
 def _connect(
     certfile: Optional[str] = None,
-    storage_resource_id: str = "ivo://cadc.nrc.ca/uvic/minoc",
-    query_resource_id: str = "ivo://cadc.nrc.ca/uvic/luskan",
+    storage_resource_id: Optional[str] = None,
+    query_resource_id: Optional[str] = None,
 ) -> Tuple[net.Subject, StorageInventoryClient, CadcTapClient]:
     """Connect to the CADC storage and query servers.
 
+    Services given by URL rather than resource ID, like a local stand-in, are
+    connected to anonymously when there is no certificate.
+
     Args:
         certfile (Optional[str], optional): X509 Certificate.
             Defaults to None.
-        storage_resource_id (_type_, optional): Storage ID.
-            Defaults to "ivo://cadc.nrc.ca/uvic/minoc".
-        query_resource_id (_type_, optional): Query ID.
-            Defaults to "ivo://cadc.nrc.ca/uvic/luskan".
+        storage_resource_id (Optional[str], optional): Storage ID.
+            Defaults to the configured Minoc, see `resource_ids`.
+        query_resource_id (Optional[str], optional): Query ID.
+            Defaults to the configured Luskan, see `resource_ids`.
 
     Returns:
         Tuple[net.Subject, StorageInventoryClient, CadcTapClient]:
             Returns a tuple of the cert, storage, and query clients.
     """
+    minoc, luskan = resource_ids()
+    storage_resource_id = storage_resource_id or minoc
+    query_resource_id = query_resource_id or luskan
     try:
         if not certfile:
-            certfile = procure(key="vospace_certfile")
-        cert = net.Subject(certificate=certfile)
-        storage = StorageInventoryClient(cert, resource_id=storage_resource_id)
-        query = CadcTapClient(cert, resource_id=query_resource_id)
+            certfile = setting("vospace_certfile")
+        # The host of a service given by URL also stands in for the registry.
+        host = None
+        if storage_resource_id.startswith("http"):
+            host = urlparse(storage_resource_id).netloc
+        if host and not (certfile and os.path.isfile(certfile)):
+            cert = net.Subject()
+        else:
+            cert = net.Subject(certificate=certfile)
+        storage = StorageInventoryClient(
+            cert, resource_id=storage_resource_id, host=host
+        )
+        query = CadcTapClient(cert, resource_id=query_resource_id, host=host)
         return cert, storage, query
     except ValueError as error:
         logger.error(
@@ -79,6 +134,92 @@ def _connect(
         raise ValueError("Invalid or expired CANFAR certificate.") from error
 
 
+def query_client(certfile: Optional[str] = None) -> CadcTapClient:
+    """Create a Luskan TAP client that can be shared between queries and threads.
+
+    Args:
+        certfile (Optional[str], optional): X509 Certificate. Defaults to None.
+
+    Returns:
+        CadcTapClient: Luskan query client.
+    """
+    _, _, client = _connect(certfile=certfile)
+    return client
+
+
+def _sync_endpoint(client: CadcTapClient) -> Tuple[Any, str]:
+    """Web service and synchronous query endpoint of a TAP client.
+
+    CadcTapClient has no public way to post a query body and stream the
+    response, so this reaches into its internals, as of cadctap 0.10.1:
+    the `_tap_client` web service and its `_get_url` capability lookup. It
+    fails here, naming the version, if a cadctap upgrade changes them.
+
+    Args:
+        client (CadcTapClient): Query client.
+
+    Raises:
+        RuntimeError: If the client's internals are not as expected.
+
+    Returns:
+        Tuple[Any, str]: Web service posting the query, and the sync url.
+    """
+    try:
+        tap = client._tap_client
+        # The synchronous endpoint, as found by `CadcTapClient.query`.
+        url = tap._get_url((QUERY_CAPABILITY_ID, None))
+        if url.endswith("async"):
+            return tap, url[: -len("async")] + "sync"
+        return tap, tap._get_url((QUERY_CAPABILITY_ID, "sync"))
+    except AttributeError as error:
+        raise RuntimeError(
+            f"Unsupported cadctap version, written against 0.10.1: {error}"
+        ) from error
+
+
+def stream_query(
+    query: str, timeout: int = 60, client: Optional[CadcTapClient] = None
+) -> Iterator[List[str]]:
+    """Run an ADQL query on Luskan, yielding the rows of its CSV result.
+
+    The response body is parsed as it arrives, rather than printed into a
+    buffer by `CadcTapClient.query`, so memory does not grow with the number
+    of rows and nothing is shared between calls, which can run concurrently
+    from many threads with one client. The response is closed once the rows
+    are read, or when the iterator is closed early.
+
+    Args:
+        query (str): ADQL query.
+        timeout (int, optional): Timeout in minutes, as `CadcTapClient.query`.
+            Defaults to 60.
+        client (Optional[CadcTapClient], optional): Shared query client.
+            Defaults to None, which connects a new one.
+
+    Yields:
+        Iterator[List[str]]: Values of each row, without the column names.
+    """
+    if client is None:
+        client = query_client()
+    tap, resource = _sync_endpoint(client)
+    fields = {"LANG": "ADQL", "QUERY": query, "FORMAT": "csv"}
+    form = MultipartEncoder(fields=fields)
+    # Unlike `CadcTapClient.query`, the query is only sent in the body, as a
+    # long query would not fit in the url.
+    with tap.post(
+        resource,
+        data=form,
+        headers={"Content-Type": form.content_type},
+        stream=True,
+        timeout=timeout * 60,
+    ) as response:
+        response.encoding = "utf-8"
+        rows = csv.reader(response.iter_lines(chunk_size=CHUNK, decode_unicode=True))
+        next(rows, None)  # Column names.
+        for row in rows:
+            if row:
+                yield row
+
+
 def get(
     source: List[str],
     destination: List[str],
@@ -240,13 +381,20 @@ def info(
     return information
 
 
-def size(directory: str, namespace: str = "cadc:CHIMEFRB", timeout: int = 60) -> float:
+def size(
+    directory: str,
+    namespace: str = "cadc:CHIMEFRB",
+    timeout: int = 60,
+    client: Optional[CadcTapClient] = None,
+) -> float:
     """Get the size of a directory in GB.
 
     Args:
         directory (str): Directory to get the size of.
         namespace (_type_, optional): Minoc Namespace. Defaults to "cadc:CHIMEFRB".
         timeout (int, optional): Timeout. Defaults to 60.
+        client (Optional[CadcTapClient], optional): Shared query client.
+            Defaults to None.
 
     Returns:
         float: Size of the directory in GB.
@@ -254,29 +402,511 @@ def size(directory: str, namespace: str = "cadc:CHIMEFRB", timeout: int = 60) ->
     Example:
         >>> size("/data/chime/intensity/raw/2023/01/01/")
     """
-    logger.info("Getting size of {directory}...")
-    query = f"select sum(contentLength/1024.0/1024.0/1024.0) as numGB from inventory.Artifact where uri like '{namespace}/{directory}%'"  # noqa
-    query = query.replace("//", "/")
-    logger.info(f"Running query: {query}")
-    buffer = StringIO()
-    original_stdout = sys.stdout
+    logger.info(f"Getting size of {directory}...")
+    _, size = prefix_stats([directory], namespace, timeout, client)[directory]
+    return size / 1024**3
+
+
+def prefix_stats(
+    prefixes: List[str],
+    namespace: str = "cadc:CHIMEFRB",
+    timeout: int = 60,
+    client: Optional[CadcTapClient] = None,
+    workers: int = 4,
+) -> Dict[str, Tuple[int, int]]:
+    """Get the number and total size of the files under many prefixes at once.
+
+    All prefixes are counted by a single `UNION ALL` query to Luskan. If Luskan
+    rejects the grouped query, each prefix is queried separately, up to
+    `workers` at a time.
+
+    Args:
+        prefixes (List[str]): Directories or path prefixes to count.
+        namespace (str, optional): Minoc Namespace. Defaults to "cadc:CHIMEFRB".
+        timeout (int, optional): Timeout. Defaults to 60.
+        client (Optional[CadcTapClient], optional): Shared query client.
+            Defaults to None.
+        workers (int, optional): Concurrent queries for the fallback.
+            Defaults to 4.
+
+    Returns:
+        Dict[str, Tuple[int, int]]: Number of files and size in bytes, keyed by
+            prefix.
+
+    Example:
+        >>> prefix_stats(["data/chime/baseband/raw/2023/01/01/astro_1234"])
+    """
+    unique = [_ for _ in dict.fromkeys(prefixes)]
+    if not unique:
+        return {}
+    stats: Dict[str, Tuple[int, int]] = {prefix: (0, 0) for prefix in unique}
+    remaining = []
+    for prefix in unique:
+        cache = cached(prefix, namespace, timeout, client, workers)
+        if cache is None:
+            remaining.append(prefix)
+        else:
+            stats[prefix] = cache.stats(_uri(prefix, namespace))
+    if not remaining:
+        return stats
+    selects = []
+    for index, prefix in enumerate(remaining):
+        uri = _escape(_uri(prefix, namespace))
+        selects.append(
+            f"select {index} as prefix, count(*) as files, sum(contentLength) as bytes from inventory.Artifact where uri like '{uri}%'"  # noqa: E501
+        )
+    rows = _grouped(selects, timeout, client, workers)
+    for index, row in rows.items():
+        if len(row) < 2:
+            continue
+        stats[remaining[index]] = (int(row[0] or 0), int(float(row[1] or 0)))
+    return stats
+
+
+def files_size(
+    uris: Iterable[str],
+    prefix: str,
+    namespace: str = "cadc:CHIMEFRB",
+    timeout: int = 60,
+    client: Optional[CadcTapClient] = None,
+    workers: int = 4,
+) -> int:
+    """Total size of some of the files under a prefix.
+
+    The prefix is listed once, see `stream_prefix`, and the sizes of the
+    files asked for are summed, so files under it that are not asked for,
+    e.g. ones already downloaded, are not counted.
+
+    Args:
+        uris (Iterable[str]): Uris of the files, e.g. "cadc:CHIMEFRB/data/...".
+        prefix (str): Directory or path prefix holding all the files.
+        namespace (str, optional): Minoc Namespace. Defaults to "cadc:CHIMEFRB".
+        timeout (int, optional): Timeout of each query. Defaults to 60.
+        client (Optional[CadcTapClient], optional): Shared query client.
+            Defaults to None.
+        workers (int, optional): Concurrent queries. Defaults to 4.
+
+    Returns:
+        int: Size in bytes of the files found at Minoc.
+
+    Example:
+        >>> files_size(files["missing"].uris(), files["missing"].common_path())
+    """
+    wanted = set(uris)
+    if not wanted:
+        return 0
+    rows = stream_prefix(prefix, ["contentLength"], namespace, timeout, client, workers)
+    return sum(int(float(row[1] or 0)) for row in rows if row[0] in wanted)
+
+
+def _uri(prefix: str, namespace: str = "cadc:CHIMEFRB") -> str:
+    """Uri prefix of a directory or path prefix in a namespace."""
+    return f"{namespace}/{prefix}".replace("//", "/")
+
+
+def _escape(value: str) -> str:
+    """Quote a string for an ADQL literal."""
+    return value.replace("'", "''")
+
+
+def _grouped(
+    selects: List[str],
+    timeout: int = 60,
+    client: Optional[CadcTapClient] = None,
+    workers: int = 4,
+) -> Dict[int, List[str]]:
+    """Run many selects, numbered by their first column, as one query if possible.
+
+    The selects are joined by `union all`. If Luskan rejects the grouped
+    query, each select is run separately, up to `workers` at a time.
+
+    Args:
+        selects (List[str]): ADQL selects, each numbered by its first column.
+        timeout (int, optional): Timeout. Defaults to 60.
+        client (Optional[CadcTapClient], optional): Shared query client.
+            Defaults to None.
+        workers (int, optional): Concurrent queries for the fallback.
+            Defaults to 4.
+
+    Returns:
+        Dict[int, List[str]]: Other columns of the row of each select.
+    """
+    if client is None:
+        client = query_client()
     try:
-        sys.stdout = buffer
-        _, _, queryClient = _connect()
-        queryClient.query(  # type: ignore
-            query=query,
-            output_file=None,
-            response_format="csv",
-            tmptable=None,
-            lang="ADQL",
-            timeout=timeout,
-            data_only=True,
-            no_column_names=True,
+        rows = query(" union all ".join(selects), timeout=timeout, client=client)
+    except cadcutils.exceptions.BadRequestException as error:  # type: ignore
+        logger.info(f"Grouped query rejected, querying separately: {error}")
+        with ThreadPoolExecutor(max_workers=min(workers, len(selects))) as executor:
+            results = executor.map(
+                lambda select: query(select, timeout=timeout, client=client), selects
+            )
+            rows = [row for result in results for row in result]
+    return {int(row[0]): row[1:] for row in rows if row and row[0]}
+
+
+Chunk = Tuple[Optional[str], Optional[str]]
+
+
+def _conditions(uri: str, chunk: Chunk) -> List[str]:
+    """Conditions selecting the artifacts under a prefix within a uri range."""
+    low, high = chunk
+    conditions = [f"uri like '{_escape(uri)}%'"]
+    if low:
+        conditions.append(f"uri >= '{_escape(low)}'")
+    if high:
+        conditions.append(f"uri < '{_escape(high)}'")
+    return conditions
+
+
+def _split(chunk: Chunk, first: str, last: str) -> List[Chunk]:
+    """Split a uri range where its first and last uris differ.
+
+    Args:
+        chunk (Chunk): Start and end of the range, None if unbounded.
+        first (str): First uri in the range.
+        last (str): Last uri in the range.
+
+    Returns:
+        List[Chunk]: Ranges covering the chunk, each starting with the next
+            character after the common path of the first and last uri, or
+            just the chunk if it cannot be split.
+    """
+    common = os.path.commonprefix([first, last])
+    bounds = [common + char for char in BOUNDS if first < common + char <= last]
+    edges = [chunk[0], *bounds, chunk[1]]
+    return [*zip(edges, edges[1:])]
+
+
+def _count(
+    uri: str,
+    chunks: List[Chunk],
+    conditions: Sequence[str],
+    timeout: int = 60,
+    client: Optional[CadcTapClient] = None,
+    workers: int = 4,
+) -> List[Tuple[int, str, str]]:
+    """Number of artifacts, and first and last uri, of uri ranges, in one query."""
+    if not chunks:
+        return []
+    selects = [
+        f"select {index} as chunk, count(*) as files, min(uri) as first, max(uri) as last from inventory.Artifact where "  # noqa: E501
+        + " and ".join(_conditions(uri, chunk) + [*conditions])
+        for index, chunk in enumerate(chunks)
+    ]
+    rows = _grouped(selects, timeout, client, workers)
+    counts: List[Tuple[int, str, str]] = []
+    for index in range(len(chunks)):
+        row = rows.get(index, [])
+        count = int(row[0] or 0) if row else 0
+        if count and len(row) > 2:
+            counts.append((count, row[1], row[2]))
+        else:
+            counts.append((0, "", ""))
+    return counts
+
+
+def plan_chunks(
+    prefix: str,
+    namespace: str = "cadc:CHIMEFRB",
+    timeout: int = 60,
+    client: Optional[CadcTapClient] = None,
+    workers: int = 4,
+    conditions: Sequence[str] = (),
+) -> List[Chunk]:
+    """Split the artifacts under a prefix into uri ranges small enough to list.
+
+    Ranges of more than `CHUNK_ROWS` artifacts are split where their first
+    and last uris differ, e.g. a month of data by day, into up to `SPLITS`
+    levels of ranges. Each level is counted by one query, and empty ranges
+    are dropped. A range is kept whole if its parts do not add up to it,
+    which would be the case if Luskan sorted uris differently than `BOUNDS`.
+
+    Args:
+        prefix (str): Directory or path prefix.
+        namespace (str, optional): Minoc Namespace. Defaults to "cadc:CHIMEFRB".
+        timeout (int, optional): Timeout of each query. Defaults to 60.
+        client (Optional[CadcTapClient], optional): Shared query client.
+            Defaults to None.
+        workers (int, optional): Concurrent queries, if Luskan rejects
+            grouped counts. Defaults to 4.
+        conditions (Sequence[str], optional): Other ADQL conditions the
+            artifacts must meet. Defaults to ().
+
+    Returns:
+        List[Chunk]: Start and end of each range, None if unbounded.
+    """
+    uri = _uri(prefix, namespace)
+    whole: Chunk = (None, None)
+    chunks: List[Chunk] = []
+    # Ranges with their number of artifacts, and first and last uri.
+    pending = [(whole, *_count(uri, [whole], conditions, timeout, client, workers)[0])]
+    for _ in range(SPLITS):
+        splits = []
+        for chunk, count, first, last in pending:
+            parts = _split(chunk, first, last) if count > CHUNK_ROWS else [chunk]
+            if len(parts) > 1:
+                splits.append((chunk, count, parts))
+            elif count:
+                chunks.append(chunk)
+        flat = [part for _, _, parts in splits for part in parts]
+        stats = iter(_count(uri, flat, conditions, timeout, client, workers))
+        pending = []
+        for chunk, count, parts in splits:
+            counted = [(part, *next(stats)) for part in parts]
+            if sum(counts[1] for counts in counted) != count:
+                chunks.append(chunk)
+            else:
+                pending.extend(counts for counts in counted if counts[1])
+    chunks.extend(chunk for chunk, count, _, _ in pending if count)
+    logger.info(f"Listing {uri} in {len(chunks)} chunks.")
+    return sorted(chunks, key=lambda chunk: chunk[0] or "")
+
+
+def _transient(error: BaseException) -> bool:
+    """Whether a failed query is worth retrying."""
+    if isinstance(error, HTTPError) and error.response is not None:
+        return error.response.status_code >= 500
+    return not isinstance(
+        error,
+        (
+            cadcutils.exceptions.BadRequestException,  # type: ignore
+            cadcutils.exceptions.UnauthorizedException,  # type: ignore
+            cadcutils.exceptions.ForbiddenException,  # type: ignore
+            cadcutils.exceptions.NotFoundException,  # type: ignore
+            ValueError,
+        ),
+    )
+
+
+def _pages(
+    select: str,
+    conditions: List[str],
+    timeout: int = 60,
+    client: Optional[CadcTapClient] = None,
+) -> Iterator[List[List[str]]]:
+    """Rows of a query ordered by uri, a page at a time.
+
+    Each page continues after the last uri of the one before, so a failed
+    page is retried on its own, without listing the earlier pages again.
+
+    Args:
+        select (str): ADQL select of columns, the first being the uri.
+        conditions (List[str]): ADQL conditions.
+        timeout (int, optional): Timeout of each page. Defaults to 60.
+        client (Optional[CadcTapClient], optional): Shared query client.
+            Defaults to None.
+
+    Yields:
+        Iterator[List[List[str]]]: Rows of each page.
+    """
+    last: Optional[str] = None
+    while True:
+        where = conditions + ([f"uri > '{_escape(last)}'"] if last else [])
+        adql = (
+            f"select top {PAGE_ROWS} {select} from inventory.Artifact "
+            f"where {' and '.join(where)} order by uri"
         )
-        content = buffer.getvalue()
+        for attempt in Retrying(
+            stop=stop_after_attempt(RETRIES),
+            wait=RETRY_WAIT,
+            retry=retry_if_exception(_transient),
+            reraise=True,
+        ):
+            with attempt:
+                rows = [*stream_query(adql, timeout, client)]
+        if rows:
+            yield rows
+        if len(rows) < PAGE_ROWS:
+            return
+        last = rows[-1][0]
+
+
+# Marks the end of a stream read by `_merge`.
+DONE = object()
+
+
+def _put(pages: "Queue[Any]", stop: threading.Event, item: Any) -> None:
+    """Queue an item for the reading thread, unless it has stopped reading."""
+    while not stop.is_set():
+        try:
+            pages.put(item, timeout=0.1)
+            return
+        except Full:
+            continue
+
+
+def _drain(
+    stream: Iterator[List[List[str]]], pages: "Queue[Any]", stop: threading.Event
+) -> None:
+    """Queue the pages of a stream, then any error, then DONE."""
+    try:
+        while not stop.is_set():
+            page = next(stream, None)
+            if page is None:
+                break
+            _put(pages, stop, page)
+    except Exception as error:
+        _put(pages, stop, error)
     finally:
-        sys.stdout = original_stdout
-    return float(content.split("\n")[0])
+        _put(pages, stop, DONE)
+
+
+def _merge(streams: List[Iterator[List[List[str]]]], workers: int) -> Iterator[Any]:
+    """Rows of paged streams, read concurrently, as their pages arrive.
+
+    At most `workers` pages wait to be read, so memory stays bounded however
+    many rows the streams hold. Errors are raised in the reading thread.
+
+    Args:
+        streams (List[Iterator[List[List[str]]]]): Pages of rows.
+        workers (int): Streams read at a time.
+
+    Yields:
+        Iterator[Any]: Rows.
+    """
+    pages: "Queue[Any]" = Queue(maxsize=workers)
+    stop = threading.Event()
+    executor = ThreadPoolExecutor(max_workers=max(min(workers, len(streams)), 1))
+    for stream in streams:
+        executor.submit(_drain, stream, pages, stop)
+    remaining = len(streams)
+    try:
+        while remaining:
+            item = pages.get()
+            if item is DONE:
+                remaining -= 1
+            elif isinstance(item, Exception):
+                raise item
+            else:
+                yield from item
+    finally:
+        stop.set()
+        executor.shutdown(wait=False)
+
+
+def stream_prefix(
+    prefix: str,
+    columns: Sequence[str] = ("contentChecksum",),
+    namespace: str = "cadc:CHIMEFRB",
+    timeout: int = 60,
+    client: Optional[CadcTapClient] = None,
+    workers: int = 4,
+    conditions: Sequence[str] = (),
+) -> Iterator[List[str]]:
+    """List the artifacts under a prefix, however many there are.
+
+    The first page of the listing is fetched directly, which is all of it for
+    most datasets. Larger listings are split into uri ranges by
+    `plan_chunks`, listed up to `workers` ranges at a time in pages of
+    `PAGE_ROWS`, and merged as they arrive. Each page is retried on its own
+    on transient failures.
+
+    Args:
+        prefix (str): Directory or path prefix.
+        columns (Sequence[str], optional): Columns listed after the uri.
+            Defaults to ("contentChecksum",).
+        namespace (str, optional): Minoc Namespace. Defaults to "cadc:CHIMEFRB".
+        timeout (int, optional): Timeout of each query. Defaults to 60.
+        client (Optional[CadcTapClient], optional): Shared query client.
+            Defaults to None.
+        workers (int, optional): Concurrent queries. Defaults to 4.
+        conditions (Sequence[str], optional): Other ADQL conditions the
+            artifacts must meet. Defaults to ().
+
+    Yields:
+        Iterator[List[str]]: Uri and columns of each artifact, in no
+            particular order.
+
+    Example:
+        >>> stream_prefix("data/chime/baseband/raw/2023/01/")
+    """
+    if client is None:
+        client = query_client()
+    uri = _uri(prefix, namespace)
+    select = ",".join(["uri", *columns])
+    first = next(
+        _pages(select, _conditions(uri, (None, None)) + [*conditions], timeout, client),
+        [],
+    )
+    yield from first
+    if len(first) < PAGE_ROWS:
+        return
+    # The rest of a large listing, after the first page.
+    rest = [*conditions, f"uri > '{_escape(first[-1][0])}'"]
+    chunks = plan_chunks(prefix, namespace, timeout, client, workers, rest)
+    streams = [
+        _pages(select, _conditions(uri, chunk) + rest, timeout, client)
+        for chunk in chunks
+    ]
+    yield from _merge(streams, workers)
+
+
+def cached(
+    prefix: str,
+    namespace: str = "cadc:CHIMEFRB",
+    timeout: int = 60,
+    client: Optional[CadcTapClient] = None,
+    workers: int = 4,
+    fill: bool = False,
+    fresh: bool = False,
+) -> Optional[artifacts.Cache]:
+    """Bring the local artifact cache up to date for a prefix.
+
+    A cached prefix refreshed in the last `artifact_cache_ttl` seconds is
+    used as it is. Otherwise only the artifacts modified since its high-water
+    mark are listed, and every `artifact_cache_max_age` seconds it is listed
+    in full, to drop deleted artifacts. If a refresh fails, the cache is used
+    as it is, unless a fresh listing was asked for.
+
+    Args:
+        prefix (str): Directory or path prefix.
+        namespace (str, optional): Minoc Namespace. Defaults to "cadc:CHIMEFRB".
+        timeout (int, optional): Timeout of each query. Defaults to 60.
+        client (Optional[CadcTapClient], optional): Shared query client.
+            Defaults to None.
+        workers (int, optional): Concurrent queries. Defaults to 4.
+        fill (bool, optional): List the prefix into the cache if it is not
+            cached yet. Defaults to False.
+        fresh (bool, optional): List the prefix in full now, whatever the
+            age of the cache. Defaults to False.
+
+    Returns:
+        Optional[artifacts.Cache]: Cache holding all the artifacts under the
+            prefix, or None if they are not cached or the cache is disabled.
+    """
+    values = settings()
+    cache = artifacts.open_cache(values)
+    if cache is None:
+        return None
+    uri = _uri(prefix, namespace)
+    entry = None
+    try:
+        entry = cache.covering(uri)
+        if entry is None and not (fill or fresh):
+            return None
+        now = time.time()
+        ttl = float(values.get("artifact_cache_ttl", artifacts.TTL))
+        max_age = float(values.get("artifact_cache_max_age", artifacts.MAX_AGE))
+        if entry is not None and now - entry.refreshed < ttl and not fresh:
+            return cache
+        full = entry is None or fresh or now - entry.listed > max_age
+        target = uri if entry is None or fresh else entry.prefix
+        mark = "" if full or entry is None else entry.mark
+        conditions = [f"lastModified >= '{artifacts.since(mark)}'"] if mark else []
+        space, _, path = target.partition("/")
+        rows = stream_prefix(
+            path, artifacts.COLUMNS, space, timeout, client, workers, conditions
+        )
+        cache.store(target, rows, full, mark)
+    except sqlite3.Error as error:
+        logger.warning(f"Could not use the artifact cache {cache.path}: {error}")
+        return None
+    except Exception as error:
+        if entry is None or fresh:
+            raise
+        logger.warning(f"Could not refresh the cache of {entry.prefix}: {error}")
+    return cache
 
 
 def dataset_md5s(
@@ -284,15 +914,27 @@ def dataset_md5s(
     namespace: str = "cadc:CHIMEFRB",
     timeout: int = 60,
     verbose: int = 0,
+    client: Optional[CadcTapClient] = None,
+    workers: int = 4,
+    fresh: bool = False,
 ) -> Dict[str, str]:
     """Get list of files in a directory.
 
+    Large directories are listed in chunks, see `stream_prefix`, and kept in
+    the local artifact cache, if enabled, see `cached`.
+
     Args:
         directory (str): Directory to get the size of.
         certfile (str, optional): Certificate file. Defaults to None.
         namespace (str, optional): Minoc Namespace. Defaults to "cadc:CHIMEFRB".
         timeout (int, optional): Timeout. Defaults to 60.
         verbose (int, optional): Verbosity. Defaults to 0.
+        client (Optional[CadcTapClient], optional): Shared query client.
+            Defaults to None.
+        workers (int, optional): Concurrent queries. Defaults to 4.
+        fresh (bool, optional): List the directory from Luskan rather than
+            trust the cache, e.g. before changing what Datatrail records.
+            Defaults to False.
 
     Returns:
         Dict[str, str]: Dictionary of file paths and their md5 checksums.
@@ -307,42 +949,18 @@ def dataset_md5s(
     elif verbose > 1:
         logger.setLevel("DEBUG")
 
-    query = f"select uri,contentChecksum from inventory.Artifact where uri like '{namespace}/{directory}%'"  # noqa
-    query = query.replace("//", "/")
-    logger.info(f"Running query: {query}")
-    buffer = StringIO()
-    original_stdout = sys.stdout
-    try:
-        sys.stdout = buffer
-        _, _, queryClient = _connect()
-        queryClient.query(  # type: ignore
-            query=query,
-            output_file=None,
-            response_format="csv",
-            tmptable=None,
-            lang="ADQL",
-            timeout=timeout,
-            data_only=True,
-            no_column_names=True,
+    logger.info(f"Listing checksums under {namespace}/{directory}")
+    cache = cached(directory, namespace, timeout, client, workers, True, fresh)
+    if cache is not None:
+        rows: Iterable[Sequence[str]] = cache.checksums(_uri(directory, namespace))
+    else:
+        rows = stream_prefix(
+            directory, ["contentChecksum"], namespace, timeout, client, workers
         )
-        content = buffer.getvalue()
-    finally:
-        sys.stdout = original_stdout
-    paths = []
-    md5s = []
-    for line in content.split("\n"):
-        if line == "":
-            continue
-        path = line.split(",")[0].replace(namespace + "/", "")
-        try:
-            md5 = line.split(",")[1].replace("md5:", "")
-        except IndexError:
-            md5 = ""
-        paths.append(path)
-        md5s.append(md5)
     data: Dict[str, str] = {}
-    for p, m in zip(paths, md5s):
-        data[p] = m
+    for row in rows:
+        path = row[0].replace(namespace + "/", "")
+        data[path] = row[1].replace("md5:", "") if len(row) > 1 else ""
     return data
 
 
@@ -351,6 +969,7 @@ def query(
     namespace: str = "cadc:CHIMEFRB",
     timeout: int = 60,
     verbose: int = 0,
+    client: Optional[CadcTapClient] = None,
 ) -> List[Any]:
     """Get list of files in a directory.
 
@@ -360,6 +979,8 @@ def query(
         namespace (str, optional): Minoc Namespace. Defaults to "cadc:CHIMEFRB".
         timeout (int, optional): Timeout. Defaults to 60.
         verbose (int, optional): Verbosity. Defaults to 0.
+        client (Optional[CadcTapClient], optional): Shared query client.
+            Defaults to None.
 
     Returns:
         List[str]: List of files in the directory.
@@ -376,25 +997,7 @@ def query(
 
     query = query.replace("//", "/")
     logger.info(f"Running query: {query}")
-    buffer = StringIO()
-    original_stdout = sys.stdout
-    try:
-        sys.stdout = buffer
-        _, _, queryClient = _connect()
-        queryClient.query(  # type: ignore
-            query=query,
-            output_file=None,
-            response_format="csv",
-            tmptable=None,
-            lang="ADQL",
-            timeout=timeout,
-            data_only=True,
-            no_column_names=True,
-        )
-        content = buffer.getvalue()
-    finally:
-        sys.stdout = original_stdout
-    return [line.split(",") for line in content.split("\n")]
+    return [*stream_query(query, timeout, client)]
 
 
 def status(
@@ -409,11 +1012,13 @@ def status(
         bool: True if Minoc is up, False otherwise.
     """
     urls: List[str] = [
-        "https://ws-uv.canfar.net/minoc/capabilities",
-        "https://ws-uv.canfar.net/luskan/capabilities",
+        f"{resource}/capabilities"
+        if resource.startswith("http")
+        else f"https://ws-uv.canfar.net/{resource.split('/')[-1]}/capabilities"
+        for resource in resource_ids()
     ]
     if not certfile:
-        certfile = procure(key="vospace_certfile")
+        certfile = setting("vospace_certfile")
 
     def check_url(url: str) -> bool:
         response = requests.get(url, cert=certfile, allow_redirects=True)
@@ -0,0 +1,300 @@
+"""Local catalog of Datatrail scopes, larger datasets and their children."""
+
+import json
+import logging
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from dtcli import config
+from dtcli.utilities.utilities import imap_unordered
+
+logger = logging.getLogger("catalog")
+
+NAME = "catalog.sqlite"
+
+# Lists the scopes, larger datasets of a scope or children of a larger dataset,
+# with the same arguments and results as `functions.list`.
+Lister = Callable[[Optional[str], Optional[str]], Dict[str, Any]]
+
+SCHEMA = """
+create table if not exists datasets (
+    scope text not null,
+    name text not null,
+    parent text not null,
+    primary key (scope, name, parent)
+);
+create index if not exists datasets_name on datasets (name);
+create table if not exists parents (
+    scope text not null,
+    name text not null,
+    synced real not null,
+    children integer not null,
+    primary key (scope, name)
+);
+"""
+
+# Only names with words, e.g. "classified.FRB", are indexed for full-text
+# search. Numeric names, like event numbers, are found by prefix on the index.
+FTS_SCHEMA = """
+create virtual table if not exists datasets_fts using fts5(
+    name, content='datasets', content_rowid='rowid'
+);
+create trigger if not exists datasets_insert after insert on datasets
+when new.name glob '*[^0-9]*' begin
+    insert into datasets_fts (rowid, name) values (new.rowid, new.name);
+end;
+create trigger if not exists datasets_delete after delete on datasets
+when old.name glob '*[^0-9]*' begin
+    insert into datasets_fts (datasets_fts, rowid, name)
+    values ('delete', old.rowid, old.name);
+end;
+"""
+
+
+def location() -> Path:
+    """Path of the catalog, next to the configuration file."""
+    return config.CONFIG.parent / NAME
+
+
+def connect(catalog: Optional[Path] = None) -> sqlite3.Connection:
+    """Open the catalog, creating it if needed.
+
+    Full-text search is used if SQLite was built with FTS5.
+
+    Args:
+        catalog (Optional[Path]): Catalog file. Defaults to `location()`.
+
+    Returns:
+        sqlite3.Connection: Connection to the catalog.
+    """
+    catalog = catalog or location()
+    catalog.parent.mkdir(parents=True, exist_ok=True)
+    connection = sqlite3.connect(catalog)
+    connection.executescript(SCHEMA)
+    try:
+        connection.executescript(FTS_SCHEMA)
+    except sqlite3.OperationalError as error:
+        logger.info(f"Full-text search unavailable: {error}")
+    return connection
+
+
+def has_fts(connection: sqlite3.Connection) -> bool:
+    """Check if the catalog has a full-text index."""
+    return (
+        connection.execute(
+            "select 1 from sqlite_master where name = 'datasets_fts'"
+        ).fetchone()
+        is not None
+    )
+
+
+def replace(
+    connection: sqlite3.Connection, scope: str, parent: str, names: List[str]
+) -> Tuple[int, int]:
+    """Replace the datasets under a parent, only writing what changed.
+
+    Larger datasets are stored with an empty parent.
+
+    Args:
+        connection (sqlite3.Connection): Catalog connection.
+        scope (str): Scope of datasets.
+        parent (str): Name of larger dataset, or "" for larger datasets.
+        names (List[str]): Names of datasets.
+
+    Returns:
+        Tuple[int, int]: Number of datasets added and removed.
+    """
+    existing = {
+        name
+        for (name,) in connection.execute(
+            "select name from datasets where scope = ? and parent = ?", (scope, parent)
+        )
+    }
+    current = set(names)
+    added = current - existing
+    removed = existing - current
+    connection.executemany(
+        "insert into datasets (scope, name, parent) values (?, ?, ?)",
+        [(scope, name, parent) for name in added],
+    )
+    connection.executemany(
+        "delete from datasets where scope = ? and name = ? and parent = ?",
+        [(scope, name, parent) for name in removed],
+    )
+    return len(added), len(removed)
+
+
+def sync(
+    lister: Lister,
+    catalog: Optional[Path] = None,
+    max_age: float = 86400.0,
+    workers: int = 8,
+) -> Dict[str, int]:
+    """Sync the catalog with Datatrail.
+
+    Scopes and larger datasets are always listed. Children are only fetched,
+    concurrently, for larger datasets that are new or were synced more than
+    `max_age` seconds ago.
+
+    Args:
+        lister (Lister): Lists scopes and datasets, e.g. `functions.list`.
+        catalog (Optional[Path]): Catalog file. Defaults to `location()`.
+        max_age (float): Seconds before children are fetched again.
+            Defaults to one day.
+        workers (int): Number of concurrent requests. Defaults to 8.
+
+    Returns:
+        Dict[str, int]: Number of 'scopes' and 'parents' listed, datasets
+            'added' and 'removed', and 'errors'.
+    """
+    stats = {"scopes": 0, "parents": 0, "added": 0, "removed": 0, "errors": 0}
+    scopes = lister(None, None)
+    if not isinstance(scopes.get("scopes"), list):
+        raise RuntimeError(scopes.get("error", scopes.get("scopes")))
+
+    connection = connect(catalog)
+    with connection:
+        for table in ["datasets", "parents"]:
+            connection.execute(
+                f"delete from {table} where scope not in "
+                "(select value from json_each(?))",
+                (json_list(scopes["scopes"]),),
+            )
+
+    # Larger datasets of each scope.
+    stale: List[Tuple[str, str]] = []
+    cutoff = time.time() - max_age
+    for scope, future in imap_unordered(
+        lambda scope: lister(scope, None), scopes["scopes"], workers
+    ):
+        result = future.exception() or future.result()
+        if isinstance(result, Exception) or "error" in result:
+            logger.warning(f"Could not list {scope}: {result}")
+            stats["errors"] += 1
+            continue
+        stats["scopes"] += 1
+        larger = [*result.get("larger_datasets", [])]
+        synced = dict(
+            connection.execute(
+                "select name, synced from parents where scope = ?", (scope,)
+            ).fetchall()
+        )
+        with connection:
+            added, removed = replace(connection, scope, "", larger)
+            connection.execute(
+                "delete from parents where scope = ? and name not in "
+                "(select value from json_each(?))",
+                (scope, json_list(larger)),
+            )
+            connection.execute(
+                "delete from datasets where scope = ? and parent != '' and parent "
+                "not in (select value from json_each(?))",
+                (scope, json_list(larger)),
+            )
+        stats["added"] += added
+        stats["removed"] += removed
+        stale.extend((scope, name) for name in larger if synced.get(name, 0) < cutoff)
+
+    # Children of new and stale larger datasets.
+    for (scope, parent), future in imap_unordered(
+        lambda item: lister(*item), stale, workers
+    ):
+        result = future.exception() or future.result()
+        if isinstance(result, Exception) or "error" in result:
+            logger.warning(f"Could not list {parent} {scope}: {result}")
+            stats["errors"] += 1
+            continue
+        children = [*result.get("datasets", [])]
+        with connection:
+            added, removed = replace(connection, scope, parent, children)
+            connection.execute(
+                "insert or replace into parents (scope, name, synced, children) "
+                "values (?, ?, ?, ?)",
+                (scope, parent, time.time(), len(children)),
+            )
+        stats["parents"] += 1
+        stats["added"] += added
+        stats["removed"] += removed
+    connection.close()
+    return stats
+
+
+def json_list(values: List[str]) -> str:
+    """Encode a list of strings for SQLite's `json_each`."""
+    return json.dumps(values)
+
+
+def search(
+    pattern: str,
+    catalog: Optional[Path] = None,
+    scope: Optional[str] = None,
+    limit: Optional[int] = 100,
+) -> Iterator[Tuple[str, str, str]]:
+    """Search the catalog for datasets.
+
+    Patterns with glob characters (`*?[`) are matched against the whole name.
+    Otherwise names starting with the pattern are found, along with names with
+    a word starting with it, e.g. "FRB" finds "classified.FRB".
+
+    Args:
+        pattern (str): Glob or prefix to search for.
+        catalog (Optional[Path]): Catalog file. Defaults to `location()`.
+        scope (Optional[str]): Only search this scope. Defaults to None.
+        limit (Optional[int]): Maximum number of results. Defaults to 100.
+
+    Yields:
+        Iterator[Tuple[str, str, str]]: Scope, name and parent of each dataset.
+            Larger datasets have an empty parent.
+    """
+    connection = connect(catalog)
+    arguments: List[Any] = []
+    if any(char in pattern for char in "*?["):
+        where = "name glob ?"
+        arguments.append(pattern)
+    else:
+        where = "(name >= ? and name < ?)"
+        arguments.extend([pattern, pattern + "\uffff"])
+        terms = " ".join(
+            '"' + term.replace('"', '""') + '"*'
+            for term in pattern.replace(".", " ").split()
+        )
+        if terms and has_fts(connection):
+            where = (
+                f"({where} or rowid in "
+                "(select rowid from datasets_fts where datasets_fts match ?))"
+            )
+            arguments.append(terms)
+    if scope:
+        where += " and scope = ?"
+        arguments.append(scope)
+    query = (
+        f"select scope, name, parent from datasets where {where} order by scope, name"
+    )
+    if limit is not None:
+        query += " limit ?"
+        arguments.append(limit)
+    try:
+        yield from connection.execute(query, arguments)
+    finally:
+        connection.close()
+
+
+def status(catalog: Optional[Path] = None) -> Dict[str, Any]:
+    """Summarise the catalog.
+
+    Args:
+        catalog (Optional[Path]): Catalog file. Defaults to `location()`.
+
+    Returns:
+        Dict[str, Any]: Number of 'datasets', 'parents' synced and the time of
+            the 'oldest' and 'newest' sync, or None if never synced.
+    """
+    connection = connect(catalog)
+    datasets = connection.execute("select count(*) from datasets").fetchone()[0]
+    parents, oldest, newest = connection.execute(
+        "select count(*), min(synced), max(synced) from parents"
+    ).fetchone()
+    connection.close()
+    return {"datasets": datasets, "parents": parents, "oldest": oldest, "newest": newest}
@@ -0,0 +1,132 @@
+"""Shared HTTP session for the Datatrail server and the results API."""
+
+import logging
+import threading
+from typing import Any, Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+from urllib3.util.retry import Retry
+
+from dtcli.config import setting
+
+logger = logging.getLogger("http")
+
+# Connections kept open per host, enough for the concurrent batch commands.
+POOL_SIZE = 32
+
+# Defaults for the `http_*` keys of the configuration file.
+DEFAULTS: Dict[str, Any] = {
+    "http_connect_timeout": 10.0,
+    "http_timeout": 120.0,
+    "http_retries": 3,
+    "http_backoff": 0.5,
+    "http_compression": True,
+}
+
+# Read-only endpoints queried with POST, so that they may be retried.
+QUERY_METHODS = Retry.DEFAULT_ALLOWED_METHODS | {"POST"}
+
+_sessions: Dict[bool, requests.Session] = {}
+_lock = threading.Lock()
+
+
+class Session(requests.Session):
+    """Session with a default timeout for every request.
+
+    Args:
+        timeout (Tuple[float, float]): Connect and read timeouts in seconds.
+    """
+
+    def __init__(self, timeout: Any) -> None:
+        """Create the session."""
+        super().__init__()
+        self.timeout = timeout
+
+    def request(self, method: str, url: str, **kwargs: Any) -> requests.Response:
+        """Send a request, with the default timeout unless one is given."""
+        kwargs.setdefault("timeout", self.timeout)
+        return super().request(method, url, **kwargs)
+
+
+def settings(config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """HTTP settings from the configuration file, falling back to the defaults.
+
+    Values set with `datatrail config set` are strings, so they are converted
+    to the type of their default.
+
+    Args:
+        config (Optional[Dict[str, Any]]): Configuration. Defaults to the
+            configuration file, if it exists.
+
+    Returns:
+        Dict[str, Any]: HTTP settings.
+    """
+    values = dict(DEFAULTS)
+    for key, default in DEFAULTS.items():
+        value = setting(key) if config is None else config.get(key)
+        if value is None:
+            continue
+        try:
+            if isinstance(default, bool):
+                values[key] = str(value).lower() in ["1", "true", "yes", "on"]
+            else:
+                values[key] = type(default)(value)
+        except ValueError:
+            logger.warning(f"Ignoring invalid {key}: {value}")
+    return values
+
+
+def create_session(
+    config: Optional[Dict[str, Any]] = None, queries: bool = False
+) -> requests.Session:
+    """Create a session with keep-alive pooling, timeouts and retries.
+
+    Connection errors and 5xx responses are retried with exponential backoff,
+    for the idempotent methods only, since a retried POST may be applied
+    twice. With compression, every encoding urllib3 can decode is accepted, including
+    brotli and zstd when installed.
+
+    Args:
+        config (Optional[Dict[str, Any]]): Configuration. Defaults to the
+            configuration file, if it exists.
+        queries (bool, optional): Also retry POST, for sessions only used for
+            read-only queries. Defaults to False.
+
+    Returns:
+        requests.Session: Session.
+    """
+    values = settings(config)
+    session = Session((values["http_connect_timeout"], values["http_timeout"]))
+    retry = Retry(
+        total=values["http_retries"],
+        backoff_factor=values["http_backoff"],
+        status_forcelist=[500, 502, 503, 504],
+        allowed_methods=QUERY_METHODS if queries else Retry.DEFAULT_ALLOWED_METHODS,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=POOL_SIZE, max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers["Accept-Encoding"] = (
+        ACCEPT_ENCODING if values["http_compression"] else "identity"
+    )
+    logger.debug(f"Created HTTP session with {values}.")
+    return session
+
+
+def session(queries: bool = False) -> requests.Session:
+    """HTTP session shared by all threads, keeping connections alive.
+
+    Args:
+        queries (bool, optional): The session for read-only queries, which
+            retries POST too. Defaults to False.
+
+    Returns:
+        requests.Session: Session, created on first use.
+    """
+    with _lock:
+        if queries not in _sessions:
+            _sessions[queries] = create_session(queries=queries)
+    return _sessions[queries]
@@ -0,0 +1,344 @@
+"""Decode and write large JSON documents a piece at a time."""
+
+import codecs
+import itertools
+import json
+import logging
+import sys
+from json.decoder import scanstring
+from json.encoder import encode_basestring_ascii
+from operator import itemgetter
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    Optional,
+    TextIO,
+    Tuple,
+    Union,
+)
+
+from requests import Response
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger("jsonstream")
+
+CHUNK = 64 * 1024
+# Items of a list encoded at a time when writing.
+ITEMS = 10000
+LOCATIONS = "file_replica_locations"
+WHITESPACE = " \t\n\r"
+
+
+_decoder = json.JSONDecoder()
+
+
+def response_chunks(response: Response, size: int = CHUNK) -> Iterator[bytes]:
+    """Body of a streamed response in chunks, closing it once read.
+
+    Args:
+        response (Response): Response requested with `stream=True`.
+        size (int): Chunk size in bytes. Defaults to 64 KiB.
+
+    Yields:
+        Iterator[bytes]: Chunks of the decompressed body.
+    """
+    try:
+        yield from response.iter_content(chunk_size=size)
+    finally:
+        response.close()
+
+
+class Reader:
+    """Reader of JSON text arriving in chunks.
+
+    Only the unread part of the text is buffered, so memory is bounded by the
+    chunk size and the longest single token, not by the size of the document.
+
+    Args:
+        chunks (Iterable[Union[bytes, str]]): UTF-8 encoded or decoded text.
+    """
+
+    def __init__(self, chunks: Iterable[Union[bytes, str]]) -> None:
+        """Start reading."""
+        self._chunks = iter(chunks)
+        self._decode = codecs.getincrementaldecoder("utf-8")().decode
+        self.buffer = ""
+        self.pos = 0
+        self.done = False
+
+    def fill(self) -> bool:
+        """Read the next chunk into the buffer.
+
+        Returns:
+            bool: False if there was nothing left to read.
+        """
+        if self.done:
+            return False
+        for chunk in self._chunks:
+            text = self._decode(chunk) if isinstance(chunk, bytes) else chunk
+            if text:
+                self.buffer = self.buffer[self.pos :] + text  # noqa: E203
+                self.pos = 0
+                return True
+        self.buffer = self.buffer[self.pos :] + self._decode(b"", True)  # noqa: E203
+        self.pos = 0
+        self.done = True
+        return False
+
+    def peek(self) -> str:
+        """Next character after any whitespace, or "" at the end."""
+        while True:
+            buffer, pos = self.buffer, self.pos
+            while pos < len(buffer) and buffer[pos] in WHITESPACE:
+                pos += 1
+            self.pos = pos
+            if pos < len(buffer):
+                return buffer[pos]
+            if not self.fill():
+                return ""
+
+    def expect(self, chars: str) -> str:
+        """Consume the next character, which must be one of `chars`."""
+        char = self.peek()
+        if not char or char not in chars:
+            raise json.JSONDecodeError(
+                f"Expecting one of {chars!r}", self.buffer, self.pos
+            )
+        self.pos += 1
+        return char
+
+    def string(self) -> str:
+        """Decode the next value, which must be a string."""
+        self.expect('"')
+        while True:
+            try:
+                value, self.pos = scanstring(self.buffer, self.pos)
+                return value
+            except json.JSONDecodeError:
+                # The string continues in the next chunk.
+                if not self.fill():
+                    raise
+
+    def value(self) -> Any:
+        """Decode the next value of any type."""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.pos)
+                # A number at the end of the buffer may continue in the next chunk.
+                if end < len(self.buffer) or self.done:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.done:
+                    raise
+            self.fill()
+
+
+class FindStream:
+    """Decode a `/query/dataset/find` response as it streams in.
+
+    Iterating yields (storage element, file URI) pairs in the order they
+    arrive. The other fields of the response are collected in `fields` as
+    they are passed.
+
+    Args:
+        chunks (Iterable[Union[bytes, str]]): Body of the response.
+    """
+
+    def __init__(self, chunks: Iterable[Union[bytes, str]]) -> None:
+        """Start decoding."""
+        self.reader = Reader(chunks)
+        self.fields: Dict[str, Any] = {}
+
+    def scalar(self) -> Optional[Any]:
+        """Decode the whole response if it is not an object, e.g. an error message.
+
+        Returns:
+            Optional[Any]: The response, or None if it is an object.
+        """
+        if self.reader.peek() == "{":
+            return None
+        return self.reader.value()
+
+    def __iter__(self) -> Iterator[Tuple[str, str]]:
+        """Storage element and URI of each file."""
+        reader = self.reader
+        reader.expect("{")
+        if reader.peek() == "}":
+            reader.pos += 1
+            return
+        while True:
+            key = reader.string()
+            reader.expect(":")
+            if key == LOCATIONS and reader.peek() == "{":
+                yield from self._locations()
+            else:
+                self.fields[key] = reader.value()
+            if reader.expect(",}") == "}":
+                return
+
+    def _locations(self) -> Iterator[Tuple[str, str]]:
+        """Storage element and URI of each file in the replica locations."""
+        reader = self.reader
+        reader.expect("{")
+        if reader.peek() == "}":
+            reader.pos += 1
+            return
+        while True:
+            se = reader.string()
+            reader.expect(":")
+            reader.expect("[")
+            if reader.peek() == "]":
+                reader.pos += 1
+            else:
+                yield from ((se, uri) for uri in self._items())
+            if reader.expect(",}") == "}":
+                return
+
+    def _items(self) -> Iterator[str]:
+        """Strings in an array, up to and including its closing bracket."""
+        reader = self.reader
+        failed = None
+        while True:
+            # Decode all the complete items in the buffer at once. A prefix of
+            # the array that decodes, ending with a quote, ends with a whole item.
+            buffer, pos = reader.buffer, reader.pos
+            cut = buffer.rfind('",', pos)
+            if cut > pos and buffer is not failed:
+                try:
+                    items = json.loads("[" + buffer[pos : cut + 1] + "]")  # noqa: E203
+                except json.JSONDecodeError:
+                    # The array ends in this buffer. Decode the rest one by one.
+                    failed = buffer
+                else:
+                    reader.pos = cut + 2
+                    yield from items
+                    continue
+            yield reader.string()
+            if reader.expect(",]") == "]":
+                return
+
+    def locations(self) -> Iterator[Tuple[str, Iterator[str]]]:
+        """File URIs, grouped by storage element as they arrive.
+
+        Each group must be consumed before the next is read.
+
+        Yields:
+            Iterator[Tuple[str, Iterator[str]]]: Storage element and URIs.
+        """
+        for se, pairs in itertools.groupby(self, key=itemgetter(0)):
+            yield se, map(itemgetter(1), pairs)
+
+
+def dumps(obj: Any, indent: Optional[int] = None) -> str:
+    """Encode a JSON document.
+
+    Compact documents are encoded with orjson when it is installed.
+
+    Args:
+        obj (Any): Document.
+        indent (Optional[int]): Indentation, or None for a compact document.
+
+    Returns:
+        str: Encoded document.
+    """
+    if indent is None:
+        if orjson is not None:
+            try:
+                return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+            except TypeError:
+                pass
+        return json.dumps(obj, separators=(",", ":"))
+    return json.dumps(obj, indent=indent)
+
+
+def write(obj: Any, stream: Optional[TextIO] = None, indent: Optional[int] = 2) -> None:
+    """Write a JSON document, encoding its lists a chunk at a time.
+
+    Lists, tuples and other iterables, such as generators or views of files,
+    are written as arrays without being copied or encoded whole, so memory is
+    bounded by a chunk rather than by the document. With an indent, the
+    output is the same as `json.dumps(obj, indent=indent)`.
+
+    Args:
+        obj (Any): Document.
+        stream (Optional[TextIO]): Stream to write to. Defaults to stdout.
+        indent (Optional[int]): Indentation, or None for a compact document.
+            Defaults to 2.
+    """
+    stream = stream or sys.stdout
+    _write(obj, stream.write, indent, 0)
+    stream.write("\n")
+
+
+def _key(key: Any) -> str:
+    """Encode a key of an object, converting it to a string as json does."""
+    if isinstance(key, str):
+        return encode_basestring_ascii(key)
+    if key is True or key is False or key is None:
+        return f'"{json.dumps(key)}"'
+    if isinstance(key, (int, float)):
+        return f'"{json.dumps(key)}"'
+    raise TypeError(f"keys must be str, int, float, bool or None, not {type(key)}")
+
+
+def _is_array(obj: Any) -> bool:
+    """Whether a value is written as an array."""
+    return not isinstance(obj, (str, bytes, dict)) and hasattr(obj, "__iter__")
+
+
+def _write(
+    obj: Any, write: Callable[[str], Any], indent: Optional[int], level: int
+) -> None:
+    """Write a value at a level of nesting."""
+    is_object = isinstance(obj, dict)
+    if not is_object and not _is_array(obj):
+        write(dumps(obj, indent))
+        return
+    newline = "" if indent is None else "\n" + " " * indent * (level + 1)
+    close = "" if indent is None else "\n" + " " * indent * level
+    if is_object:
+        if not obj:
+            write("{}")
+            return
+        colon = ":" if indent is None else ": "
+        for i, (key, value) in enumerate(obj.items()):
+            write(("{" if i == 0 else ",") + newline + _key(key) + colon)
+            _write(value, write, indent, level + 1)
+        write(close + "}")
+        return
+    items = iter(obj)
+    chunk = [*itertools.islice(items, ITEMS)]
+    if not chunk:
+        write("[]")
+        return
+    write("[")
+    first = True
+    while chunk:
+        if any(isinstance(item, dict) or _is_array(item) for item in chunk):
+            for item in chunk:
+                write(("" if first else ",") + newline)
+                _write(item, write, indent, level + 1)
+                first = False
+        else:
+            # Scalars are encoded together, and contain no newlines to indent.
+            if indent is None:
+                body = dumps(chunk)[1:-1]
+            elif all(type(item) is str for item in chunk):
+                # json only uses its C encoder without an indent.
+                body = ("," + newline).join(map(encode_basestring_ascii, chunk))
+            else:
+                body = dumps(chunk, indent)[1:-1].strip("\n").lstrip(" ")
+                body = body.replace("\n" + " " * indent, newline)
+            write(("" if first else ",") + newline + body)
+            first = False
+        chunk = [*itertools.islice(items, ITEMS)]
+    write(close + "]")
@@ -0,0 +1,324 @@
+"""Local disk-usage ledger for datasets downloaded with Datatrail."""
+
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from dtcli import config
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None  # type: ignore
+
+logger = logging.getLogger("ledger")
+
+NAME = "usage.json"
+
+
+def location() -> Path:
+    """Path of the ledger, next to the configuration file."""
+    return config.CONFIG.parent / NAME
+
+
+@contextmanager
+def locked(ledger: Optional[Path] = None) -> Iterator[Path]:
+    """Hold the ledger's lock, so concurrent pulls do not lose each other's updates.
+
+    Args:
+        ledger (Optional[Path], optional): Ledger file. Defaults to `location()`.
+
+    Yields:
+        Iterator[Path]: Ledger file.
+    """
+    ledger = ledger or location()
+    ledger.parent.mkdir(parents=True, exist_ok=True)
+    with open(ledger.with_suffix(".lock"), "a") as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield ledger
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def key(scope: str, dataset: str) -> str:
+    """Ledger key for a dataset.
+
+    Args:
+        scope (str): Scope of dataset.
+        dataset (str): Name of dataset.
+
+    Returns:
+        str: Key identifying the dataset in the ledger.
+    """
+    return f"{scope}/{dataset}"
+
+
+def load(ledger: Optional[Path] = None) -> Dict[str, Dict[str, Any]]:
+    """Load the usage ledger.
+
+    Args:
+        ledger (Optional[Path], optional): Ledger file. Defaults to
+            `location()`.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: Ledger entries keyed by `scope/dataset`.
+    """
+    ledger = ledger or location()
+    if not ledger.exists():
+        return {}
+    try:
+        with open(ledger) as stream:
+            return json.load(stream)
+    except (OSError, ValueError) as error:
+        logger.warning(f"Could not read usage ledger {ledger}: {error}")
+        return {}
+
+
+def save(entries: Dict[str, Dict[str, Any]], ledger: Optional[Path] = None) -> None:
+    """Save the usage ledger atomically.
+
+    Args:
+        entries (Dict[str, Dict[str, Any]]): Ledger entries.
+        ledger (Optional[Path], optional): Ledger file. Defaults to
+            `location()`.
+    """
+    ledger = ledger or location()
+    ledger.parent.mkdir(parents=True, exist_ok=True)
+    descriptor, tmp = tempfile.mkstemp(dir=ledger.parent, suffix=".tmp")
+    try:
+        with os.fdopen(descriptor, "w") as stream:
+            json.dump(entries, stream, indent=2)
+        os.replace(tmp, ledger)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def measure(paths: Iterable[str]) -> Tuple[int, int]:
+    """Count and size the files that exist on disk.
+
+    Args:
+        paths (Iterable[str]): Local file paths.
+
+    Returns:
+        Tuple[int, int]: Number of files found and their total size in bytes.
+    """
+    files = 0
+    size = 0
+    for path in paths:
+        try:
+            size += os.path.getsize(path)
+            files += 1
+        except OSError:
+            continue
+    return files, size
+
+
+def measure_directory(directory: str) -> Tuple[int, int]:
+    """Count and size all files under a directory.
+
+    Args:
+        directory (str): Directory to walk.
+
+    Returns:
+        Tuple[int, int]: Number of files found and their total size in bytes.
+    """
+    return measure(
+        os.path.join(root, name)
+        for root, _, names in os.walk(directory)
+        for name in names
+    )
+
+
+def record(
+    scope: str,
+    dataset: str,
+    path: str,
+    files: List[str],
+    ledger: Optional[Path] = None,
+) -> Dict[str, Any]:
+    """Record the local usage of a dataset.
+
+    Args:
+        scope (str): Scope of dataset.
+        dataset (str): Name of dataset.
+        path (str): Local common path of the dataset.
+        files (List[str]): Local paths of the dataset's files.
+        ledger (Optional[Path], optional): Ledger file. Defaults to
+            `location()`.
+
+    Returns:
+        Dict[str, Any]: The updated ledger entry.
+    """
+    count, size = measure(files)
+    entry = {
+        "scope": scope,
+        "dataset": dataset,
+        "path": path,
+        "files": count,
+        "bytes": size,
+        "last_used": time.time(),
+    }
+    with locked(ledger) as ledger:
+        entries = load(ledger)
+        entries[key(scope, dataset)] = entry
+        save(entries, ledger)
+    logger.debug(f"Recorded {count} files ({size} bytes) for {scope}/{dataset}.")
+    return entry
+
+
+def touch(scope: str, dataset: str, ledger: Optional[Path] = None) -> None:
+    """Mark a dataset as recently used.
+
+    Args:
+        scope (str): Scope of dataset.
+        dataset (str): Name of dataset.
+        ledger (Optional[Path], optional): Ledger file. Defaults to
+            `location()`.
+    """
+    with locked(ledger) as ledger:
+        entries = load(ledger)
+        entry = entries.get(key(scope, dataset))
+        if entry:
+            entry["last_used"] = time.time()
+            save(entries, ledger)
+
+
+def forget(scope: str, dataset: str, ledger: Optional[Path] = None) -> None:
+    """Remove a dataset from the ledger.
+
+    Args:
+        scope (str): Scope of dataset.
+        dataset (str): Name of dataset.
+        ledger (Optional[Path], optional): Ledger file. Defaults to
+            `location()`.
+    """
+    with locked(ledger) as ledger:
+        entries = load(ledger)
+        if entries.pop(key(scope, dataset), None) is not None:
+            save(entries, ledger)
+
+
+def refresh(ledger: Optional[Path] = None) -> Dict[str, Dict[str, Any]]:
+    """Re-measure every ledger entry from disk, dropping ones that no longer exist.
+
+    Args:
+        ledger (Optional[Path], optional): Ledger file. Defaults to
+            `location()`.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: Refreshed ledger entries.
+    """
+    with locked(ledger) as ledger:
+        entries = load(ledger)
+        for name in [_ for _ in entries]:
+            entry = entries[name]
+            if not os.path.isdir(entry["path"]):
+                logger.info(f"{entry['path']} no longer exists, removing {name}.")
+                del entries[name]
+                continue
+            entry["files"], entry["bytes"] = measure_directory(entry["path"])
+        save(entries, ledger)
+    return entries
+
+
+def existing_parent(directory: str) -> str:
+    """Nearest existing directory at or above a path, e.g. before a first pull.
+
+    Args:
+        directory (str): Directory, which may not exist yet.
+
+    Returns:
+        str: The directory or its nearest existing parent.
+    """
+    directory = os.path.abspath(directory)
+    while not os.path.exists(directory):
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            break
+        directory = parent
+    return directory
+
+
+def free_space(directory: str) -> int:
+    """Free space available on the volume holding a directory.
+
+    Args:
+        directory (str): Directory on the volume. If it does not exist yet,
+            the volume of its nearest existing parent is measured.
+
+    Returns:
+        int: Free space in bytes.
+    """
+    return shutil.disk_usage(existing_parent(directory)).free
+
+
+def same_volume(path: str, directory: str) -> bool:
+    """Whether a path is on the same filesystem as a directory.
+
+    Args:
+        path (str): Path, e.g. of a downloaded dataset.
+        directory (str): Directory, which may not exist yet.
+
+    Returns:
+        bool: False if the path does not exist.
+    """
+    try:
+        return os.stat(path).st_dev == os.stat(existing_parent(directory)).st_dev
+    except OSError:
+        return False
+
+
+def eviction_candidates(
+    required: int,
+    free: int,
+    directory: str,
+    exclude: Optional[str] = None,
+    ledger: Optional[Path] = None,
+) -> Optional[List[Dict[str, Any]]]:
+    """Least-recently-used datasets to clear to make room for a download.
+
+    Only datasets on the same filesystem as the download directory are
+    considered, since clearing others would free nothing for the download.
+
+    Args:
+        required (int): Bytes needed for the download.
+        free (int): Bytes currently free on the volume.
+        directory (str): Directory the download goes to.
+        exclude (Optional[str], optional): Ledger key never to evict, usually
+            the dataset being pulled. Defaults to None.
+        ledger (Optional[Path], optional): Ledger file. Defaults to
+            `location()`.
+
+    Returns:
+        Optional[List[Dict[str, Any]]]: Datasets to evict, oldest first. Empty if
+            there is already enough space, None if evicting everything recorded
+            on the volume would still not be enough.
+    """
+    candidates: List[Dict[str, Any]] = []
+    entries = load(ledger)
+    ordered = sorted(
+        (
+            entry
+            for name, entry in entries.items()
+            if name != exclude and same_volume(entry.get("path", ""), directory)
+        ),
+        key=lambda entry: entry.get("last_used", 0),
+    )
+    for entry in ordered:
+        if free >= required:
+            break
+        candidates.append(entry)
+        free += entry.get("bytes", 0)
+    if free < required:
+        return None
+    return candidates
@@ -0,0 +1,268 @@
+"""Map Minoc file URIs to paths relative to their namespace and on disk."""
+
+import logging
+import os
+import sys
+from array import array
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Set,
+    Tuple,
+    Union,
+)
+
+logger = logging.getLogger("paths")
+
+NAMESPACE = "cadc:CHIMEFRB"
+
+
+def split(uri: str) -> Tuple[str, str]:
+    """Split a file URI into its namespace and normalised relative path.
+
+    URIs from Datatrail come as "cadc:CHIMEFRB/data/...", "/data/..." or
+    "data/...", sometimes with repeated slashes.
+
+    Args:
+        uri (str): File URI or path.
+
+    Returns:
+        Tuple[str, str]: Namespace, empty if there is none, and path relative
+            to it, e.g. ("cadc:CHIMEFRB", "data/chime/...").
+    """
+    namespace = ""
+    slash = uri.find("/")
+    if slash > 0 and ":" in uri[:slash]:
+        namespace, uri = uri[:slash], uri[slash:]
+    while "//" in uri:
+        uri = uri.replace("//", "/")
+    return namespace, uri.lstrip("/")
+
+
+def relative(uri: str) -> str:
+    """Path of a file URI relative to its namespace.
+
+    Args:
+        uri (str): File URI or path.
+
+    Returns:
+        str: Relative path, e.g. "data/chime/...".
+    """
+    return split(uri)[1]
+
+
+def directory_prefix(directory: str) -> str:
+    """Normalise a local directory to a prefix ending in a slash."""
+    if not directory:
+        return directory
+    while "//" in directory:
+        directory = directory.replace("//", "/")
+    return directory if directory.endswith("/") else directory + "/"
+
+
+class FolderTable:
+    """Distinct folders of a file map, interned and numbered."""
+
+    __slots__ = ("folders", "lookup")
+
+    def __init__(self) -> None:
+        """Create an empty table."""
+        self.folders: List[str] = []
+        self.lookup: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        """Number of folders."""
+        return len(self.folders)
+
+
+class FileView:
+    """Files selected from a FileMap, by their positions in it.
+
+    Views share the folders and names of their map, so splitting a dataset
+    into, e.g., missing and existing files copies no strings.
+
+    Args:
+        file_map (FileMap): Map the files are selected from.
+        positions (Iterable[int]): Positions of the files in the map.
+    """
+
+    __slots__ = ("file_map", "positions")
+
+    def __init__(self, file_map: "FileMap", positions: Iterable[int] = ()) -> None:
+        """Select the files."""
+        self.file_map = file_map
+        self.positions = array("I", positions)
+
+    def _records(self) -> Iterable[Tuple[int, str]]:
+        """Folder number and name of each file."""
+        index, names = self.file_map.index, self.file_map.names
+        return ((index[p], names[p]) for p in self.positions)
+
+    def __len__(self) -> int:
+        """Number of files."""
+        return len(self.positions)
+
+    def __iter__(self) -> Iterator[str]:
+        """Paths of the files relative to the namespace."""
+        folders = self.file_map.table.folders
+        for i, name in self._records():
+            yield folders[i] + "/" + name if folders[i] else name
+
+    def _join(self, prefix: str) -> List[str]:
+        """Paths of the files, each prefixed with `prefix`."""
+        folders = [
+            prefix + folder + "/" if folder else prefix
+            for folder in self.file_map.table.folders
+        ]
+        return [folders[i] + name for i, name in self._records()]
+
+    def _folders(self) -> List[str]:
+        """Folders holding the files."""
+        folders = self.file_map.table.folders
+        return [folders[i] for i in sorted({i for i, _ in self._records()})]
+
+    def paths(self) -> List[str]:
+        """Paths of the files relative to the namespace, e.g. "data/chime/..."."""
+        return self._join("")
+
+    def uris(self) -> List[str]:
+        """URIs of the files, e.g. "cadc:CHIMEFRB/data/chime/..."."""
+        return self._join(self.file_map.namespace + "/")
+
+    def destinations(self, directory: str) -> List[str]:
+        """Local paths of the files under a directory.
+
+        Args:
+            directory (str): Directory mirroring the namespace.
+
+        Returns:
+            List[str]: Local path of each file.
+        """
+        return self._join(directory_prefix(directory))
+
+    def local_folders(self, directory: str) -> Set[str]:
+        """Local folders holding the files under a directory.
+
+        Args:
+            directory (str): Directory mirroring the namespace.
+
+        Returns:
+            Set[str]: Folders to create before downloading.
+        """
+        prefix = directory_prefix(directory)
+        return {
+            prefix + folder if folder else os.path.dirname(prefix) or "."
+            for folder in self._folders()
+        }
+
+    def common_path(self) -> str:
+        """Longest path common to all files, relative to the namespace.
+
+        As with os.path.commonpath, this is the file itself for a single file.
+        """
+        if len(self) == 1:
+            return self.paths()[0]
+        return self.common_folder()
+
+    def common_folder(self) -> str:
+        """Longest folder common to all files, relative to the namespace."""
+        folders = self._folders()
+        return os.path.commonpath(folders) if folders else ""
+
+    def select(self, predicate: Callable[[str], bool]) -> "FileView":
+        """View of the files whose relative paths satisfy a predicate.
+
+        Args:
+            predicate (Callable[[str], bool]): Test of a relative path.
+
+        Returns:
+            FileView: Files selected.
+        """
+        return FileView(
+            self.file_map,
+            (p for p, path in zip(self.positions, self) if predicate(path)),
+        )
+
+
+class FileMap(FileView):
+    """Files of a dataset at Minoc, mapped to their local destinations.
+
+    URIs are parsed once. Each distinct folder is stored once, interned, and
+    each file as the number of its folder and its name, so that datasets of
+    100k+ files stay cheap to hold and to map.
+
+    Args:
+        uris (Iterable[str]): File URIs or paths from Datatrail.
+        namespace (str): Minoc namespace. URIs in other namespaces are
+            skipped. Defaults to "cadc:CHIMEFRB".
+    """
+
+    __slots__ = ("namespace", "table", "index", "names")
+
+    def __init__(self, uris: Iterable[str] = (), namespace: str = NAMESPACE) -> None:
+        """Parse the URIs."""
+        self.file_map = self
+        self.namespace = namespace
+        self.table = FolderTable()
+        self.index = array("I")
+        self.names: List[str] = []
+        self.extend(uris)
+
+    @property  # type: ignore[override]
+    def positions(self) -> range:  # type: ignore[override]
+        """Positions of all the files."""
+        return range(len(self.names))
+
+    def extend(self, uris: Iterable[str]) -> None:
+        """Add files to the map.
+
+        Args:
+            uris (Iterable[str]): File URIs or paths from Datatrail.
+        """
+        folders, lookup = self.table.folders, self.table.lookup
+        index, names = self.index.append, self.names.append
+        skipped = 0
+        for uri in uris:
+            namespace, path = split(uri)
+            if namespace and namespace != self.namespace:
+                skipped += 1
+                continue
+            folder, _, name = path.rpartition("/")
+            position = lookup.get(folder)
+            if position is None:
+                position = lookup[folder] = len(folders)
+                folders.append(sys.intern(folder))
+            index(position)
+            names(name)
+        if skipped:
+            logger.warning(f"Skipped {skipped} files outside {self.namespace}.")
+
+    def _records(self) -> Iterable[Tuple[int, str]]:
+        """Folder number and name of each file."""
+        return zip(self.index, self.names)
+
+    def view(self, positions: Iterable[int]) -> FileView:
+        """View of the files at some positions.
+
+        Args:
+            positions (Iterable[int]): Positions of the files.
+
+        Returns:
+            FileView: Files selected.
+        """
+        return FileView(self, positions)
+
+
+def view(files: Union[Iterable[str], FileView]) -> FileView:
+    """Files as a view, parsing them if they are URIs or paths.
+
+    Args:
+        files (Union[Iterable[str], FileView]): Files.
+
+    Returns:
+        FileView: Files.
+    """
+    return files if isinstance(files, FileView) else FileMap(files)
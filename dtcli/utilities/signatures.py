@@ -0,0 +1,217 @@
+"""Signatures for grouping the reasons datasets could not be registered."""
+
+import hashlib
+import json
+import logging
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import yaml
+
+from dtcli import config
+
+logger = logging.getLogger("signatures")
+
+NAME = "signatures.yaml"
+
+IDS_RE = re.compile(r"\d+")
+SPACE_RE = re.compile(r"\s+")
+
+# Built-in rules, tried in order. See `Rule` for the meaning of each field.
+DEFAULT_RULES: List[Dict[str, Any]] = [
+    {
+        "category": "ATTACH_MISSING",
+        "keyword": "Could not attach datasets: ",
+        "pattern": r"Could not attach datasets: .+? ERROR: \"?dataset (.+?), (.+?) not found",  # noqa: E501
+        "template": "{1}:{2}",
+    },
+    {
+        "category": "CREATE_DUPLICATE",
+        "keyword": "Could not create dataset: ",
+        "pattern": r"Could not create dataset: (.+?), scope: (.+?)\. .*UniqueViolation",
+        "template": "{1}:{2}",
+        "ids": [1],
+    },
+    {"category": "POSTGRES", "keyword": "psycopg", "squash": True, "limit": 120},
+    {"category": "STATUS", "max_length": 79, "single_line": True},
+    {"category": "OTHER", "ids": [0], "squash": True, "limit": 120},
+]
+
+
+class Rule:
+    """A rule mapping reason messages to a signature.
+
+    A message matches a rule if it contains the rule's keyword, its pattern is
+    found in the message and it satisfies the length and line conditions. The
+    signature is `<category>:<template>`, where the template is formatted with
+    the message as `{0}` and the pattern's groups as `{1}`, `{2}`, ...
+
+    Args:
+        category (str): Signature category, e.g. "POSTGRES".
+        keyword (Optional[str]): Literal text the message must contain.
+        pattern (Optional[str]): Regular expression searched for in the message.
+        template (str): Format of the signature after the category.
+            Defaults to "{0}".
+        ids (List[int]): Fields in which digits are replaced by "<ID>".
+        squash (bool): Collapse whitespace in the message. Defaults to False.
+        limit (Optional[int]): Truncate the message to this many characters.
+        max_length (Optional[int]): Only match messages up to this length.
+        single_line (bool): Only match messages without newlines.
+            Defaults to False.
+    """
+
+    def __init__(
+        self,
+        category: str,
+        keyword: Optional[str] = None,
+        pattern: Optional[str] = None,
+        template: str = "{0}",
+        ids: Optional[List[int]] = None,
+        squash: bool = False,
+        limit: Optional[int] = None,
+        max_length: Optional[int] = None,
+        single_line: bool = False,
+    ) -> None:
+        """Compile the rule."""
+        self.category = category
+        self.keyword = keyword
+        self.pattern = re.compile(pattern) if pattern else None
+        self.template = template
+        self.ids = ids or []
+        self.squash = squash
+        self.limit = limit
+        self.max_length = max_length
+        self.single_line = single_line
+
+    def apply(self, msg: str) -> Optional[str]:
+        """Create the signature of a message, if it matches the rule.
+
+        Args:
+            msg (str): Stripped reason message.
+
+        Returns:
+            Optional[str]: Signature, or None if the message does not match.
+        """
+        if self.max_length is not None and len(msg) > self.max_length:
+            return None
+        if self.single_line and "\n" in msg:
+            return None
+        fields = [msg]
+        if self.pattern:
+            m = self.pattern.search(msg)
+            if not m:
+                return None
+            fields.extend(m.groups())
+        for index in self.ids:
+            fields[index] = IDS_RE.sub("<ID>", fields[index])
+        if self.squash:
+            fields[0] = SPACE_RE.sub(" ", fields[0])
+        if self.limit is not None:
+            fields[0] = fields[0][: self.limit]
+        if self.template == "{0}":
+            return f"{self.category}:{fields[0]}"
+        return f"{self.category}:{self.template.format(*fields)}"
+
+
+class SignatureEngine:
+    """Classify reason messages with a table of rules.
+
+    A single combined search first checks whether any rule keyword occurs in
+    a message. Only if one does are the rules' keywords looked for one by one,
+    and only the rules whose keyword occurs have their patterns tried. Results
+    are memoised, since most messages are exact duplicates.
+
+    Args:
+        rules (List[Dict[str, Any]]): Rules, tried in order.
+        cache (int): Number of messages to memoise. Defaults to 65536.
+    """
+
+    def __init__(self, rules: List[Dict[str, Any]], cache: int = 65536) -> None:
+        """Compile the rules and their combined pre-filter."""
+        self.rules = [Rule(**rule) for rule in rules]
+        self.dispatch = [(rule.keyword, rule.apply) for rule in self.rules]
+        self.fingerprint = hashlib.sha1(
+            json.dumps(rules, sort_keys=True).encode()
+        ).hexdigest()
+        keywords = sorted({rule.keyword for rule in self.rules if rule.keyword})
+        self.prefilter = (
+            re.compile("|".join(re.escape(keyword) for keyword in keywords))
+            if keywords
+            else None
+        )
+        self.classify: Callable[[str], str] = lru_cache(maxsize=cache)(self._classify)
+
+    def _classify(self, msg: str) -> str:
+        """Create the signature of a message.
+
+        Args:
+            msg (str): Reason message.
+
+        Returns:
+            str: Signature of the message.
+        """
+        msg = msg.strip()
+        # Matches found by the search can hide keywords nested inside them,
+        # so it only tells whether any keyword occurs at all.
+        any_keyword = bool(self.prefilter and self.prefilter.search(msg))
+        for keyword, apply in self.dispatch:
+            if keyword and not (any_keyword and keyword in msg):
+                continue
+            signature = apply(msg)
+            if signature is not None:
+                return signature
+        return f"UNKNOWN:{SPACE_RE.sub(' ', msg)[:120]}"
+
+
+def location() -> Path:
+    """Path of the rules file, next to the configuration file."""
+    return config.CONFIG.parent / NAME
+
+
+def load(path: Optional[Path] = None) -> List[Dict[str, Any]]:
+    """Load the rule table.
+
+    Rules listed under `rules` in the file are tried before the built-in rules,
+    for example:
+
+        rules:
+          - category: TOKEN
+            keyword: token
+            pattern: "token (expired|invalid)"
+            template: "{1}"
+
+    Args:
+        path (Optional[Path]): Rules file. Defaults to `location()`.
+
+    Returns:
+        List[Dict[str, Any]]: Rules, in order.
+    """
+    path = path or location()
+    if not path.exists():
+        return DEFAULT_RULES
+    try:
+        with open(path) as stream:
+            custom = (yaml.safe_load(stream) or {}).get("rules") or []
+        for rule in custom:
+            Rule(**rule)
+    except (OSError, yaml.YAMLError, TypeError, AttributeError, re.error) as error:
+        logger.warning(f"Ignoring invalid signature rules in {path}: {error}")
+        return DEFAULT_RULES
+    return custom + DEFAULT_RULES
+
+
+_engine: Optional[SignatureEngine] = None
+
+
+def engine() -> SignatureEngine:
+    """Signature engine for the configured rule table.
+
+    Returns:
+        SignatureEngine: Engine, created on first use.
+    """
+    global _engine
+    if _engine is None:
+        _engine = SignatureEngine(load())
+    return _engine
@@ -0,0 +1,939 @@
+"""Local stand-in for the Datatrail server, Workflow Results, Minoc and Luskan.
+
+Serves synthetic datasets over HTTP so that commands can be tested and
+benchmarked offline. Latency, bandwidth and errors can be injected. Point the
+CLI at it with the configuration returned by `StandIn.config`, or run it with:
+
+    python -m dtcli.utilities.standin --port 1234 --files 100
+"""
+
+import argparse
+import bisect
+import hashlib
+import json
+import logging
+import random
+import re
+import threading
+import time
+from base64 import b64encode
+from datetime import datetime, timezone
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+logger = logging.getLogger("standin")
+
+NAMESPACE = "cadc:CHIMEFRB"
+FILES_STANDARD_ID = "http://www.opencadc.org/std/storage#files-1.0"
+TAP_STANDARD_ID = "ivo://ivoa.net/std/TAP"
+# Bytes of synthetic content, repeated to fill each file.
+BLOCK = 1 << 16
+
+CAPABILITIES = """<?xml version="1.0" encoding="UTF-8"?>
+<vosi:capabilities xmlns:vosi="http://www.ivoa.net/xml/VOSICapabilities/v1.0"
+    xmlns:vs="http://www.ivoa.net/xml/VODataService/v1.1"
+    xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">
+  <capability standardID="{standard}">
+    <interface xsi:type="vs:ParamHTTP" role="std">
+      <accessURL use="base">{url}</accessURL>
+    </interface>
+  </capability>
+</vosi:capabilities>
+"""
+
+SELECT_RE = re.compile(
+    r"^select\s+(?:top\s+(?P<top>\d+)\s+)?(?P<columns>.+?)\s+"
+    r"from\s+inventory\.artifact"
+    r"(?:\s+where\s+(?P<where>.+?))?"
+    r"(?:\s+order\s+by\s+(?P<order>\w+)(?:\s+(?P<direction>asc|desc))?)?\s*$",
+    re.IGNORECASE | re.DOTALL,
+)
+CONDITION_RE = re.compile(
+    r"^(?P<column>\w+)\s*(?P<operator>like|>=|<=|>|<|=)\s*'(?P<value>(?:[^']|'')*)'$",
+    re.IGNORECASE,
+)
+COLUMN_RE = re.compile(
+    r"^(?:(?P<literal>-?\d+)|(?P<function>count|sum|min|max)\((?P<argument>[\w*]+)\)|"
+    r"(?P<name>\w+))(?:\s+as\s+(?P<alias>\w+))?$",
+    re.IGNORECASE,
+)
+
+
+class QueryError(ValueError):
+    """ADQL query not supported by the stand-in."""
+
+
+class Artifact:
+    """A synthetic file stored at Minoc.
+
+    Args:
+        path (str): Path of the file, without the namespace.
+        size (int): Size in bytes.
+        modified (float): Last modified time, in seconds since the epoch.
+    """
+
+    __slots__ = ("path", "size", "modified", "_md5")
+
+    def __init__(self, path: str, size: int, modified: float) -> None:
+        """Create the artifact."""
+        self.path = path
+        self.size = size
+        self.modified = modified
+        self._md5: Optional[str] = None
+
+    @property
+    def uri(self) -> str:
+        """Minoc URI of the file."""
+        return f"{NAMESPACE}/{self.path}"
+
+    @property
+    def md5(self) -> str:
+        """MD5 checksum of the content, computed on first use."""
+        if self._md5 is None:
+            digest = hashlib.md5()
+            for chunk in content(self.path, 0, self.size):
+                digest.update(chunk)
+            self._md5 = digest.hexdigest()
+        return self._md5
+
+    def column(self, name: str) -> Any:
+        """Value of a Luskan `inventory.Artifact` column."""
+        name = name.lower()
+        if name == "uri":
+            return self.uri
+        if name == "contentlength":
+            return self.size
+        if name == "contentchecksum":
+            return f"md5:{self.md5}"
+        if name == "lastmodified":
+            return isoformat(self.modified)
+        if name == "contenttype":
+            return "application/octet-stream"
+        raise QueryError(f"Unknown column {name}")
+
+
+def isoformat(timestamp: float) -> str:
+    """Format a timestamp the way Luskan does."""
+    moment = datetime.fromtimestamp(timestamp, tz=timezone.utc)
+    return moment.strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3]
+
+
+def content(path: str, start: int, end: int) -> Iterator[bytes]:
+    """Deterministic synthetic content of a file.
+
+    Args:
+        path (str): Path of the file, which seeds the content.
+        start (int): First byte.
+        end (int): Byte after the last one.
+
+    Yields:
+        Iterator[bytes]: Chunks of content.
+    """
+    seed = hashlib.sha256(path.encode()).digest()
+    block = seed * (BLOCK // len(seed))
+    position = start
+    while position < end:
+        offset = position % BLOCK
+        stop = offset + min(end - position, BLOCK - offset)
+        chunk = block[offset:stop]
+        position += len(chunk)
+        yield chunk
+
+
+class Dataset:
+    """A synthetic Datatrail dataset.
+
+    Args:
+        scope (str): Scope of dataset.
+        name (str): Name of dataset.
+        larger (Optional[str]): Larger dataset it belongs to.
+        storage_elements (Sequence[str]): Storage elements holding the files.
+    """
+
+    def __init__(
+        self,
+        scope: str,
+        name: str,
+        larger: Optional[str],
+        storage_elements: Sequence[str],
+    ) -> None:
+        """Create the dataset."""
+        self.scope = scope
+        self.name = name
+        self.larger = larger
+        self.children: List[str] = []
+        self.storage_elements = [*storage_elements]
+        self.basepath = f"data/{scope.replace('.', '/')}/{name}"
+        # Files registered in Datatrail, and stored, at each storage element.
+        self.registered: Dict[str, List[str]] = {se: [] for se in storage_elements}
+        self.stored: Dict[str, List[str]] = {se: [] for se in storage_elements}
+
+    def locations(self) -> Dict[str, List[str]]:
+        """File replica locations, as returned by `/query/dataset/find`."""
+        return {
+            se: [
+                f"{NAMESPACE}/{path}" if se == "minoc" else f"/{path}" for path in paths
+            ]
+            for se, paths in self.registered.items()
+        }
+
+    def policy(self) -> Dict[str, Any]:
+        """Replication and deletion policies of the dataset."""
+        return {
+            "name": self.name,
+            "scope": self.scope,
+            "replication_policy": {
+                "preferred_storage_elements": self.storage_elements,
+                "priority": "medium",
+                "default": True,
+            },
+            "deletion_policy": [
+                {
+                    "storage_element": se,
+                    "priority": "medium",
+                    "default": True,
+                    "delete_after_days": 0 if se == "minoc" else 30,
+                }
+                for se in self.storage_elements
+            ],
+            "belongs_to": [{"name": self.larger, "scope": self.scope}]
+            if self.larger
+            else [],
+        }
+
+
+class StandIn:
+    """Local stand-in server.
+
+    Args:
+        host (str): Host to listen on. Defaults to "127.0.0.1".
+        port (int): Port to listen on. Defaults to 0, any free port.
+        latency (float): Seconds added before every response. Defaults to 0.
+        bandwidth (Optional[float]): Bytes per second for each file download.
+            Defaults to None, unlimited.
+        error_rate (float): Fraction of requests answered with HTTP 503.
+            Defaults to 0.
+        union (bool): Accept `union all` Luskan queries. Defaults to True.
+        seed (int): Seed for the injected errors. Defaults to 0.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        bandwidth: Optional[float] = None,
+        error_rate: float = 0.0,
+        union: bool = True,
+        seed: int = 0,
+    ) -> None:
+        """Create the stand-in, without starting it."""
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.error_rate = error_rate
+        self.union = union
+        self.datasets: Dict[Tuple[str, str], Dataset] = {}
+        self.artifacts: Dict[str, Artifact] = {}
+        self.results: Dict[str, List[Dict[str, Any]]] = {}
+        self.requests: Dict[str, int] = {}
+        self._failures: List[List[Any]] = []
+        self._uris: Optional[List[str]] = None
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """Base URL of the stand-in."""
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def config(self, **overrides: Any) -> Dict[str, Any]:
+        """CLI configuration using the stand-in for every service.
+
+        Args:
+            **overrides (Any): Other configuration values.
+
+        Returns:
+            Dict[str, Any]: Configuration.
+        """
+        config = {
+            "server": f"{self.url}/datatrail",
+            "results": f"{self.url}/results",
+            "minoc": f"{self.url}/minoc",
+            "luskan": f"{self.url}/luskan",
+            "site": "local",
+            "root_mounts": {"local": "./"},
+        }
+        config.update(overrides)
+        return config
+
+    def start(self) -> "StandIn":
+        """Serve requests in a background thread."""
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        logger.info(f"Stand-in serving at {self.url}.")
+        return self
+
+    def stop(self) -> None:
+        """Stop serving requests."""
+        self.server.shutdown()
+        self.server.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self) -> "StandIn":
+        """Start the stand-in."""
+        return self.start()
+
+    def __exit__(self, *args: Any) -> None:
+        """Stop the stand-in."""
+        self.stop()
+
+    def add_dataset(
+        self,
+        scope: str,
+        name: str,
+        files: int = 10,
+        size: int = 1024,
+        larger: Optional[str] = None,
+        storage_elements: Sequence[str] = ("minoc",),
+        unregistered: int = 0,
+        modified: Optional[float] = None,
+    ) -> Dataset:
+        """Add a dataset of synthetic files.
+
+        Args:
+            scope (str): Scope of dataset.
+            name (str): Name of dataset.
+            files (int): Number of files registered in Datatrail. Defaults to 10.
+            size (int): Size of each file in bytes. Defaults to 1024.
+            larger (Optional[str]): Larger dataset it belongs to, created if
+                needed. Defaults to None.
+            storage_elements (Sequence[str]): Storage elements holding the
+                files. Defaults to ("minoc",).
+            unregistered (int): Files stored at every storage element, but not
+                registered in Datatrail. Defaults to 0.
+            modified (Optional[float]): Last modified time of the files.
+                Defaults to now.
+
+        Returns:
+            Dataset: Dataset added.
+        """
+        modified = time.time() if modified is None else modified
+        dataset = Dataset(scope, name, larger, storage_elements)
+        paths = [f"{dataset.basepath}/file_{index:06d}.dat" for index in range(files)]
+        extra = [
+            f"{dataset.basepath}/unregistered_{index:06d}.dat"
+            for index in range(unregistered)
+        ]
+        with self._lock:
+            for se in storage_elements:
+                dataset.registered[se] = [*paths]
+                dataset.stored[se] = paths + extra
+            if "minoc" in storage_elements:
+                for path in paths + extra:
+                    self.artifacts[path] = Artifact(path, size, modified)
+                self._uris = None
+            self.datasets[(scope, name)] = dataset
+            if larger:
+                parent = self.datasets.get((scope, larger))
+                if parent is None:
+                    parent = Dataset(scope, larger, None, storage_elements)
+                    self.datasets[(scope, larger)] = parent
+                parent.children.append(name)
+        return dataset
+
+    def add_results(self, pipeline: str, records: Sequence[Dict[str, Any]]) -> None:
+        """Add records to a Workflow Results pipeline."""
+        with self._lock:
+            self.results.setdefault(pipeline, []).extend(records)
+
+    def fail(self, path: str, count: int = 1, status: int = 503) -> None:
+        """Fail the next requests for paths starting with `path`.
+
+        Args:
+            path (str): Path prefix, e.g. "/datatrail/query/dataset/find".
+            count (int): Number of requests to fail. Defaults to 1.
+            status (int): HTTP status to reply with. Defaults to 503.
+        """
+        with self._lock:
+            self._failures.append([path, count, status])
+
+    def failure(self, path: str) -> Optional[int]:
+        """HTTP status to fail a request with, if any."""
+        with self._lock:
+            for failure in self._failures:
+                if path.startswith(failure[0]) and failure[1] > 0:
+                    failure[1] -= 1
+                    return failure[2]
+            if self.error_rate and self._random.random() < self.error_rate:
+                return 503
+        return None
+
+    def count(self, route: str) -> None:
+        """Count a request to a route."""
+        with self._lock:
+            self.requests[route] = self.requests.get(route, 0) + 1
+
+    def uris(self) -> List[str]:
+        """Sorted paths of all artifacts, for prefix searches."""
+        with self._lock:
+            if self._uris is None:
+                self._uris = sorted(self.artifacts)
+            return self._uris
+
+    def query(self, adql: str, maxrec: Optional[int] = None) -> List[List[Any]]:
+        """Run a Luskan ADQL query on the artifacts.
+
+        Supports `select [top n] <columns> from inventory.Artifact [where
+        <conditions>] [order by <column>]`, combined with `union all`. Columns
+        may be literals, `count(*)`, the `sum`, `min` or `max` of a column, or
+        artifact columns, and conditions are joined with `and`.
+
+        Args:
+            adql (str): ADQL query.
+            maxrec (Optional[int]): Maximum number of rows. Defaults to None.
+
+        Raises:
+            QueryError: If the query is not supported.
+
+        Returns:
+            List[List[Any]]: Header followed by rows.
+        """
+        selects = re.split(r"\s+union\s+all\s+", adql.strip(), flags=re.IGNORECASE)
+        if len(selects) > 1 and not self.union:
+            raise QueryError("UNION is not supported")
+        header: List[str] = []
+        rows: List[List[Any]] = []
+        for select in selects:
+            names, result = self._select(select)
+            header = header or names
+            rows.extend(result)
+        if maxrec is not None:
+            rows = rows[:maxrec]
+        return [header] + rows
+
+    def _select(self, select: str) -> Tuple[List[str], List[List[Any]]]:
+        """Run a single ADQL select."""
+        match = SELECT_RE.match(select.strip())
+        if not match:
+            raise QueryError(f"Cannot parse query: {select}")
+        artifacts = self._where(match["where"])
+        if match["order"]:
+            column = match["order"]
+            artifacts.sort(
+                key=lambda artifact: artifact.column(column),
+                reverse=(match["direction"] or "").lower() == "desc",
+            )
+        if match["top"]:
+            artifacts = artifacts[: int(match["top"])]
+        columns = []
+        for column in match["columns"].split(","):
+            parsed = COLUMN_RE.match(column.strip())
+            if not parsed:
+                raise QueryError(f"Cannot parse column: {column}")
+            columns.append(parsed)
+        names = [
+            column["alias"] or column["name"] or column["function"] or column["literal"]
+            for column in columns
+        ]
+        if any(column["function"] for column in columns):
+            return names, [[self._aggregate(column, artifacts) for column in columns]]
+        return names, [
+            [
+                column["literal"]
+                if column["literal"]
+                else artifact.column(column["name"])
+                for column in columns
+            ]
+            for artifact in artifacts
+        ]
+
+    def _aggregate(self, column: "re.Match[str]", artifacts: List[Artifact]) -> Any:
+        """Value of a column of an aggregate query."""
+        if column["literal"]:
+            return column["literal"]
+        if column["function"] and column["function"].lower() == "count":
+            return len(artifacts)
+        if column["function"]:
+            if not artifacts:
+                return ""
+            values = [artifact.column(column["argument"]) for artifact in artifacts]
+            function = {"sum": sum, "min": min, "max": max}
+            return function[column["function"].lower()](values)
+        raise QueryError(f"Column {column['name']} must be aggregated")
+
+    def _where(self, where: Optional[str]) -> List[Artifact]:
+        """Artifacts matching the conditions of a query."""
+        uris = self.uris()
+        low, high = 0, len(uris)
+        checks = []
+        for condition in re.split(r"\s+and\s+", where or "", flags=re.IGNORECASE):
+            if not condition:
+                continue
+            match = CONDITION_RE.match(condition.strip())
+            if not match:
+                raise QueryError(f"Cannot parse condition: {condition}")
+            column = match["column"].lower()
+            operator = match["operator"].lower()
+            value = match["value"].replace("''", "'")
+            if column == "uri" and operator == "like":
+                if "%" in value[:-1]:
+                    raise QueryError("Only prefix searches are supported")
+                pattern = value.rstrip("%")
+                if not pattern.startswith(f"{NAMESPACE}/"):
+                    return []
+                pattern = pattern.partition("/")[2]
+                # "_" matches any one character, as in Luskan.
+                prefix = pattern.partition("_")[0]
+                low = max(low, bisect.bisect_left(uris, prefix))
+                high = min(high, bisect.bisect_left(uris, prefix + "\uffff"))
+                if "_" in pattern:
+                    checks.append(("path", "like", pattern))  # Checked below.
+            else:
+                checks.append((column, operator, value))
+        artifacts = [self.artifacts[uri] for uri in uris[low:high]]
+        for column, operator, value in checks:
+            if column == "path":
+                regex = re.compile(".".join(map(re.escape, value.split("_"))))
+                artifacts = [a for a in artifacts if regex.match(a.path)]
+                continue
+            artifacts = [
+                artifact
+                for artifact in artifacts
+                if compare(artifact.column(column), operator, value)
+            ]
+        return artifacts
+
+    def _handler(self) -> type:
+        """Request handler class bound to this stand-in."""
+        return type("Handler", (StandInHandler,), {"standin": self})
+
+
+def compare(left: Any, operator: str, right: str) -> bool:
+    """Compare an artifact column with a value from a query."""
+    if isinstance(left, int):
+        value: Any = int(right)
+    else:
+        value = right
+    if operator == ">":
+        return left > value
+    if operator == ">=":
+        return left >= value
+    if operator == "<":
+        return left < value
+    if operator == "<=":
+        return left <= value
+    if operator == "=":
+        return left == value
+    raise QueryError(f"Unsupported operator {operator}")
+
+
+def lookup(record: Dict[str, Any], key: str) -> Any:
+    """Value of a dotted key in a record, or None."""
+    value: Any = record
+    for part in key.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def matches(record: Dict[str, Any], query: Dict[str, Any]) -> bool:
+    """Check if a record matches a Workflow Results query."""
+    for key, condition in query.items():
+        value = lookup(record, key)
+        if not isinstance(condition, dict):
+            condition = {"$eq": condition}
+        for operator, expected in condition.items():
+            if operator == "$eq" and value != expected:
+                return False
+            if operator == "$ne" and value == expected:
+                return False
+            if operator == "$in" and value not in expected:
+                return False
+            if value is None and operator in ["$gt", "$gte", "$lt", "$lte"]:
+                return False
+            if operator == "$gt" and not value > expected:
+                return False
+            if operator == "$gte" and not value >= expected:
+                return False
+            if operator == "$lt" and not value < expected:
+                return False
+            if operator == "$lte" and not value <= expected:
+                return False
+    return True
+
+
+def project(record: Dict[str, Any], projection: Dict[str, Any]) -> Dict[str, Any]:
+    """Apply a Workflow Results projection to a record."""
+    if not projection:
+        return record
+    if any(projection.values()):
+        projected: Dict[str, Any] = {}
+        for key, include in projection.items():
+            value = lookup(record, key)
+            if not include or value is None:
+                continue
+            *parents, last = key.split(".")
+            target = projected
+            for part in parents:
+                target = target.setdefault(part, {})
+            target[last] = value
+        return projected
+    projected = json.loads(json.dumps(record))
+    for key in projection:
+        *parents, last = key.split(".")
+        target = projected
+        for part in parents:
+            target = target.get(part, {})
+        target.pop(last, None)
+    return projected
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Requests to the stand-in, routed by path."""
+
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately, which Nagle's algorithm delays.
+    disable_nagle_algorithm = True
+    standin: StandIn
+
+    def log_message(self, format: str, *args: Any) -> None:
+        """Log requests at debug level, rather than to stderr."""
+        logger.debug(format % args)
+
+    def do_GET(self) -> None:  # noqa: N802
+        """Handle a GET request."""
+        self.route("GET")
+
+    def do_HEAD(self) -> None:  # noqa: N802
+        """Handle a HEAD request."""
+        self.route("HEAD")
+
+    def do_POST(self) -> None:  # noqa: N802
+        """Handle a POST request."""
+        self.route("POST")
+
+    def route(self, method: str) -> None:
+        """Route a request to its service."""
+        url = urlsplit(self.path)
+        path = unquote(url.path)
+        self.params = parse_qs(url.query)
+        length = int(self.headers.get("Content-Length") or 0)
+        self.body = self.rfile.read(length) if length else b""
+        if self.standin.latency:
+            time.sleep(self.standin.latency)
+        status = self.standin.failure(path)
+        if status:
+            self.standin.count("failure")
+            self.reply({"error": "Injected failure."}, status)
+            return
+        service, _, rest = path.lstrip("/").partition("/")
+        try:
+            if service == "datatrail" and method == "GET":
+                self.datatrail_get(rest)
+            elif service == "datatrail" and method == "POST":
+                self.datatrail_post(rest)
+            elif service == "results" and rest == "view" and method == "POST":
+                self.standin.count("results/view")
+                self.view()
+            elif service == "minoc":
+                self.minoc(rest, method)
+            elif service == "luskan":
+                self.luskan(rest)
+            else:
+                self.reply(f"Not found: {path}", 404)
+        except (BrokenPipeError, ConnectionResetError):
+            logger.debug(f"Client disconnected from {path}.")
+
+    def param(self, name: str) -> Optional[str]:
+        """First value of a query parameter."""
+        return self.params.get(name, [None])[0]
+
+    def reply(self, payload: Any, status: int = 200, content_type: str = "") -> None:
+        """Reply with JSON, or text if the payload is a string."""
+        if isinstance(payload, str):
+            body = payload.encode()
+            content_type = content_type or "text/plain; charset=utf-8"
+        else:
+            body = json.dumps(payload).encode()
+            content_type = "application/json"
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def dataset(self, scope: str, name: str) -> Optional[Dataset]:
+        """Dataset, or a Datatrail-style error reply if it does not exist."""
+        dataset = self.standin.datasets.get((scope, name))
+        if dataset is None:
+            self.reply("'NoneType' object has no attribute 'id'", 404)
+        return dataset
+
+    def datatrail_get(self, path: str) -> None:
+        """Datatrail queries."""
+        standin = self.standin
+        parts = path.split("/")
+        if path == "query/dataset/scopes":
+            standin.count("scopes")
+            self.reply(sorted({scope for scope, _ in standin.datasets}))
+        elif path == "query/dataset/larger":
+            standin.count("larger")
+            scope = self.param("scope")
+            self.reply(
+                {
+                    "larger_datasets": sorted(
+                        dataset.name
+                        for dataset in standin.datasets.values()
+                        if dataset.scope == scope and dataset.children
+                    )
+                }
+            )
+        elif path.startswith("query/dataset/children/") and len(parts) == 5:
+            standin.count("children")
+            dataset = self.dataset(parts[3], parts[4])
+            if dataset:
+                self.reply(
+                    {
+                        "name": dataset.name,
+                        "scope": dataset.scope,
+                        "contains": dataset.children,
+                    }
+                )
+        elif path == "query/dataset/scout":
+            standin.count("scout")
+            self.scout(self.param("name") or "", self.params.get("scopes", []))
+        elif path in ["query/datasset/scout/md5sums", "query/dataset/scout/md5sums"]:
+            standin.count("md5sums")
+            self.md5sums()
+        elif path.startswith("query/dataset/") and len(parts) == 4:
+            standin.count("policy")
+            dataset = self.dataset(parts[2], parts[3])
+            if dataset:
+                self.reply(dataset.policy())
+        else:
+            self.reply(f"Not found: {path}", 404)
+
+    def datatrail_post(self, path: str) -> None:
+        """Datatrail queries and commits with a body."""
+        payload = json.loads(self.body or b"{}")
+        if path == "query/dataset/find":
+            self.standin.count("find")
+            dataset = self.dataset(payload.get("scope"), payload.get("name"))
+            if dataset:
+                locations = dataset.locations()
+                for child in dataset.children:
+                    for se, uris in (
+                        self.standin.datasets[(dataset.scope, child)].locations().items()
+                    ):
+                        locations.setdefault(se, []).extend(uris)
+                self.reply(
+                    {
+                        "name": dataset.name,
+                        "scope": dataset.scope,
+                        "file_replica_locations": locations,
+                    }
+                )
+        elif path == "commit/dataset/scout/sync":
+            self.standin.count("sync")
+            dataset = self.dataset(self.param("scope") or "", self.param("name") or "")
+            if dataset:
+                se = self.param("replicate_to") or ""
+                with self.standin._lock:
+                    registered = dataset.registered.setdefault(se, [])
+                    registered.extend(p.lstrip("/") for p in payload)
+                self.reply({"synced": len(payload)})
+        else:
+            self.reply(f"Not found: {path}", 404)
+
+    def scout(self, name: str, scopes: List[str]) -> None:
+        """Files expected and observed at each storage element."""
+        data = {}
+        for dataset in self.standin.datasets.values():
+            if dataset.name != name or (scopes and dataset.scope not in scopes):
+                continue
+            data[dataset.scope] = {
+                "expected": {se: len(p) for se, p in dataset.registered.items()},
+                "observed": {se: len(p) for se, p in dataset.stored.items()},
+                "basepath": dataset.basepath,
+                "filetype": "raw",
+            }
+        if not data:
+            data = {"error": f"Dataset {name} not found."}
+        self.reply(data)
+
+    def md5sums(self) -> None:
+        """Checksums of the files stored at a storage element."""
+        basepath = self.param("basepath") or ""
+        site = self.param("site") or ""
+        checksums = {}
+        for dataset in self.standin.datasets.values():
+            for path in dataset.stored.get(site, []):
+                if path.startswith(basepath):
+                    artifact = self.standin.artifacts.get(path)
+                    checksums[path] = (artifact or Artifact(path, 0, 0)).md5
+        self.reply(checksums)
+
+    def view(self) -> None:
+        """Workflow Results records, filtered, projected and paged."""
+        payload = json.loads(self.body or b"{}")
+        query = dict(payload.get("query", {}))
+        pipeline = query.pop("pipeline", None)
+        records = [
+            record
+            for record in self.standin.results.get(pipeline, [])
+            if matches(record, query)
+        ]
+        for field, order in reversed([*payload.get("sort", {}).items()]):
+            records.sort(key=lambda r: str(r.get(field, "")), reverse=order < 0)
+        skip = int(payload.get("skip", 0))
+        limit = int(payload.get("limit", 100))
+        projection = payload.get("projection", {})
+        self.reply([project(record, projection) for record in records[skip:][:limit]])
+
+    def minoc(self, path: str, method: str) -> None:
+        """Minoc capabilities and files, with Range support."""
+        if path == "capabilities":
+            self.capabilities(FILES_STANDARD_ID, f"{self.standin.url}/minoc/files")
+            return
+        if not path.startswith(f"files/{NAMESPACE}/") or method == "POST":
+            self.reply(f"Not found: {path}", 404)
+            return
+        self.standin.count("minoc")
+        artifact = self.standin.artifacts.get(path.partition(f"{NAMESPACE}/")[2])
+        if artifact is None:
+            self.reply(f"Not found: {path}", 404)
+            return
+        start, end = 0, artifact.size
+        ranged = re.match(r"bytes=(\d*)-(\d*)$", self.headers.get("Range", ""))
+        if ranged and (ranged[1] or ranged[2]):
+            if ranged[1]:
+                start = int(ranged[1])
+                end = min(int(ranged[2]) + 1, artifact.size) if ranged[2] else end
+            else:
+                start = max(artifact.size - int(ranged[2]), 0)
+            if start >= artifact.size:
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{artifact.size}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+        self.send_response(206 if (start, end) != (0, artifact.size) else 200)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(end - start))
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Content-Disposition", f"inline; filename={artifact.path}")
+        self.send_header("Last-Modified", self.date_time_string(int(artifact.modified)))
+        self.send_header(
+            "Digest", "md5=" + b64encode(bytes.fromhex(artifact.md5)).decode()
+        )
+        if (start, end) != (0, artifact.size):
+            self.send_header("Content-Range", f"bytes {start}-{end - 1}/{artifact.size}")
+        self.end_headers()
+        if method == "HEAD":
+            return
+        self.send(content(artifact.path, start, end))
+
+    def send(self, chunks: Iterator[bytes]) -> None:
+        """Write chunks, throttled to the bandwidth of the stand-in."""
+        bandwidth = self.standin.bandwidth
+        started = time.monotonic()
+        sent = 0
+        for chunk in chunks:
+            self.wfile.write(chunk)
+            sent += len(chunk)
+            if bandwidth:
+                delay = sent / bandwidth - (time.monotonic() - started)
+                if delay > 0:
+                    time.sleep(delay)
+
+    def luskan(self, path: str) -> None:
+        """Luskan capabilities and synchronous ADQL queries, as CSV."""
+        if path == "capabilities":
+            self.capabilities(TAP_STANDARD_ID, f"{self.standin.url}/luskan")
+            return
+        if path != "sync":
+            self.reply(f"Not found: {path}", 404)
+            return
+        self.standin.count("luskan")
+        fields = {key: values[0] for key, values in self.params.items()}
+        fields.update(self.form())
+        maxrec = fields.get("MAXREC")
+        try:
+            rows = self.standin.query(
+                fields.get("QUERY", ""), int(maxrec) if maxrec else None
+            )
+        except QueryError as error:
+            self.reply(f"ERROR: {error}", 400)
+            return
+        text = "".join(",".join(str(value) for value in row) + "\n" for row in rows)
+        self.reply(text, 200, "text/csv")
+
+    def form(self) -> Dict[str, str]:
+        """Fields of a multipart form body."""
+        content_type = self.headers.get("Content-Type", "")
+        if not content_type.startswith("multipart/form-data"):
+            return {}
+        message = BytesParser(policy=HTTP).parsebytes(
+            f"Content-Type: {content_type}\r\n\r\n".encode() + self.body
+        )
+        return {
+            part.get_param("name", header="content-disposition"): part.get_content()
+            for part in message.iter_parts()
+        }
+
+    def capabilities(self, standard: str, url: str) -> None:
+        """VOSI capabilities of a service, for anonymous access."""
+        body = CAPABILITIES.format(standard=standard, url=url)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/xml")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("x-vo-authenticated", "anonymous")
+        self.end_headers()
+        self.wfile.write(body.encode())
+
+
+def main() -> None:
+    """Run a stand-in with synthetic datasets until interrupted."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=1234)
+    parser.add_argument("--scope", default="chime.event.baseband.raw")
+    parser.add_argument("--datasets", type=int, default=3)
+    parser.add_argument("--files", type=int, default=100)
+    parser.add_argument("--size", type=int, default=1024)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--bandwidth", type=float, default=None)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level="INFO")
+    standin = StandIn(
+        args.host, args.port, args.latency, args.bandwidth, args.error_rate
+    )
+    for index in range(args.datasets):
+        standin.add_dataset(
+            args.scope,
+            str(100000 + index),
+            files=args.files,
+            size=args.size,
+            larger="standin.larger",
+        )
+    print(json.dumps(standin.config(), indent=2))
+    try:
+        standin.server.serve_forever()
+    except KeyboardInterrupt:
+        standin.server.server_close()
+
+
+if __name__ == "__main__":
+    main()
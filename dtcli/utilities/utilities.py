@@ -2,12 +2,16 @@
 
 import json
 import logging
-from typing import Any, Dict, List, Tuple, Union
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Set, Tuple, Union
 
 import requests
 from requests.models import Response
 from rich.console import Console
 
+from dtcli.config import setting
+from dtcli.utilities import http
+
 try:
     from packaging.version import parse
 except ImportError:
@@ -89,6 +93,44 @@ def split(data: List[Any], count: int) -> List[List[Any]]:
     return batches
 
 
+def imap_unordered(
+    function: Callable[[Any], Any], items: Iterable[Any], workers: int
+) -> Iterator[Tuple[Any, Future]]:
+    """Apply a function to items concurrently, yielding results as they complete.
+
+    Items are consumed lazily, with at most `2 * workers` in flight, so that
+    results stream out while the items are still being read, e.g. from stdin.
+
+    Args:
+        function (Callable[[Any], Any]): Function to apply to each item.
+        items (Iterable[Any]): Items to process.
+        workers (int): Number of worker threads.
+
+    Yields:
+        Iterator[Tuple[Any, Future]]: Each item and its completed future.
+    """
+    if workers <= 0:
+        raise ValueError("workers must be greater than 0")
+
+    iterator = iter(items)
+    pending: Dict[Future, Any] = {}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        try:
+            while True:
+                for item in iterator:
+                    pending[executor.submit(function, item)] = item
+                    if len(pending) >= 2 * workers:
+                        break
+                if not pending:
+                    return
+                done: Set[Future] = wait(pending, return_when=FIRST_COMPLETED)[0]
+                for future in done:
+                    yield pending.pop(future), future
+        finally:
+            for future in pending:
+                future.cancel()
+
+
 def validate_scope(scope: str) -> bool:
     """Check if scope is valid.
 
@@ -98,7 +140,8 @@ def validate_scope(scope: str) -> bool:
     Returns:
         bool: True if scope is valid.
     """
-    resp = requests.get("https://frb.chimenet.ca/datatrail/query/dataset/scopes")
+    server = setting("server", "https://frb.chimenet.ca/datatrail")
+    resp = http.session().get(server + "/query/dataset/scopes")
     scopes = decode_response(resp)
     return scope in scopes
 
@@ -0,0 +1,26 @@
+"""Shared fixtures."""
+
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+import yaml
+
+import dtcli.config
+from dtcli.utilities import http
+from dtcli.utilities.standin import StandIn
+
+
+@pytest.fixture
+def standin(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[StandIn]:
+    """Local stand-in server, with the CLI configured to use it."""
+    with StandIn() as server:
+        config = tmp_path / "config.yaml"
+        config.write_text(
+            yaml.safe_dump(
+                server.config(root_mounts={"local": f"{tmp_path}/"}, http_backoff=0)
+            )
+        )
+        monkeypatch.setattr(dtcli.config, "CONFIG", config)
+        monkeypatch.setattr(http, "_sessions", {})
+        yield server
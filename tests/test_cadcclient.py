@@ -0,0 +1,113 @@
+"""Tests for the CADC client helpers."""
+
+from typing import Any, List
+
+import pytest
+from cadcutils.exceptions import BadRequestException
+
+from dtcli.utilities import artifacts, cadcclient
+
+
+def test_prefix_stats_grouped(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test all prefixes are counted by one grouped query."""
+    queries: List[str] = []
+
+    def query(query: str, **kwargs: Any) -> List[List[str]]:
+        queries.append(query)
+        return [["1", "2", "2048"], ["0", "3", "1024"], [""]]
+
+    monkeypatch.setattr(cadcclient, "query", query)
+    stats = cadcclient.prefix_stats(["data/a", "/data/b", "data/a"], client=object())
+    assert len(queries) == 1
+    assert queries[0].count("union all") == 1
+    assert "'cadc:CHIMEFRB/data/b%'" in queries[0]
+    assert stats == {"data/a": (3, 1024), "/data/b": (2, 2048)}
+
+
+def test_prefix_stats_fallback(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test prefixes are queried separately when the grouped query is rejected."""
+
+    def query(query: str, **kwargs: Any) -> List[List[str]]:
+        if "union all" in query:
+            raise BadRequestException("UNION not supported")
+        index = query.split()[1]
+        return [[index, "1", ""], [""]]
+
+    monkeypatch.setattr(cadcclient, "query", query)
+    stats = cadcclient.prefix_stats(["data/a", "data/b"], client=object())
+    assert stats == {"data/a": (1, 0), "data/b": (1, 0)}
+
+
+class Response:
+    """Streamed CSV response from Luskan."""
+
+    def __init__(self, lines: List[str]) -> None:
+        self.lines = lines
+        self.encoding = None
+        self.closed = False
+
+    def __enter__(self) -> "Response":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.closed = True
+
+    def iter_lines(self, **kwargs: Any) -> Any:
+        yield from self.lines
+
+
+class Client:
+    """TAP client posting queries to a canned response."""
+
+    def __init__(self, response: Response) -> None:
+        self._tap_client = self
+        self.response = response
+        self.posts: List[Any] = []
+
+    def _get_url(self, resource: Any) -> str:
+        return "https://luskan/" + (resource[1] or "async")
+
+    def post(self, resource: str, **kwargs: Any) -> Response:
+        self.posts.append((resource, kwargs))
+        return self.response
+
+
+def test_sync_endpoint() -> None:
+    """Test changed cadctap internals fail with a clear error."""
+    client = Client(Response([]))
+    assert cadcclient._sync_endpoint(client)[1] == "https://luskan/sync"  # type: ignore
+    with pytest.raises(RuntimeError, match="cadctap"):
+        cadcclient._sync_endpoint(object())  # type: ignore
+
+
+def test_stream_query() -> None:
+    """Test rows are parsed from the response as it is read, then it is closed."""
+    response = Response(
+        ["uri,contentChecksum", "cadc:CHIMEFRB/data/a,md5:1", "", '"data/b,c",md5:2']
+    )
+    client = Client(response)
+    rows = cadcclient.stream_query("select 1", client=client)  # type: ignore
+    assert next(rows) == ["cadc:CHIMEFRB/data/a", "md5:1"]
+    assert not response.closed
+    assert [*rows] == [["data/b,c", "md5:2"]]
+    assert response.closed
+    resource, kwargs = client.posts[0]
+    assert resource == "https://luskan/sync"
+    assert kwargs["stream"] and kwargs["data"].fields["QUERY"] == "select 1"
+
+
+def test_dataset_md5s_streamed(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test checksums are keyed by path relative to the namespace."""
+    monkeypatch.setattr(artifacts, "location", lambda values=None: None)
+    response = Response(
+        ["uri,contentChecksum", "cadc:CHIMEFRB/data/a,md5:1", "cadc:CHIMEFRB/data/b,"]
+    )
+    md5s = cadcclient.dataset_md5s("data", client=Client(response))  # type: ignore
+    assert md5s == {"data/a": "1", "data/b": ""}
+
+
+def test_split() -> None:
+    """Test uri ranges are split where their first and last uris differ."""
+    parts = cadcclient._split((None, None), "p/a/1", "p/c/9")
+    assert parts == [(None, "p/b"), ("p/b", "p/c"), ("p/c", None)]
+    assert cadcclient._split(("p/a", "p/b"), "p/a/1", "p/a/1") == [("p/a", "p/b")]
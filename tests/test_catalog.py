@@ -0,0 +1,45 @@
+"""Tests for the local dataset catalog."""
+
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from dtcli.utilities import catalog
+
+
+def test_sync_and_search(tmp_path: Path) -> None:
+    """Test the catalog only re-lists stale children and finds datasets."""
+    path = tmp_path / "catalog.sqlite"
+    tree = {
+        "chime.event.baseband.raw": {"classified.FRB": ["289007650", "289007651"]},
+        "kko.scheduled.baseband.raw": {"scheduled.steady": ["20230604135840"]},
+    }
+    calls: List[Tuple[Optional[str], Optional[str]]] = []
+
+    def lister(scope: Optional[str], dataset: Optional[str]) -> Dict[str, Any]:
+        calls.append((scope, dataset))
+        if scope is None:
+            return {"scopes": [*tree]}
+        if dataset is None:
+            return {"scope": scope, "larger_datasets": [*tree[scope]]}
+        return {"datasets": tree[scope][dataset]}
+
+    stats = catalog.sync(lister, path)
+    assert stats["added"] == 5 and stats["parents"] == 2
+    assert [*catalog.search("2890076", path)] == [
+        ("chime.event.baseband.raw", "289007650", "classified.FRB"),
+        ("chime.event.baseband.raw", "289007651", "classified.FRB"),
+    ]
+    assert [*catalog.search("FRB", path)] == [
+        ("chime.event.baseband.raw", "classified.FRB", "")
+    ]
+    assert [r[1] for r in catalog.search("2023*", path)] == ["20230604135840"]
+
+    calls.clear()
+    catalog.sync(lister, path)
+    assert len(calls) == 3
+
+    tree["chime.event.baseband.raw"]["classified.FRB"] = ["289007651"]
+    stats = catalog.sync(lister, path, max_age=0)
+    assert stats["removed"] == 1
+    assert not [*catalog.search("289007650", path)]
+    assert catalog.status(path)["datasets"] == 4
@@ -117,7 +117,7 @@ def test_cli_ps_help(runner: CliRunner) -> None:
     result = runner.invoke(datatrail, ["ps", "--help"])
     assert result.exit_code == 0
     # Check that all the expected elements are present
-    assert "Usage: cli ps [OPTIONS] SCOPE DATASET" in result.output
+    assert "Usage: cli ps [OPTIONS] SCOPE [DATASETS]..." in result.output
     assert "Details of a dataset" in result.output
     assert "--show-files" in result.output
     assert "--verbose" in result.output
@@ -142,6 +142,7 @@ Options:
   -s, --specific FILE        Path to file of specific files to pull.
   -c, --cores INTEGER RANGE  Number of parallel fetch processes to use.
                              [1<=x<={cpu_count()}]
+  --evict                    Clear least-recently-used datasets to make room.
   -v, --verbose              Verbosity: v=INFO, vv=DEBUG.
   -q, --quiet                Set log level to ERROR.
   -f, --force                Do not prompt for confirmation.
@@ -157,14 +158,20 @@ def test_cli_scout_help(runner: CliRunner) -> None:
         runner (CliRunner): Click runner.
     """
     result = runner.invoke(datatrail, ["scout", "--help"])
-    expected_response = """Usage: cli scout [OPTIONS] [SCOPES]... DATASET
+    expected_response = """Usage: cli scout [OPTIONS] [SCOPES]... [DATASET]
 
   Scout a dataset.
 
 Options:
-  -v, --verbose  Verbosity: v=INFO, vv=DEBUG.
-  -q, --quiet    Set log level to ERROR.
-  --help         Show this message and exit.
+  -f, --file FILENAME          File of datasets, one per line, or - for stdin.
+  -c, --children TEXT          Scout the children of a larger dataset.
+  --jsonl                      Output as JSON lines.
+  --heal                       Heal discrepancies found.
+  -y, --yes                    Do not prompt for confirmation.
+  -w, --workers INTEGER RANGE  Number of concurrent queries.  [x>=1]
+  -v, --verbose                Verbosity: v=INFO, vv=DEBUG.
+  -q, --quiet                  Set log level to ERROR.
+  --help                       Show this message and exit.
 """
     assert result.exit_code == 0
     assert result.output == expected_response
@@ -1,10 +1,13 @@
 """Tests for Datatrail CLI."""
 
+import threading
 from datetime import datetime as dt
+from pathlib import Path
 from typing import Any, Dict, List, Optional
 
 import pytest
 
+from dtcli.src import functions
 from dtcli.src.functions import get_unregistered_dataset, view_results
 
 
@@ -52,3 +55,163 @@ def test_get_unregistered_dataset() -> None:
         assert "reason" in unregistered_dataset["results"].keys()
     else:
         pytest.skip("No unregistered datasets found.")
+
+
+def test_get_all_unregistered_datasets_pages(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test unregistered datasets are fetched a page at a time."""
+    records = [{"results": {"reason": f"reason {i}"}} for i in range(5)]
+    requests: List[Dict[str, Any]] = []
+
+    class Response:
+        def __init__(self, payload: Dict[str, Any]) -> None:
+            self.payload = payload
+
+        def json(self) -> List[Dict[str, Any]]:
+            skip, limit = self.payload["skip"], self.payload["limit"]
+            return records[skip : skip + limit]  # noqa: E203
+
+    def post(url: str, json: Dict[str, Any]) -> Response:
+        requests.append(json)
+        return Response(json)
+
+    monkeypatch.setattr(functions.http.session(queries=True), "post", post)
+    results = functions.get_all_unregistered_datasets(page_size=2)
+    assert not requests
+    assert [r for r in results] == records
+    assert [r["skip"] for r in requests] == [0, 2, 4]
+    assert "results.files" not in requests[0]["projection"]
+    assert requests[0]["projection"]["results.reason"] == 1
+
+
+def test_update_unregistered_snapshot(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    """Test the snapshot only classifies new records and prunes registered ones."""
+    records = [
+        {"id": str(i), "creation": float(i), "results": {"reason": "token expired"}}
+        for i in range(3)
+    ]
+    queries: List[Dict[str, Any]] = []
+
+    def view_results(
+        pipeline: str,
+        query: Dict[str, Any],
+        projection: Dict[str, Any],
+        limit: int = 100,
+        skip: int = 0,
+        sort: Optional[Dict[str, int]] = None,
+    ) -> List[Dict[str, Any]]:
+        queries.append(query)
+        low = query.get("creation", {}).get("$gte", -1)
+        matches = [r for r in records if r["creation"] >= low]
+        return matches[skip:][:limit]
+
+    monkeypatch.setattr(functions, "view_results", view_results)
+    snapshot = tmp_path / "unregistered.json"
+    state = functions.update_unregistered_snapshot(snapshot)
+    assert state["records"] == {str(i): "STATUS:token expired" for i in range(3)}
+    assert state["high_water"] == 2.0
+
+    records.pop(0)
+    records.append({"id": "3", "creation": 3.0, "results": {"reason": "psycopg"}})
+    queries.clear()
+    state = functions.update_unregistered_snapshot(snapshot)
+    assert sorted(state["records"]) == ["1", "2", "3"]
+    assert state["records"]["3"] == "POSTGRES:psycopg"
+    assert queries[-1] == {"creation": {"$gte": 2.0}}
+    assert len(state["history"]) == 2
+    time, counts = functions.unregistered_baseline(state, since=0)
+    assert counts == {"STATUS:token expired": 3}
+
+    # Records without an id are skipped, not all filed under "None".
+    records.append({"creation": 4.0, "results": {"reason": "psycopg"}})
+    state = functions.update_unregistered_snapshot(snapshot)
+    assert sorted(state["records"]) == ["1", "2", "3"]
+
+
+def test_find_unregistered_datasets(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test records are fetched in concurrent pages and filtered by signature."""
+    records = [
+        {"results": {"reason": "token expired" if i % 2 else "psycopg", "id": i}}
+        for i in range(25)
+    ]
+
+    def view_results(
+        pipeline: str,
+        query: Dict[str, Any],
+        projection: Dict[str, Any],
+        limit: int = 100,
+        skip: int = 0,
+        sort: Optional[Dict[str, int]] = None,
+    ) -> List[Dict[str, Any]]:
+        return records[skip:][:limit]
+
+    monkeypatch.setattr(functions, "view_results", view_results)
+    assert list(functions.iter_results("", {}, {}, 4, workers=3)) == records
+    found = list(functions.find_unregistered_datasets("STATUS", 4, workers=3))
+    assert [r["results"]["id"] for r in found] == list(range(1, 25, 2))
+    assert found[0]["signature"] == "STATUS:token expired"
+    assert not list(functions.find_unregistered_datasets("STAT", 4, workers=3))
+
+
+def test_iter_results_stops_on_repeated_page(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test paging is sorted and stops if the server ignores skip."""
+    records = [{"_id": str(i)} for i in range(4)]
+    requests: List[Dict[str, Any]] = []
+
+    def view_results(*args: Any) -> List[Dict[str, Any]]:
+        requests.append(args[-1])
+        return records[:2]
+
+    monkeypatch.setattr(functions, "view_results", view_results)
+    for workers in [1, 3]:
+        assert list(functions.iter_results("", {}, {}, 2, workers)) == records[:2]
+    assert requests[0] == {"_id": 1}
+
+
+def test_filter_datasets() -> None:
+    """Test dataset names are filtered by glob, regex and date."""
+    names = ["20230601120000", "20230603", "scheduled.steady", "289007650"]
+    assert [*functions.filter_datasets(names, match="2023*")] == names[:2]
+    assert [*functions.filter_datasets(names, regex=r"^\d{9}$")] == ["289007650"]
+    after, before = dt(2023, 6, 2), dt(2023, 6, 30)
+    assert [*functions.filter_datasets(names, after=after)] == ["20230603"]
+    assert [*functions.filter_datasets(names, before=before)] == names[:2]
+
+
+def test_list_lazy(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test listed datasets are filtered and paged lazily."""
+    children = {"datasets": [str(i) for i in range(100)]}
+    monkeypatch.setattr(functions, "_list", lambda *args: dict(children))
+    results = functions.list("s", "d", match="1*", offset=2, limit=3, lazy=True)
+    assert not isinstance(results["datasets"], type(children["datasets"]))
+    assert [*results["datasets"]] == ["11", "12", "13"]
+    assert functions.list("s", "d", limit=2)["datasets"] == ["0", "1"]
+
+
+def test_ps_concurrent(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test the files and policies of a dataset are requested concurrently."""
+    barrier = threading.Barrier(2, timeout=5)
+
+    class Response:
+        status_code = 200
+
+        def __init__(self, payload: Dict[str, Any]) -> None:
+            barrier.wait()
+            self.payload = payload
+
+        def json(self) -> Dict[str, Any]:
+            return self.payload
+
+    monkeypatch.setattr(functions, "procure", lambda: {"server": "http://test"})
+    monkeypatch.setattr(
+        functions.http.session(queries=True),
+        "post",
+        lambda url, json: Response({"files": url}),
+    )
+    monkeypatch.setattr(
+        functions.http.session(), "get", lambda url: Response({"url": url})
+    )
+    files, policies = functions.ps("chime.event.baseband.raw", "123")
+    assert files == {"files": "http://test/query/dataset/find"}
+    assert policies == {"url": "http://test/query/dataset/chime.event.baseband.raw/123"}
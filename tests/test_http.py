@@ -0,0 +1,39 @@
+"""Tests for the shared HTTP session."""
+
+from dtcli.utilities import http
+
+
+def test_settings() -> None:
+    """Test settings from the configuration are converted to their types."""
+    values = http.settings(
+        {"http_timeout": "30", "http_retries": "5", "http_compression": "false"}
+    )
+    assert values["http_timeout"] == 30.0
+    assert values["http_retries"] == 5
+    assert values["http_compression"] is False
+    assert values["http_backoff"] == http.DEFAULTS["http_backoff"]
+    assert http.settings({"http_retries": "many"}) == http.DEFAULTS
+
+
+def test_create_session() -> None:
+    """Test the session retries server errors and sets a default timeout."""
+    session = http.create_session({"http_retries": 2, "http_compression": False})
+    retry = session.get_adapter("https://frb.chimenet.ca").max_retries
+    assert retry.total == 2
+    assert 503 in retry.status_forcelist
+    assert "GET" in retry.allowed_methods
+    assert "POST" not in retry.allowed_methods
+    assert session.headers["Accept-Encoding"] == "identity"
+    assert session.timeout == (
+        http.DEFAULTS["http_connect_timeout"],
+        http.DEFAULTS["http_timeout"],
+    )
+    assert "gzip" in http.create_session({}).headers["Accept-Encoding"]
+
+
+def test_query_session() -> None:
+    """Test only the session for read-only queries retries POST."""
+    retry = http.create_session({}, queries=True).get_adapter("https://x").max_retries
+    assert "POST" in retry.allowed_methods
+    assert http.session(queries=True) is not http.session()
+    assert http.session(queries=True) is http.session(queries=True)
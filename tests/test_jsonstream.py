@@ -0,0 +1,71 @@
+"""Tests for decoding JSON responses as they stream in."""
+
+import io
+import json
+import random
+
+import pytest
+
+from dtcli.utilities import jsonstream
+from dtcli.utilities.jsonstream import FindStream
+
+
+def test_find_stream() -> None:
+    """Test a response split at any byte decodes as a whole one would."""
+    response = {
+        "dataset": {"name": "123", "files": 3, "size": 1.5e3, "ok": True},
+        "file_replica_locations": {
+            "minoc": [f'cadc:CHIMEFRB/data/é/"{i}",☃.h5' for i in range(20)],
+            "chime": [],
+            "kko": ["/data/kko/1.h5"],
+        },
+        "count": 98765,
+    }
+    body = json.dumps(response, ensure_ascii=False).encode()
+    rng = random.Random(0)
+    for _ in range(100):
+        cuts = sorted(rng.sample(range(1, len(body)), 40))
+        chunks = [body[i:j] for i, j in zip([0, *cuts], [*cuts, len(body)])]
+        stream = FindStream(chunks)
+        assert stream.scalar() is None
+        locations = {se: [*uris] for se, uris in stream.locations()}
+        assert locations == {
+            se: uris
+            for se, uris in response["file_replica_locations"].items()  # type: ignore
+            if uris
+        }
+        assert stream.fields == {
+            "dataset": response["dataset"],
+            "count": response["count"],
+        }
+
+
+def test_find_stream_errors() -> None:
+    """Test error messages are decoded whole and truncated responses raise."""
+    assert FindStream([b'"Could not', b' find dataset"']).scalar() == (
+        "Could not find dataset"
+    )
+    with pytest.raises(json.JSONDecodeError):
+        [*FindStream([b'{"file_replica_locations": {"minoc": ["a", "b'])]
+
+
+def test_write(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test documents are written as json would, a chunk of a list at a time."""
+    monkeypatch.setattr(jsonstream, "ITEMS", 3)
+    document = {
+        "dataset": "123",
+        "files": {
+            "file_replica_locations": {"minoc": [f"data/é/{i}" for i in range(10)]}
+        },
+        "policies": {"deletion": [{"days": 30, "default": True}], "empty": []},
+        "size": 1.5,
+        "nothing": None,
+    }
+    for indent in [2, 4]:
+        stream = io.StringIO()
+        jsonstream.write(document, stream, indent)
+        assert stream.getvalue() == json.dumps(document, indent=indent) + "\n"
+    stream = io.StringIO()
+    jsonstream.write({"datasets": (name for name in ["1", "2"])}, stream, None)
+    assert stream.getvalue() == '{"datasets":["1","2"]}\n'
+    assert json.loads(jsonstream.dumps(document)) == document
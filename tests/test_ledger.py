@@ -0,0 +1,89 @@
+"""Tests for the local disk-usage ledger."""
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+import dtcli.config
+from dtcli.src import functions
+from dtcli.utilities import catalog, ledger, signatures
+
+
+def test_record_and_forget(tmp_path: Path) -> None:
+    """Test recording a dataset measures its files and can be forgotten."""
+    usage = tmp_path / "usage.json"
+    data = tmp_path / "data"
+    data.mkdir()
+    (data / "a.h5").write_bytes(b"x" * 10)
+    (data / "b.h5").write_bytes(b"x" * 5)
+    files = [str(data / "a.h5"), str(data / "b.h5"), str(data / "missing.h5")]
+
+    entry = ledger.record("chime.event.baseband.raw", "1", str(data), files, usage)
+    assert entry["files"] == 2
+    assert entry["bytes"] == 15
+    assert "chime.event.baseband.raw/1" in ledger.load(usage)
+
+    ledger.forget("chime.event.baseband.raw", "1", usage)
+    assert ledger.load(usage) == {}
+
+
+def test_eviction_candidates(tmp_path: Path) -> None:
+    """Test least-recently-used datasets are evicted first."""
+    usage = tmp_path / "usage.json"
+    ledger.save(
+        {
+            f"s/{name}": {
+                "scope": "s",
+                "dataset": name,
+                "path": str(tmp_path),
+                "bytes": 50,
+                "last_used": used,
+            }
+            for used, name in enumerate(["old", "mid", "new"], 1)
+        },
+        usage,
+    )
+    assert ledger.eviction_candidates(10, 100, str(tmp_path), ledger=usage) == []
+    candidates = ledger.eviction_candidates(140, 50, str(tmp_path), ledger=usage)
+    assert [c["dataset"] for c in candidates] == ["old", "mid"]
+    candidates = ledger.eviction_candidates(
+        140, 50, str(tmp_path), exclude="s/old", ledger=usage
+    )
+    assert [c["dataset"] for c in candidates] == ["mid", "new"]
+    assert ledger.eviction_candidates(1000, 50, str(tmp_path), ledger=usage) is None
+
+
+def test_paths_follow_config(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test local state files are resolved when used, next to the configuration."""
+    monkeypatch.setattr(dtcli.config, "CONFIG", tmp_path / "config.yaml")
+    assert ledger.location() == tmp_path / "usage.json"
+    assert catalog.location() == tmp_path / "catalog.sqlite"
+    assert signatures.location() == tmp_path / "signatures.yaml"
+    assert functions.unregistered_snapshot() == tmp_path / "unregistered.json"
+
+
+def test_concurrent_records(tmp_path: Path) -> None:
+    """Test concurrent updates of the ledger are not lost."""
+    usage = tmp_path / "usage.json"
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        for index in range(32):
+            executor.submit(ledger.record, "s", str(index), str(tmp_path), [], usage)
+    assert len(ledger.load(usage)) == 32
+    assert not [*tmp_path.glob("*.tmp")]
+
+
+def test_other_volumes_are_not_evicted(tmp_path: Path) -> None:
+    """Test only datasets on the download's volume are candidates."""
+    usage = tmp_path / "usage.json"
+    ledger.save(
+        {
+            "s/gone": {"dataset": "gone", "path": str(tmp_path / "x"), "bytes": 9},
+            "s/here": {"dataset": "here", "path": str(tmp_path), "bytes": 9},
+        },
+        usage,
+    )
+    target = str(tmp_path / "new" / "dataset")
+    assert ledger.free_space(target) == ledger.free_space(str(tmp_path))
+    candidates = ledger.eviction_candidates(1, 0, target, ledger=usage)
+    assert [c["dataset"] for c in candidates] == ["here"]
@@ -0,0 +1,116 @@
+"""Micro-benchmarks of the loops run over every file of a dataset.
+
+They are skipped unless DTCLI_BENCHMARKS is set, since their timings depend
+on the machine. Each benchmark runs over synthetic paths, 1M by default, and
+fails if it takes longer per path than its threshold. Thresholds are a few
+times the cost on a developer machine, so that only real regressions fail. Set
+DTCLI_MICRO_PATHS to change the number of paths, and DTCLI_MICRO_SLACK to
+scale the thresholds on slow machines.
+
+Run them alone, printing the timings, with:
+    DTCLI_BENCHMARKS=1 python -m pytest -s tests/test_microbenchmarks.py
+"""
+
+import gc
+import os
+import random
+import time
+from typing import Any, Callable, List
+
+import pytest
+
+from dtcli.ps import relative_names
+from dtcli.src import functions
+from dtcli.utilities import paths
+from dtcli.utilities.utilities import split
+
+PATHS = int(os.environ.get("DTCLI_MICRO_PATHS", 1_000_000))
+SLACK = float(os.environ.get("DTCLI_MICRO_SLACK", 1))
+
+pytestmark = pytest.mark.skipif(
+    not os.environ.get("DTCLI_BENCHMARKS"), reason="Set DTCLI_BENCHMARKS to run."
+)
+
+
+def synthetic_uris(count: int) -> List[str]:
+    """Minoc URIs laid out like a large baseband dataset."""
+    return [
+        "cadc:CHIMEFRB/data/chime/baseband/raw/2023/"
+        f"{(i // 100000) % 12 + 1:02d}/{(i // 3000) % 28 + 1:02d}/"
+        f"astro_{300000000 + i // 1000}/baseband_{300000000 + i // 1000}_{i % 1000}.h5"
+        for i in range(count)
+    ]
+
+
+@pytest.fixture(scope="module")
+def uris() -> List[str]:
+    """Synthetic Minoc URIs."""
+    return synthetic_uris(PATHS)
+
+
+@pytest.fixture(scope="module")
+def relative_paths(uris: List[str]) -> List[str]:
+    """Synthetic Minoc paths."""
+    return [uri.replace("cadc:CHIMEFRB/", "") for uri in uris]
+
+
+def benchmark(name: str, function: Callable[[], Any], count: int, ns: float) -> Any:
+    """Time a function, failing if it takes over `ns` nanoseconds per item."""
+    # As timeit, garbage collection is paused so it does not add noise.
+    gc.collect()
+    gc.disable()
+    try:
+        started = time.perf_counter()
+        result = function()
+        elapsed = (time.perf_counter() - started) / count * 1e9
+    finally:
+        gc.enable()
+    print(f"{name}: {elapsed:.0f} ns per item over {count} items")
+    assert elapsed < ns * SLACK, f"{name} took {elapsed:.0f} ns per item."
+    return result
+
+
+def test_file_map(uris: List[str]) -> None:
+    """Benchmark parsing Minoc URIs when finding missing files."""
+    file_map = benchmark("FileMap", lambda: paths.FileMap(uris), PATHS, 2000)
+    assert file_map.paths()[0] == uris[0].replace("cadc:CHIMEFRB/", "")
+
+
+def test_destinations(uris: List[str]) -> None:
+    """Benchmark planning where files are downloaded to."""
+    file_map = paths.FileMap(uris)
+    destinations = benchmark(
+        "destinations", lambda: file_map.destinations("/tmp/dtcli/"), PATHS, 1000
+    )
+    assert destinations[0] == "/tmp/dtcli/" + file_map.paths()[0]
+    assert len(file_map.local_folders("/tmp/dtcli")) == len(
+        {uri.rpartition("/")[0] for uri in uris}
+    )
+
+
+def test_relative_names(relative_paths: List[str]) -> None:
+    """Benchmark naming files relative to their common path in ps."""
+    common_path, names = benchmark(
+        "relative_names", lambda: relative_names(relative_paths), PATHS, 2000
+    )
+    assert common_path + "/" + names[-1] == relative_paths[-1]
+
+
+def test_signature() -> None:
+    """Benchmark classifying reasons datasets are unregistered."""
+    rng = random.Random(0)
+    reasons = [
+        f"Could not attach datasets: ['{i}'] to {i // 1000}. "
+        f'ERROR: "dataset {i // 1000}, chime.event.baseband.raw not found"'
+        for i in rng.sample(range(10**8), 500)
+    ]
+    messages = [rng.choice(reasons) for _ in range(PATHS)]
+    benchmark(
+        "signature", lambda: [functions.signature(m) for m in messages], PATHS, 1000
+    )
+
+
+def test_split(relative_paths: List[str]) -> None:
+    """Benchmark splitting files into batches for download processes."""
+    batches = benchmark("split", lambda: split(relative_paths, 64), PATHS, 200)
+    assert sum(len(batch) for batch in batches) == PATHS
@@ -0,0 +1,56 @@
+"""Tests for mapping Minoc file URIs to local paths."""
+
+from dtcli.utilities import paths
+
+
+def test_split() -> None:
+    """Test the forms of URI from Datatrail map to the same path."""
+    for uri in [
+        "cadc:CHIMEFRB/data/chime/a/1.h5",
+        "cadc:CHIMEFRB//data/chime/a/1.h5",
+        "/data/chime/a/1.h5",
+        "data//chime/a/1.h5",
+    ]:
+        assert paths.relative(uri) == "data/chime/a/1.h5"
+    assert paths.split("cadc:OTHER/data/1.h5") == ("cadc:OTHER", "data/1.h5")
+
+
+def test_file_map() -> None:
+    """Test files are mapped to their paths, URIs and destinations."""
+    file_map = paths.FileMap(
+        [
+            "cadc:CHIMEFRB/data/chime/a/1.h5",
+            "/data/chime/a/2.h5",
+            "data/chime/b/3.h5",
+            "cadc:OTHER/data/chime/c/4.h5",
+        ]
+    )
+    assert len(file_map) == 3
+    assert file_map.table.folders == ["data/chime/a", "data/chime/b"]
+    assert file_map.paths() == [
+        "data/chime/a/1.h5",
+        "data/chime/a/2.h5",
+        "data/chime/b/3.h5",
+    ]
+    assert file_map.uris()[0] == "cadc:CHIMEFRB/data/chime/a/1.h5"
+    assert file_map.destinations("/mnt//local")[2] == "/mnt/local/data/chime/b/3.h5"
+    assert file_map.local_folders("/mnt/local/") == {
+        "/mnt/local/data/chime/a",
+        "/mnt/local/data/chime/b",
+    }
+    assert file_map.common_path() == "data/chime"
+    assert paths.FileMap(["data/chime/a/1.h5"]).common_path() == "data/chime/a/1.h5"
+    assert paths.FileMap(["data/chime/a/1.h5"]).common_folder() == "data/chime/a"
+
+
+def test_views() -> None:
+    """Test views select files without copying them."""
+    file_map = paths.FileMap(["data/a/1.h5", "data/a/2.h5", "data/b/3.h5"])
+    view = file_map.view([0, 2])
+    assert [*view] == ["data/a/1.h5", "data/b/3.h5"]
+    assert view.local_folders("/mnt") == {"/mnt/data/a", "/mnt/data/b"}
+    selected = view.select(lambda path: path.endswith("3.h5"))
+    assert selected.file_map is file_map and [*selected.positions] == [2]
+    assert selected.common_path() == "data/b/3.h5"
+    assert paths.view(["data/a/1.h5"]).paths() == ["data/a/1.h5"]
+    assert paths.view(view) is view
@@ -0,0 +1,64 @@
+"""Tests for the ps command helpers."""
+
+from typing import Any, Dict, Optional, Tuple
+
+import pytest
+from click.testing import CliRunner
+
+from dtcli import ps
+
+
+def test_ps_batch(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test many datasets are summarised and failures are reported inline."""
+    files = {
+        "file_replica_locations": {
+            "minoc": ["cadc:CHIMEFRB/data/1/a.h5", "cadc:CHIMEFRB/data/1/b.h5"]
+        }
+    }
+    policies = {
+        "belongs_to": [{"name": "classified.FRB"}],
+        "replication_policy": {"preferred_storage_elements": ["minoc"]},
+        "deletion_policy": [{"storage_element": "chime", "delete_after_days": 30}],
+    }
+
+    def functions_ps(
+        scope: str, dataset: str, quiet: bool = False
+    ) -> Tuple[Optional[Dict[str, Any]], Dict[str, Any]]:
+        if dataset == "bad":
+            raise ConnectionError("Datatrail Server at CHIME is not responding.")
+        return (None if dataset == "missing" else files), policies
+
+    monkeypatch.setattr(ps.functions, "ps", functions_ps)
+    monkeypatch.setattr(ps.cadcclient, "query_client", lambda: object())
+    monkeypatch.setattr(
+        ps.cadcclient, "prefix_stats", lambda prefixes, client: {"/data/1": (2, 1024)}
+    )
+    records = ps.ps_batch("s", ["1", "bad", "missing"], workers=2, output_jsonl=True)
+    records = {record["dataset"]: record for record in records}
+    assert records["1"] == {
+        "dataset": "1",
+        "scope": "s",
+        "files": {"minoc": 2},
+        "minoc_bytes": 1024,
+        "replication": ["minoc"],
+        "deletion": {"chime": 30},
+        "belongs_to": ["classified.FRB"],
+    }
+    assert "not responding" in records["bad"]["error"]
+    assert records["missing"]["error"] and records["missing"]["files"] == {}
+    assert ps.create_batch_table("s", [*records.values()]).row_count == 3
+
+
+def test_ps_single_jsonl(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test one dataset with --jsonl is summarised as a JSON line too."""
+    batches: Any = []
+    monkeypatch.setattr(ps, "validate_scope", lambda scope: True)
+    monkeypatch.setattr(ps, "check_canfar_status", lambda console: None)
+    monkeypatch.setattr(
+        ps, "ps_batch", lambda *args: batches.append([args[0], [*args[1]], args[3]])
+    )
+    result = CliRunner().invoke(ps.ps, ["s", "123", "--jsonl"])
+    assert result.exit_code == 0
+    assert batches == [["s", ["123"], True]]
+    result = CliRunner().invoke(ps.ps, ["s", "123", "--jsonl", "--json"])
+    assert result.exit_code == 2
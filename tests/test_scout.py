@@ -0,0 +1,22 @@
+"""Tests for the Datatrail scout command."""
+
+from dtcli.scout import find_discrepancies, md5_delta
+
+
+def test_md5_delta() -> None:
+    """Test only files missing from Datatrail are sent to be healed."""
+    observed = {"data/a.h5": "1", "data/b.h5": "2", "data/c.h5": "3"}
+    expected = ["cadc:CHIMEFRB/data/a.h5", "cadc:CHIMEFRB//data/b.h5"]
+    assert md5_delta(observed, expected) == {"data/c.h5": "3"}
+    assert md5_delta(observed, ["/data/a.h5", "data/b.h5", "data/c.h5"]) == {}
+
+
+def test_find_discrepancies() -> None:
+    """Test discrepancies are storage elements with more files than expected."""
+    data = {
+        "chime.event.baseband.raw": {
+            "observed": {"chime": 3, "minoc": 5},
+            "expected": {"chime": 3, "minoc": 2},
+        },
+    }
+    assert find_discrepancies(data) == [["chime.event.baseband.raw", "minoc"]]
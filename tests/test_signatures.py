@@ -0,0 +1,54 @@
+"""Tests for the unregistered reason signatures."""
+
+from pathlib import Path
+
+from dtcli.utilities import signatures
+
+
+def test_default_rules() -> None:
+    """Test the built-in rules group reasons by category."""
+    engine = signatures.SignatureEngine(signatures.DEFAULT_RULES)
+    attach = (
+        "Could not attach datasets: ['1'] to 2. "
+        'ERROR: "dataset 2, chime.event.baseband.raw not found"'
+    )
+    create = (
+        "Could not create dataset: 123, scope: chime.event.baseband.raw. "
+        "psycopg2.errors.UniqueViolation: duplicate key"
+    )
+    assert engine.classify(attach) == "ATTACH_MISSING:2:chime.event.baseband.raw"
+    assert engine.classify(create) == "CREATE_DUPLICATE:<ID>:chime.event.baseband.raw"
+    assert (
+        engine.classify("psycopg2 error:\n  closed") == "POSTGRES:psycopg2 error: closed"
+    )
+    assert engine.classify(" token expired ") == "STATUS:token expired"
+    assert engine.classify("line 1\nline  2") == "OTHER:line <ID> line <ID>"
+    engine.classify(" token expired ")
+    assert engine.classify.cache_info().hits == 1
+
+
+def test_custom_rules(tmp_path: Path) -> None:
+    """Test custom rules are tried before the built-in rules."""
+    rules = tmp_path / "signatures.yaml"
+    rules.write_text(
+        "rules:\n"
+        "  - category: TOKEN\n"
+        "    keyword: token\n"
+        "    pattern: 'token (expired|invalid)'\n"
+        "    template: '{1}'\n"
+    )
+    engine = signatures.SignatureEngine(signatures.load(rules))
+    assert engine.classify("token expired") == "TOKEN:expired"
+    assert engine.classify("timeout") == "STATUS:timeout"
+    assert engine.fingerprint != signatures.SignatureEngine([]).fingerprint
+
+    rules.write_text("rules:\n  - keyword: token\n")
+    assert signatures.load(rules) == signatures.DEFAULT_RULES
+
+
+def test_nested_keywords() -> None:
+    """Test a keyword inside another keyword's match still selects its rule."""
+    rules = [{"category": "DS", "keyword": "create dataset"}]
+    engine = signatures.SignatureEngine(rules + signatures.DEFAULT_RULES)
+    msg = "Could not create dataset: foo, scope: bar. boom"
+    assert engine.classify(msg) == f"DS:{msg}"
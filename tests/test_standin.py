@@ -0,0 +1,238 @@
+"""Tests against the local stand-in server."""
+
+import hashlib
+import json
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, List
+
+import pytest
+import yaml
+from click.testing import CliRunner
+from tenacity import wait_none
+
+import dtcli.config
+from dtcli.cli import cli
+from dtcli.pull import undownloaded
+from dtcli.scout import heal_discrepancy, query_scout
+from dtcli.src import functions
+from dtcli.utilities import artifacts, cadcclient, http
+from dtcli.utilities.standin import StandIn
+
+SCOPE = "chime.event.baseband.raw"
+
+
+def enable_cache() -> None:
+    """Turn on the artifact cache in the stand-in configuration."""
+    config = yaml.safe_load(dtcli.config.CONFIG.read_text())
+    config["artifact_cache"] = True
+    dtcli.config.CONFIG.write_text(yaml.safe_dump(config))
+
+
+def test_list_and_ps(standin: StandIn) -> None:
+    """Test listing datasets and their files and policies."""
+    standin.add_dataset(SCOPE, "123", files=3, larger="classified.FRB")
+    assert functions.list(None, None, 0, True) == {"scopes": [SCOPE]}
+    assert functions.list(SCOPE, None, 0, True) == {
+        "larger_datasets": ["classified.FRB"]
+    }
+    assert functions.list(SCOPE, "classified.FRB", 0, True) == {"datasets": ["123"]}
+    files, policies = functions.ps(SCOPE, "123", quiet=True)
+    assert files and len(files["file_replica_locations"]["minoc"]) == 3
+    assert policies and policies["belongs_to"][0]["name"] == "classified.FRB"
+    assert "error" in functions.list(SCOPE, "missing", 0, True)
+
+
+def test_json_output(standin: StandIn) -> None:
+    """Test ls and ps write JSON, indented or compact."""
+    standin.add_dataset(SCOPE, "123", files=3, larger="classified.FRB")
+    runner = CliRunner()
+    indented = runner.invoke(cli, ["ls", SCOPE, "classified.FRB", "--json"])
+    compact = runner.invoke(cli, ["ls", SCOPE, "classified.FRB", "--json", "--compact"])
+    assert indented.exit_code == 0 and compact.exit_code == 0
+    assert json.loads(indented.output) == json.loads(compact.output)
+    assert json.loads(compact.output) == {"datasets": ["123"]}
+    assert indented.output.count("\n") > 1 and compact.output.count("\n") == 1
+    result = runner.invoke(cli, ["ps", SCOPE, "123", "--json", "--compact"])
+    output = json.loads(result.output)
+    assert len(output["files"]["file_replica_locations"]["minoc"]) == 3
+
+
+def test_ls_write(
+    standin: StandIn, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test ls writes the same JSON with or without --plain."""
+    for name in ["3", "1", "2"]:
+        standin.add_dataset(SCOPE, name, files=1, larger="classified.FRB")
+    monkeypatch.chdir(tmp_path)
+    written = tmp_path / f"dataset_list_for_{SCOPE}_classified.FRB.txt"
+    runner = CliRunner()
+    args = ["ls", SCOPE, "classified.FRB", "--write"]
+    assert runner.invoke(cli, args).exit_code == 0
+    assert json.loads(written.read_text()) == {"datasets": ["3", "2", "1"]}
+    result = runner.invoke(cli, args + ["--plain"])
+    assert result.output.split() == ["3", "1", "2"]
+    assert json.loads(written.read_text()) == {"datasets": ["3", "1", "2"]}
+
+
+def test_pull_files(standin: StandIn, tmp_path: Path) -> None:
+    """Test missing files are found and downloaded from Minoc."""
+    standin.add_dataset(SCOPE, "123", files=4, size=100_000)
+    files = functions.find_missing_dataset_files(SCOPE, "123", f"{tmp_path}/")
+    assert len(files["missing"]) == 4
+    assert len([*undownloaded(files["missing"], str(tmp_path))]) == 4
+    functions.get_files(files["missing"], "local", str(tmp_path), 2, 0)
+    assert not [*undownloaded(files["missing"], str(tmp_path))]
+    for path in files["missing"]:
+        local = tmp_path / path.replace("cadc:CHIMEFRB/", "")
+        artifact = standin.artifacts[path.replace("cadc:CHIMEFRB/", "")]
+        assert hashlib.md5(local.read_bytes()).hexdigest() == artifact.md5
+    assert standin.requests["minoc"] == 4
+
+
+def test_missing_files_size(standin: StandIn, tmp_path: Path) -> None:
+    """Test the size to download counts only the files missing locally."""
+    dataset = standin.add_dataset(SCOPE, "123", files=4, size=100)
+    for index in range(3):
+        local = tmp_path / dataset.basepath / f"file_{index:06d}.dat"
+        local.parent.mkdir(parents=True, exist_ok=True)
+        local.write_bytes(b"x" * 100)
+    files = functions.find_missing_dataset_files(SCOPE, "123", f"{tmp_path}/")
+    assert len(files["missing"]) == 1
+    missing = files["missing"]
+    assert cadcclient.files_size(missing.uris(), missing.common_path()) == 100
+
+
+def test_luskan(standin: StandIn) -> None:
+    """Test Luskan counts, sums and checksums, with and without `union all`."""
+    dataset = standin.add_dataset(SCOPE, "123", files=5, size=10, unregistered=1)
+    prefixes = [dataset.basepath, "data/missing"]
+    expected = {dataset.basepath: (6, 60), "data/missing": (0, 0)}
+    assert cadcclient.prefix_stats(prefixes) == expected
+    standin.union = False
+    assert cadcclient.prefix_stats(prefixes) == expected
+    md5s = cadcclient.dataset_md5s(dataset.basepath)
+    assert md5s == {path: standin.artifacts[path].md5 for path in md5s}
+    assert len(md5s) == 6
+
+
+def test_concurrent_queries(standin: StandIn) -> None:
+    """Test one client streams many Luskan queries at once from threads."""
+    datasets = [standin.add_dataset(SCOPE, str(i), files=i + 1) for i in range(8)]
+    client = cadcclient.query_client()
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = executor.map(
+            lambda dataset: cadcclient.dataset_md5s(dataset.basepath, client=client),
+            datasets,
+        )
+        assert [len(md5s) for md5s in results] == [i + 1 for i in range(8)]
+
+
+def test_chunked_listing(standin: StandIn, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test large listings are split, paginated and retried page by page."""
+    monkeypatch.setattr(cadcclient, "PAGE_ROWS", 4)
+    monkeypatch.setattr(cadcclient, "CHUNK_ROWS", 8)
+    monkeypatch.setattr(cadcclient, "RETRY_WAIT", wait_none())
+    for index in range(5):
+        standin.add_dataset(SCOPE, str(100 + index), files=7)
+    expected = {f"cadc:CHIMEFRB/{path}" for path in standin.artifacts}
+    assert len(expected) == 35
+    chunks = cadcclient.plan_chunks("data")
+    assert len(chunks) > 1
+    standin.fail("/luskan/sync", count=2)
+    rows = [*cadcclient.stream_prefix("data", [], workers=3)]
+    assert sorted(row[0] for row in rows) == sorted(expected)
+    assert standin.requests["failure"] == 2
+
+
+def test_artifact_cache(standin: StandIn, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test repeat queries are answered from the cache, refreshed incrementally."""
+    dataset = standin.add_dataset(SCOPE, "123", files=3, size=10, modified=1e9)
+    assert artifacts.open_cache() is None
+    enable_cache()
+    md5s = cadcclient.dataset_md5s(dataset.basepath)
+    assert len(md5s) == 3
+    queries = standin.requests["luskan"]
+    assert cadcclient.prefix_stats([dataset.basepath]) == {dataset.basepath: (3, 30)}
+    assert cadcclient.size(dataset.basepath + "/file_000001") == 10 / 1024**3
+    assert cadcclient.dataset_md5s(dataset.basepath) == md5s
+    assert standin.requests["luskan"] == queries
+
+    # Past the TTL, only artifacts modified since the high-water mark are listed.
+    monkeypatch.setattr(artifacts, "TTL", 0)
+    adql: List[str] = []
+    stream_query = cadcclient.stream_query
+
+    def spy(query: str, *args: Any) -> Any:
+        adql.append(query)
+        return stream_query(query, *args)
+
+    monkeypatch.setattr(cadcclient, "stream_query", spy)
+    standin.add_dataset(SCOPE, "123", files=5, size=10)
+    assert cadcclient.prefix_stats([dataset.basepath]) == {dataset.basepath: (5, 50)}
+    assert len(adql) == 1 and "lastModified >= '2001-09-09T00:46:40.000'" in adql[0]
+    assert cadcclient.dataset_md5s(dataset.basepath) == {
+        path: standin.artifacts[path].md5 for path in standin.artifacts
+    }
+
+
+def test_scout_heal(standin: StandIn) -> None:
+    """Test files stored at Minoc, but not registered, are healed."""
+    dataset = standin.add_dataset(SCOPE, "123", files=3, unregistered=2)
+    server = f"{standin.url}/datatrail"
+    data = query_scout(server, "123", [])
+    assert data[SCOPE]["expected"]["minoc"] == 3
+    client = cadcclient.query_client()
+    assert heal_discrepancy(server, "123", SCOPE, "minoc", data[SCOPE], client) == 2
+    assert len(dataset.registered["minoc"]) == 5
+
+
+def test_scout_yes_without_heal(standin: StandIn) -> None:
+    """Test --yes alone reports discrepancies without healing them."""
+    dataset = standin.add_dataset(SCOPE, "123", files=3, unregistered=2)
+    runner = CliRunner()
+    result = runner.invoke(cli, ["scout", SCOPE, "123", "--yes"])
+    assert result.exit_code == 0 and len(dataset.registered["minoc"]) == 3
+    result = runner.invoke(cli, ["scout", SCOPE, "123", "--heal", "--yes"])
+    assert result.exit_code == 0 and len(dataset.registered["minoc"]) == 5
+
+
+def test_scout_single_jsonl(standin: StandIn) -> None:
+    """Test one dataset with --jsonl is printed as a JSON line."""
+    standin.add_dataset(SCOPE, "123", files=3, unregistered=2)
+    result = CliRunner().invoke(cli, ["scout", SCOPE, "123", "--jsonl"])
+    assert result.exit_code == 0
+    record = json.loads(result.output.strip().splitlines()[0])
+    assert record["dataset"] == "123"
+    assert record["discrepancies"][0]["observed"] == 5
+
+
+def test_scout_heal_skips_cache(standin: StandIn) -> None:
+    """Test healing lists Minoc afresh rather than trusting the cache."""
+    dataset = standin.add_dataset(SCOPE, "123", files=3, unregistered=2)
+    enable_cache()
+    assert len(cadcclient.dataset_md5s(dataset.basepath)) == 5
+    # Deleted from Minoc after it was cached.
+    del standin.artifacts[dataset.stored["minoc"].pop()]
+    standin._uris = None
+    assert len(cadcclient.dataset_md5s(dataset.basepath)) == 5
+    server = f"{standin.url}/datatrail"
+    data = query_scout(server, "123", [])
+    client = cadcclient.query_client()
+    assert heal_discrepancy(server, "123", SCOPE, "minoc", data[SCOPE], client) == 1
+    assert len(dataset.registered["minoc"]) == 4
+    assert len(cadcclient.dataset_md5s(dataset.basepath)) == 4
+
+
+def test_retries_and_ranges(standin: StandIn) -> None:
+    """Test server errors are retried and files can be read by range."""
+    dataset = standin.add_dataset(SCOPE, "123", files=1, size=100)
+    standin.fail("/datatrail/query/dataset/scopes", count=2)
+    assert functions.list(None, None, 0, True) == {"scopes": [SCOPE]}
+    assert standin.requests == {"failure": 2, "scopes": 1}
+    url = f"{standin.url}/minoc/files/cadc:CHIMEFRB/{dataset.basepath}/file_000000.dat"
+    whole = http.session().get(url).content
+    part = http.session().get(url, headers={"Range": "bytes=10-19"})
+    assert part.status_code == 206
+    assert part.content == whole[10:20]
+    assert part.headers["Content-Range"] == "bytes 10-19/100"
@@ -41,3 +41,16 @@ def test_split_more_batches_than_items():
     assert len(result) <= len(test_array)
     # every element appears exactly once
     assert sorted(sum(result, [])) == sorted(test_array)
+
+
+def test_imap_unordered():
+    """imap_unordered() yields every item with its result."""
+    results = {
+        item: future.result()
+        for item, future in utilities.imap_unordered(lambda x: x * 2, range(10), 3)
+    }
+    assert results == {x: x * 2 for x in range(10)}
+
+    # Exceptions are held by the future rather than raised.
+    _, future = next(utilities.imap_unordered(lambda x: 1 / x, [0], 1))
+    assert isinstance(future.exception(), ZeroDivisionError)